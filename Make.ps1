@@ -5,6 +5,7 @@ clean-pyc              remove Python file artifacts
 lint                   check style with flake8
 format                 format python file by yapf
 tests                  runs e2e app tests with pytest
+tests-parallel         runs e2e app tests on every core, longest tests first
 clean-requirements     remove requirements.txt file
 compile-requirements   compile requirements by requirements.in
 sync-requirements      sync requirements with requirements.txt
@@ -36,6 +37,14 @@ function make-tests_lib
     pytest tests
     $env:PYTHONPATH=$orig_path
 }
+function make-tests-parallel
+{
+    $orig_path=$env:PYTHONPATH
+    $dir=pwd
+    $env:PYTHONPATH=$dir
+    pytest tests -n auto --store-durations
+    $env:PYTHONPATH=$orig_path
+}
 function make-clean-requirements
 {
     del requirements.txt -force -erroraction ignore
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+""" Measure the overhead of the Element/decorator layer against a local fake WebDriver
+
+No browser is needed: every command is answered by benchmarks.fake_webdriver, so the
+numbers are the cost of the framework plus one local HTTP round trip per command.
+
+Usage:
+    python -m benchmarks.bench_element [--iterations 200] [--output bench_element.json]
+"""
+import argparse
+import json
+import logging
+import platform
+import statistics
+import time
+from typing import Any, Callable, Dict, List
+
+from selenium.webdriver import ChromeOptions, Remote
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
+
+from benchmarks.fake_webdriver import GOOGLE_HOME, FakeWebDriver
+from lib.base.driver_pool import DriverPool
+from lib.pom.google.home.home import Home
+from lib.utils.common.web_element.components import ComponentList
+from lib.utils.common.web_element.decorator import MEMO_ATTR
+from lib.utils.common.web_element.element import Element
+from lib.utils.common.web_element.macro import ActionMacro
+
+logger = logging.getLogger(__name__)
+
+URL = 'https://www.google.com/'
+
+# Result page with many rows for the component list benchmarks
+RESULT_ROWS = 300
+RESULTS_PAGE = GOOGLE_HOME + [{'tag': 'div', 'attrs': {'class': 'g'}}] * RESULT_ROWS
+ROW_LOCATOR = (By.CSS_SELECTOR, 'div[class="g"]')
+
+
+class Row:
+    """ Minimal component wrapping a result row. """
+
+    def __init__(self, driver: Remote, element: WebElement) -> None:
+        self.driver = driver
+        self.element = element
+
+
+def timed(name: str, func: Callable[[], Any], iterations: int, warmup: int = 5) -> Dict[str, Any]:
+    """ Time repeated calls of func.
+
+    Arguments:
+        name(str): benchmark name.
+        func(Callable[[], Any]): measured call.
+        iterations(int): number of measured calls.
+        warmup(int): number of unmeasured calls first (default=5).
+    Returns:
+        Dict[str, Any]: name, iterations and mean, median, p95 and min wall time in usec.
+    """
+    for _ in range(warmup):
+        func()
+    samples: List[float] = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    stats = {
+        'name': name,
+        'iterations': iterations,
+        'mean_us': round(statistics.mean(samples), 1),
+        'median_us': round(statistics.median(samples), 1),
+        'p95_us': round(samples[max(int(len(samples) * 0.95) - 1, 0)], 1),
+        'min_us': round(samples[0], 1),
+    }
+    logger.info("%-32s median %10.1f usec", name, stats['median_us'])
+    return stats
+
+
+def new_driver(server: FakeWebDriver) -> Remote:
+    """ Open a session on the fake WebDriver.
+
+    Arguments:
+        server(FakeWebDriver): running fake WebDriver.
+    Returns:
+        Remote: webdriver.
+    """
+    return Remote(command_executor=server.url, options=ChromeOptions())
+
+
+def bench_setup(server: FakeWebDriver, iterations: int) -> List[Dict[str, Any]]:
+    """ Driver setup: new session, pooled acquire/release and page object creation. """
+    results = [timed('session/new+quit', lambda: new_driver(server).quit(), iterations)]
+
+    pool = DriverPool(lambda: new_driver(server), size=1, max_uses=0)
+    try:
+        results.append(timed('pool/acquire+release', lambda: pool.release(pool.acquire()), iterations))
+    finally:
+        pool.close()
+
+    driver = new_driver(server)
+    try:
+        results.append(timed('pom/new', lambda: Home(driver), iterations))
+    finally:
+        driver.quit()
+    return results
+
+
+def bench_element(driver: Remote, iterations: int) -> List[Dict[str, Any]]:
+    """ Element hot paths with the WebElement cache on and off. """
+    results = []
+    cached = Element(driver, 'gsr', driver, cache=True)
+    uncached = Element(driver, 'gsr', driver, cache=False)
+    by_xpath = Element(driver, '//*[@name="q"]', driver, xpath=True, cache=False)
+    results.append(timed('element/get cached', cached.get, iterations))
+    results.append(timed('element/get uncached', uncached.get, iterations))
+    results.append(timed('element/get xpath uncached', by_xpath.get, iterations))
+    results.append(timed('element/get_elements', by_xpath.get_elements, iterations))
+    results.append(timed('element/get_attribute', lambda: by_xpath.get_attribute('type'), iterations))
+    names = ['type', 'name', 'value']
+    results.append(timed('element/get_attribute x3', lambda: [by_xpath.get_attribute(n) for n in names], iterations))
+    results.append(timed('element/get_attributes x3', lambda: by_xpath.get_attributes(names), iterations))
+    inputs = Element(driver, '//input', driver, xpath=True, cache=False)
+    results.append(timed('element/get_elements+get_attribute x3',
+                         lambda: [[e.get_attribute(n) for n in names] for e in inputs.get_elements()], iterations))
+    results.append(timed('element/get_columns x3', lambda: inputs.get_columns(names), iterations))
+    results.append(timed('element/send_keys', lambda: by_xpath.send_keys('selenium'), iterations))
+    results.append(timed('element/is_displayed', by_xpath.is_displayed, iterations))
+    return results
+
+
+def bench_decorator(driver: Remote, iterations: int) -> List[Dict[str, Any]]:
+    """ @elements property access with and without the per-instance memo. """
+    page = Home(driver)
+
+    def fresh_access() -> Element:
+        vars(page).pop(MEMO_ATTR, None)
+        return page.search_box_input
+
+    return [
+        timed('decorator/property memoized', lambda: page.search_box_input, iterations),
+        timed('decorator/property unmemoized', fresh_access, iterations),
+        timed('decorator/property+get', lambda: page.search_box_input.get(max_wait=1), iterations),
+        timed('decorator/snapshot', page.snapshot, iterations),
+    ]
+
+
+def bench_macro(driver: Remote, iterations: int) -> List[Dict[str, Any]]:
+    """ The search steps of run_search, one Element call each and as an action macro. """
+    page = Home(driver)
+
+    def steps() -> None:
+        page.search_box_input.send_keys('selenium')
+        page.google_search_submit.submit()
+
+    def macro() -> None:
+        ActionMacro(driver).type(page.search_box_input, 'selenium').submit(page.google_search_submit).run()
+
+    return [
+        timed('macro/send_keys+submit', steps, iterations),
+        timed('macro/type+submit', macro, iterations),
+    ]
+
+
+def bench_components(iterations: int) -> List[Dict[str, Any]]:
+    """ Component lists of RESULT_ROWS rows: eager list against the lazy ComponentList. """
+    server = FakeWebDriver(RESULTS_PAGE).start()
+    driver = new_driver(server)
+    try:
+        driver.get(URL)
+
+        def lazy() -> ComponentList[Row]:
+            return ComponentList(driver, driver, ROW_LOCATOR, Row)
+
+        return [
+            timed(f'components/eager list {RESULT_ROWS}',
+                  lambda: [Row(driver, e) for e in driver.find_elements(*ROW_LOCATOR)], iterations),
+            timed('components/lazy len', lambda: len(lazy()), iterations),
+            timed('components/lazy first 3', lambda: lazy()[:3], iterations),
+            timed(f'components/lazy iterate {RESULT_ROWS}', lambda: list(lazy()), iterations),
+            timed(f'components/lazy iterate {RESULT_ROWS} chunk 100', lambda: list(lazy().stream(100)), iterations),
+        ]
+    finally:
+        driver.quit()
+        server.stop()
+
+
+def run(iterations: int) -> Dict[str, Any]:
+    """ Run every benchmark against a fresh fake WebDriver.
+
+    Arguments:
+        iterations(int): measured calls per benchmark.
+    Returns:
+        Dict[str, Any]: environment and list of benchmark results.
+    """
+    server = FakeWebDriver().start()
+    results: List[Dict[str, Any]] = []
+    try:
+        results += bench_setup(server, iterations)
+        results += bench_components(iterations)
+        driver = new_driver(server)
+        try:
+            driver.get(URL)
+            results += bench_element(driver, iterations)
+            results += bench_decorator(driver, iterations)
+            results += bench_macro(driver, iterations)
+        finally:
+            driver.quit()
+    finally:
+        server.stop()
+    return {
+        'python': platform.python_version(),
+        'commands_served': server.commands,
+        'benchmarks': results,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='bench_element.py', description='Benchmark the Element layer offline.')
+    parser.add_argument('--iterations', type=int, default=200, help='Measured calls per benchmark (default=200).')
+    parser.add_argument('--output', help='Write the JSON result to this file instead of stdout.')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    result = json.dumps(run(args.iterations), indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf8') as f:
+            f.write(result)
+    else:
+        print(result)
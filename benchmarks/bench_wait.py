@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+""" Compare the latency each wait engine adds on top of the page becoming ready
+
+Usage:
+    python -m benchmarks.bench_wait [--trials 20] [--output bench_wait.json]
+"""
+import argparse
+import json
+import logging
+import random
+import statistics
+import time
+from typing import Any, Dict, List
+
+from selenium.webdriver import Remote
+
+from lib.utils.common.driver_setting import set_chrome_driver_options
+from lib.utils.common.web_element.element import Element, Method
+from lib.utils.common.web_element.wait import WaitEngine
+
+logger = logging.getLogger(__name__)
+
+PAGE = 'data:text/html,<html><body><div id="app"></div></body></html>'
+
+# Inserts div#target after arguments[0] msec
+SCHEDULE_JS = """
+var app = document.getElementById('app');
+app.innerHTML = '';
+setTimeout(function () {
+    var target = document.createElement('div');
+    target.id = 'target';
+    target.textContent = 'ready';
+    app.appendChild(target);
+}, arguments[0]);
+"""
+
+
+def measure(driver: Remote, engine: WaitEngine, method: Method, delay_ms: int) -> float:
+    """ Wait for an element inserted after delay_ms and return the extra latency.
+
+    Arguments:
+        driver(Remote): webdriver showing PAGE.
+        engine(WaitEngine): wait engine.
+        method(Method): condition waited for.
+        delay_ms(int): delay before the element is inserted.
+    Returns:
+        float: wait time minus the insertion delay in msec.
+    """
+    element = Element(driver, 'target', driver, cache=False)
+    driver.execute_script(SCHEDULE_JS, delay_ms)
+    started = time.perf_counter()
+    element.get(method=method, max_wait=10, engine=engine)
+    return (time.perf_counter() - started) * 1000 - delay_ms
+
+
+def run(trials: int) -> Dict[str, Any]:
+    """ Measure every engine with the same random delays.
+
+    Arguments:
+        trials(int): number of waits per engine and condition.
+    Returns:
+        Dict[str, Any]: median and p90 overhead in msec per engine and condition.
+    """
+    delays = [random.randint(50, 1500) for _ in range(trials)]
+    driver = set_chrome_driver_options(True)
+    results: Dict[str, Any] = {}
+    try:
+        driver.get(PAGE)
+        for method in (Method.PRESENCE, Method.VISIBILITY):
+            for engine in WaitEngine:
+                overheads: List[float] = [measure(driver, engine, method, delay) for delay in delays]
+                overheads.sort()
+                results[f'{method.name.lower()}/{engine.name.lower()}'] = {
+                    'median_ms': round(statistics.median(overheads), 1),
+                    'p90_ms': round(overheads[int(len(overheads) * 0.9) - 1], 1),
+                    'trials': trials,
+                }
+                logger.info("%s %s: median overhead %.1f msec", method.name, engine.name,
+                            statistics.median(overheads))
+    finally:
+        driver.quit()
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='bench_wait.py', description='Benchmark wait engines.')
+    parser.add_argument('--trials', type=int, default=20, help='Waits per engine and condition (default=20).')
+    parser.add_argument('--output', help='Write the JSON result to this file instead of stdout.')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    result = json.dumps(run(args.trials), indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf8') as f:
+            f.write(result)
+    else:
+        print(result)
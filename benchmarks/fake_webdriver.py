@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+""" In-process fake W3C WebDriver endpoint serving a static page model
+
+Only the commands issued by the framework are implemented. Scripts are not
+evaluated: the Selenium atoms and the framework's own scripts are recognised
+and answered from the page model, any other script returns null.
+"""
+import json
+import re
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from selenium.webdriver.remote.webelement import getAttribute_js, isDisplayed_js
+
+from lib.utils.common.web_element.scripts import (ATTACHED_JS, LOCATE_READ_JS, MACRO_JS, OBSERVE_JS, PROBE_JS,
+                                                  READ_JS, READY_JS, SLICE_JS, SNAPSHOT_JS)
+
+ELEMENT_KEY = 'element-6066-11e4-a52e-4f735466cecf'
+
+""" Page model of the Google Search Home page used by the POM """
+GOOGLE_HOME = [
+    {'tag': 'form', 'attrs': {'id': 'tsf'}},
+    {'tag': 'div', 'attrs': {'id': 'gsr'}},
+    {'tag': 'input', 'attrs': {'name': 'q', 'type': 'text'}},
+    {'tag': 'input', 'attrs': {'name': 'btnK', 'type': 'submit'}},
+]
+
+ATTR_SELECTOR = re.compile(r'^(?P<tag>[a-z]*|\*)\[@?(?P<attr>[\w-]+)="(?P<value>[^"]*)"\]$')
+
+
+class FakeElement:
+    """ Element of the page model. """
+
+    def __init__(self, tag: str, attrs: Dict[str, str], displayed: bool = True) -> None:
+        self.id = str(uuid.uuid4())
+        self.tag = tag
+        self.attrs = dict(attrs)
+        self.displayed = displayed
+        self.value = attrs.get('value', '')
+
+    def read(self, name: str) -> Optional[str]:
+        """ Attribute or property value like WebElement.get_attribute. """
+        return self.value if name == 'value' else self.attrs.get(name)
+
+    def to_json(self) -> Dict[str, str]:
+        """ W3C web element reference. """
+        return {ELEMENT_KEY: self.id}
+
+    def matches(self, using: str, value: str) -> bool:
+        """ Whether the element matches a simple CSS selector or XPath. """
+        if using == 'xpath':
+            value = value.lstrip('./')
+            if value.startswith('ancestor-or-self::'):
+                return self.tag == value.split('::', 1)[1]
+        elif value.startswith('#'):
+            return self.attrs.get('id') == value[1:]
+        match = ATTR_SELECTOR.match(value)
+        if match is None:
+            return value in (self.tag, '*')
+        return match['tag'] in ('', '*', self.tag) and self.attrs.get(match['attr']) == match['value']
+
+
+class FakeSession:
+    """ Browser state of one session. """
+
+    def __init__(self, page: List[Dict[str, Any]]) -> None:
+        self.page = page
+        self.url = 'about:blank'
+        self.elements: Dict[str, FakeElement] = {}
+        self.cookies: List[Dict[str, Any]] = []
+        self.navigate('about:blank')
+
+    def navigate(self, url: str) -> None:
+        """ Load a new document: every previous element goes stale. """
+        self.url = url
+        self.elements = {}
+        for spec in self.page:
+            elem = FakeElement(spec['tag'], spec['attrs'], spec.get('displayed', True))
+            self.elements[elem.id] = elem
+
+    def find(self, using: str, value: str) -> List[FakeElement]:
+        """ Elements of the document matching a locator. """
+        if using == 'id':
+            using, value = 'css selector', f'[id="{value}"]'
+        return [e for e in self.elements.values() if e.matches(using, value)]
+
+    def element(self, ref: Any) -> FakeElement:
+        """ Element of a W3C reference.
+        Raises:
+            KeyError: stale element reference.
+        """
+        return self.elements[ref[ELEMENT_KEY] if isinstance(ref, dict) else ref]
+
+    def execute(self, script: str, args: List[Any]) -> Any:  # pylint: disable=too-many-return-statements
+        """ Answer the scripts the framework issues from the page model. """
+        if getAttribute_js in script:
+            return self.element(args[0]).read(args[1])
+        if isDisplayed_js in script:
+            return self.element(args[0]).displayed
+        if script == SNAPSHOT_JS:
+            return self.snapshot(args[1])
+        if script == PROBE_JS:
+            found = self.find(args[1], args[2])
+            return [bool(found), bool(found) and found[0].displayed]
+        if script == ATTACHED_JS:
+            return [self.url, all(ref[ELEMENT_KEY] in self.elements for ref in args[0])]
+        if script == OBSERVE_JS:
+            found = self.find(args[1], args[2])
+            if not found:
+                return {'ok': False}
+            return {'ok': True, 'value': [e.to_json() for e in found] if args[5] else found[0].to_json()}
+        if script == READ_JS:
+            return [[self.element(ref).read(name) for name in args[1]] for ref in args[0]]
+        if script == LOCATE_READ_JS:
+            found = self.find(args[1], args[2])
+            return {'elements': [e.to_json() for e in found], 'rows': [[e.read(n) for n in args[3]] for e in found]}
+        if script == SLICE_JS:
+            found = self.find(args[1], args[2])
+            return {'url': self.url, 'count': len(found), 'elements': [e.to_json() for e in found[args[3]:args[4]]]}
+        if script == MACRO_JS:
+            return self.macro(args[0])
+        if script == READY_JS:
+            return {'ready': True, 'state': 'complete', 'pending': 0, 'waited': 0, 'hooked': False}
+        if script.strip() == 'return 1':
+            return 1
+        if 'scrollIntoView' in script:
+            self.element(args[0])
+            return {'x': 0, 'y': 0, 'width': 100, 'height': 20}
+        return None
+
+    def snapshot(self, specs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """ Presence, visibility and elements of each Test ID of a page snapshot. """
+        states = {}
+        for spec in specs:
+            found = self.find(spec['by'], spec['value'])
+            found = found if spec['all'] else found[:1]
+            states[spec['key']] = {
+                'present': bool(found),
+                'visible': bool(found) and all(e.displayed for e in found),
+                'elements': [e.to_json() for e in found],
+            }
+        return {'url': self.url, 'states': states}
+
+    def macro(self, ops: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """ Apply the steps of an action macro: text is typed into inputs, other steps have no effect. """
+        for index, op in enumerate(ops):
+            found = self.find(op['by'], op['value'])
+            if not found:
+                return {'done': index, 'missing': True, 'reason': None}
+            elem = found[0]
+            if op['kind'] in ('clear', 'type'):
+                if elem.tag != 'input' or elem.attrs.get('type', 'text') != 'text':
+                    return {'done': index, 'missing': False, 'reason': 'not a text field'}
+                if not elem.displayed:
+                    return {'done': index, 'missing': False, 'reason': 'not displayed'}
+                elem.value = elem.value + op['keys'] if op['kind'] == 'type' else ''
+        return {'done': len(ops), 'missing': False, 'reason': None}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """ Route W3C commands to the session. """
+    server: 'FakeWebDriver'
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args: Any) -> None:  # pylint: disable=redefined-builtin
+        """ Silence request logging. """
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """ Handle GET commands. """
+        self._dispatch('GET')
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        """ Handle POST commands. """
+        self._dispatch('POST')
+
+    def do_DELETE(self) -> None:  # pylint: disable=invalid-name
+        """ Handle DELETE commands. """
+        self._dispatch('DELETE')
+
+    def _dispatch(self, method: str) -> None:
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length) or b'{}') if length else {}
+        parts = self.path.strip('/').split('/')
+        try:
+            status, value = self.server.handle_command(method, parts, body)
+        except KeyError:
+            status, value = 404, {'error': 'stale element reference', 'message': 'stale element', 'stacktrace': ''}
+        payload = json.dumps({'value': value}).encode('utf8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class FakeWebDriver(ThreadingHTTPServer):
+    """ Fake W3C WebDriver server on a free local port.
+    Attributes:
+        url(str): command executor URL for selenium.webdriver.Remote.
+        commands(int): number of commands served.
+    """
+    daemon_threads = True
+
+    def __init__(self, page: Optional[List[Dict[str, Any]]] = None) -> None:
+        super().__init__(('127.0.0.1', 0), _Handler)
+        self.page = page or GOOGLE_HOME
+        self.sessions: Dict[str, FakeSession] = {}
+        self.commands = 0
+        self._lock = threading.Lock()
+        self.url = f'http://127.0.0.1:{self.server_address[1]}'
+
+    def start(self) -> 'FakeWebDriver':
+        """ Serve on a daemon thread. """
+        threading.Thread(target=self.serve_forever, name='fake-webdriver', daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        """ Stop serving. """
+        self.shutdown()
+        self.server_close()
+
+    def handle_command(self, method: str, parts: List[str], body: Dict[str, Any]) -> Tuple[int, Any]:
+        """ Execute one W3C command.
+        Returns:
+            Tuple[int, Any]: HTTP status and value.
+        """
+        # pylint: disable=too-many-return-statements
+        with self._lock:
+            self.commands += 1
+        if parts == ['session'] and method == 'POST':
+            session_id = str(uuid.uuid4())
+            self.sessions[session_id] = FakeSession(self.page)
+            return 200, {'sessionId': session_id, 'capabilities': {'browserName': 'chrome', 'browserVersion': 'fake'}}
+        session = self.sessions[parts[1]]
+        command = '/'.join(parts[2:])
+        if not command:
+            del self.sessions[parts[1]]
+            return 200, None
+        if command == 'url':
+            if method == 'POST':
+                session.navigate(body['url'])
+                return 200, None
+            return 200, session.url
+        if command in ('element', 'elements') or command.startswith('element/'):
+            return self._element_command(session, parts, body)
+        if command in ('execute/sync', 'execute/async'):
+            args = [session.element(a).to_json() if isinstance(a, dict) and ELEMENT_KEY in a else a
+                    for a in body.get('args', [])]
+            return 200, session.execute(body['script'], args)
+        if command == 'window/handles':
+            return 200, ['window-1']
+        if command == 'window' and method == 'GET':
+            return 200, 'window-1'
+        if command == 'cookie':
+            return self._cookie_command(session, method, body)
+        return 200, None
+
+    @staticmethod
+    def _element_command(session: FakeSession, parts: List[str], body: Dict[str, Any]) -> Tuple[int, Any]:
+        """ Find elements, from the document or an element, or act on an element. """
+        command = '/'.join(parts[2:])
+        if command in ('element', 'elements') or re.fullmatch(r'element/[^/]+/elements?', command):
+            if command.startswith('element/'):
+                session.element(parts[3])
+            found = session.find(body['using'], body['value'])
+            if command.endswith('elements'):
+                return 200, [e.to_json() for e in found]
+            if not found:
+                return 404, {'error': 'no such element', 'message': body['value'], 'stacktrace': ''}
+            return 200, found[0].to_json()
+        elem = session.element(parts[3])
+        action = parts[4] if len(parts) > 4 else ''
+        if action in ('clear', 'value') and not elem.displayed:
+            return 400, {'error': 'element not interactable', 'message': 'element not interactable', 'stacktrace': ''}
+        if action == 'clear':
+            elem.value = ''
+        elif action == 'value':
+            elem.value += body.get('text', '')
+        elif action == 'rect':
+            return 200, {'x': 0, 'y': 0, 'width': 100, 'height': 20}
+        return 200, None
+
+    @staticmethod
+    def _cookie_command(session: FakeSession, method: str, body: Dict[str, Any]) -> Tuple[int, Any]:
+        """ Add, delete or list cookies. """
+        if method == 'POST':
+            session.cookies.append(body['cookie'])
+            return 200, None
+        if method == 'DELETE':
+            session.cookies = []
+            return 200, None
+        return 200, session.cookies
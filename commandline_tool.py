@@ -1,34 +1,165 @@
 #!/usr/bin/env python3
-"""This is the command line tool for search on google"""
+"""This is the command line tool for search on google
+
+Selenium is imported lazily so that forwarding a search to a running daemon
+only costs the interpreter start up.
+"""
 import argparse
+import logging
+import sys
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from lib.tools.daemon import DaemonUnavailable, send_job
+
+if TYPE_CHECKING:
+    from selenium.webdriver import Remote
+    from lib.tools.load import LoadSession
+
+logger = logging.getLogger(__name__)
 
-from lib.base.driver import setup_chrome_driver_instances, teardown_driver
-from lib.pom.google.google import Google
-from lib.utils.common.logger_setting import get_logger
+# pylint: disable=import-outside-toplevel,ungrouped-imports
 
-logger = get_logger()
+# Names in lib.utils.common.driver_setting.PROFILES, listed here so parsing the arguments does not import selenium
+PROFILE_NAMES = ('default', 'fast')
 
 
-def search_google(search_text: str, headless: bool) -> None:
+def search_google(search_text: str, headless: bool, profile: Optional[str] = None) -> None:
     """ Open Create Concept page
 
     Arguments:
         search_text(str): Text for search on google.
         headless(bool): Show browser or not.
+        profile(Optional[str]): Chrome launch profile name (default='default').
     """
-    driver = setup_chrome_driver_instances(headless)
-    try:
-        google = Google(driver)
+    from lib.base.driver import pooled_chrome_driver
+
+    with pooled_chrome_driver(headless, profile) as driver:
+        run_search(driver, search_text)
+
+
+def run_search(driver: 'Remote', search_text: str) -> None:
+    """ Search on google with an already launched browser
+
+    Arguments:
+        driver(Remote): webdriver.
+        search_text(str): Text for search on google.
+    """
+    from lib.pom.google.google import Google
+    from lib.utils.common.web_element.macro import ActionMacro
+
+    google = Google(driver)
 
-        logger.info("Start to set params to Create Concept Stap1.")
-        home = google.home
+    logger.info("Start to set params to Create Concept Stap1.")
+    home = google.home
+    home.open()
+
+    # Typing and submitting take one script instead of a command per step. The text is set with input and
+    # change events rather than key events; a field the script cannot type into, e.g. a hidden one, is
+    # typed into by WebElement.send_keys instead and reported as unfused.
+    report = ActionMacro(driver).type(home.search_box_input, search_text).submit(home.google_search_submit).run()
+    logger.debug("Search steps sent in %d batch(es), unfused: %s", report.batches, report.unfused)
+
+
+def search_google_scenario(session: 'LoadSession', search_text: str) -> None:
+    """ One load iteration: open the home page, then search, each timed as a step
+
+    Arguments:
+        session(LoadSession): load session with its webdriver.
+        search_text(str): Text for search on google.
+    """
+    from lib.pom.google.google import Google
+    from lib.utils.common.web_element.macro import ActionMacro
+
+    home = Google(session.driver).home
+    with session.step('open'):
         home.open()
+    with session.step('search'):
+        ActionMacro(session.driver).type(home.search_box_input, search_text).submit(home.google_search_submit).run()
+
 
-        home.search_box_input.send_keys(search_text)
-        home.google_search_submit.submit()
+def search_google_load(search_text: str, sessions: int, ramp_up: float, rate: float, duration: float, report: str,
+                       stand_in: bool = False, profile: Optional[str] = None) -> None:
+    """ Search on google from many concurrent headless browsers and report the latency of each step
 
+    Arguments:
+        search_text(str): Text for search on google.
+        sessions(int): number of concurrent browsers.
+        ramp_up(float): sec until every browser runs.
+        rate(float): searches started per sec over all browsers, 0 runs them back to back.
+        duration(float): sec during which searches start.
+        report(str): path of the JSON report, '-' for stdout.
+        stand_in(bool): run against the local stand-in site instead of the page objects' site (default=False).
+        profile(Optional[str]): Chrome launch profile name (default='default').
+    """
+    from lib.base.base import Base
+    from lib.tools.load import LoadConfig, StandInSite, run_load, write_report
+    from lib.utils.common.driver_setting import set_chrome_driver_options
+
+    site = StandInSite().start() if stand_in else None
+    try:
+        if site is not None:
+            Base.base_url = site.url
+        write_report(run_load(lambda: set_chrome_driver_options(True, profile),
+                              lambda session: search_google_scenario(session, search_text),
+                              LoadConfig(sessions, ramp_up, rate, duration)), report)
+    finally:
+        if site is not None:
+            site.stop()
+
+
+def search_google_job(driver: 'Remote', params: Dict[str, Any]) -> None:
+    """ Daemon job for search on google
+
+    Arguments:
+        driver(Remote): pooled webdriver of the daemon.
+        params(Dict[str, Any]): job params with 'search_text'.
+    """
+    run_search(driver, params['search_text'])
+
+
+def search_google_batch(source: str, workers: int, profile: Optional[str] = None) -> None:
+    """ Search every line of a file on google with parallel headless browsers
+
+    Arguments:
+        source(str): path of file with one search text per line, '-' for stdin.
+        workers(int): number of parallel browsers.
+        profile(Optional[str]): Chrome launch profile name (default='default').
+    """
+    from lib.base.driver_pool import DriverPool
+    from lib.tools.batch import BatchRunner, read_terms
+    from lib.utils.common.driver_setting import set_chrome_driver_options
+
+    pool = DriverPool(lambda: set_chrome_driver_options(True, profile), size=workers, max_uses=0)
+    runner = BatchRunner(pool, run_search, workers, sys.stdout)
+    try:
+        if source == '-':
+            runner.run(read_terms(sys.stdin))
+        else:
+            with open(source, encoding='utf8') as f:
+                runner.run(read_terms(f))
     finally:
-        teardown_driver(driver)
+        pool.close()
+
+
+def forward_search(search_text: str, socket_path: str) -> bool:
+    """ Forward search to the daemon when one is running
+
+    Arguments:
+        search_text(str): Text for search on google.
+        socket_path(str): Unix socket of the daemon.
+    Returns:
+        bool: return True if the daemon handled the search, False if no daemon is running.
+    Raises:
+        RuntimeError: the daemon failed to search.
+        TimeoutError: the daemon did not answer within JOB_TIMEOUT.
+    """
+    try:
+        response = send_job('search_google', {'search_text': search_text}, socket_path)
+    except DaemonUnavailable:
+        return False
+    if not response['ok']:
+        raise RuntimeError(f'Daemon failed to search: {response["error"]}')
+    return True
 
 
 if __name__ == '__main__':
@@ -40,11 +171,50 @@ if __name__ == '__main__':
         add_help=True,
     )
     # Add arguments
-    parser.add_argument('-s', '--search-text', help='*Required. Text for search on google', required=True)
-    parser.add_argument('-hl', '--headless', help='*Required. Show browser or not.', action='store_true')
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('-s', '--search-text', help='Text for search on google')
+    target.add_argument('-b', '--batch', help="File with one search text per line, '-' for stdin. Always headless.")
+    target.add_argument('-l', '--load', help='Search this text from --workers concurrent headless browsers and '
+                        'report the latency of each step.')
+    target.add_argument('-d', '--daemon', help='Keep headless browsers warm and serve searches on the socket.',
+                        action='store_true')
+    parser.add_argument('-hl', '--headless', help='Show browser or not.', action='store_true')
+    parser.add_argument('-w', '--workers', help='Number of parallel browsers for batch, daemon or load (default=4).',
+                        type=int, default=4)
+    parser.add_argument('--ramp-up', help='Load: sec until every browser runs (default=0).', type=float, default=0)
+    parser.add_argument('--rate', help='Load: searches started per sec, 0 runs them back to back (default=0).',
+                        type=float, default=0)
+    parser.add_argument('--duration', help='Load: sec during which searches start (default=60).', type=float,
+                        default=60)
+    parser.add_argument('--report', help="Load: JSON report file, '-' for stdout (default='-').", default='-')
+    parser.add_argument('--stand-in', help='Load: run against a local stand-in site instead of Google.',
+                        action='store_true')
+    parser.add_argument('--socket', help='Unix socket of the daemon (default=$COMMANDLINE_TOOL_SOCKET or tmp dir).')
+    parser.add_argument('--no-daemon', help='Run locally even when a daemon is running.', action='store_true')
+    parser.add_argument('-p', '--profile', choices=PROFILE_NAMES,
+                        help="Chrome launch profile (default='default'). "
+                        'A search with a profile runs locally instead of on the daemon.')
 
     # Analyse args
     args = parser.parse_args()
 
+    # Headless searches go to the daemon when one is running, before paying for selenium and logging setup.
+    forwardable = args.search_text and args.headless and not args.no_daemon and args.profile is None
+    if forwardable and forward_search(args.search_text, args.socket):
+        sys.exit(0)
+
+    from lib.utils.common.logger_setting import get_logger
+    get_logger()
+
     # Execute ui operation by selenium.
-    search_google(args.search_text, args.headless)
+    if args.daemon:
+        from lib.tools.daemon import serve
+        serve({'search_google': search_google_job}, browsers=args.workers, socket_path=args.socket,
+              profile=args.profile)
+    elif args.batch:
+        search_google_batch(args.batch, args.workers, args.profile)
+    elif args.load:
+        search_google_load(args.load, args.workers, args.ramp_up, args.rate, args.duration, args.report,
+                           args.stand_in, args.profile)
+    else:
+        search_google(args.search_text, args.headless, args.profile)
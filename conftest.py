@@ -3,10 +3,21 @@
 
 import logging
 import pytest
-from tests.base.driver import *
 
 logger = logging.getLogger(__name__)
 
+pytest_plugins = [
+    'tests.base.driver',
+    'tests.base.durations',
+    'tests.base.trace',
+    'tests.base.replay',
+    'tests.base.logs',
+    'tests.base.artifacts',
+    'tests.base.memory',
+    'tests.base.page_metrics',
+    'tests.base.session_state',
+]
+
 
 @pytest.fixture(scope='class')
 def conftests_fixture(driver_fixture):
@@ -2,14 +2,131 @@
 """Base class"""
 
 import logging
+import os
+import time
+from typing import Iterable, Optional, cast
+from urllib.parse import urljoin
+
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver import Remote
+from selenium.webdriver.support.ui import WebDriverWait
+
+from lib.utils.common.page_metrics import get_page_metrics_log, read_page_metrics
+from lib.utils.common.web_element.decorator import PageSnapshot, document_locators, snapshot_keys, take_snapshot
+from lib.utils.common.web_element.element import Element
+from lib.utils.common.web_element.trace import get_tracer
+from lib.utils.common.web_element.wait import PageReadiness, ReadinessRules, install_ready_hook, wait_until_ready
 
 logger = logging.getLogger(__name__)
 
+BASE_URL_ENV = 'POM_BASE_URL'
+
 
 class Base:
     """
     Base class for POM.
+
+    Attributes:
+        base_url(str): site root the page paths are joined to, $POM_BASE_URL or Google.
+            Point it to a replay server (lib.tools.replay) to run without the live site.
+        readiness(ReadinessRules): when a page of this class counts as usable in wait_until_ready.
     """
+    base_url: str = os.environ.get(BASE_URL_ENV) or 'https://www.google.com/'
+    readiness: ReadinessRules = ReadinessRules()
+
     def __init__(self, driver: Remote):
         self.driver = driver
+
+    @classmethod
+    def url(cls, path: str = '') -> str:
+        """ Absolute URL of a page path.
+
+        Arguments:
+            path(str): path relative to base_url (default='').
+        Returns:
+            str: URL.
+        """
+        return urljoin(cls.base_url if cls.base_url.endswith('/') else cls.base_url + '/', path.lstrip('/'))
+
+    def navigate(self, path: str = '') -> None:
+        """ Load a page path of the site, dropping the WebElements of the previous page.
+        While the page metrics log is enabled, the load performance is recorded with one more script call.
+        With DevTools, requests are counted for wait_until_ready from the start of the document.
+
+        Arguments:
+            path(str): path relative to base_url (default='').
+        """
+        url = self.url(path)
+        logger.debug("Navigate to %s", url)
+        Element.invalidate_cache(self.driver)
+        install_ready_hook(self.driver)
+        self.driver.get(url)
+        log = get_page_metrics_log()
+        if log.enabled:
+            metrics = read_page_metrics(self.driver, type(self).__name__)
+            if metrics is not None:
+                log.add(metrics)
+
+    def snapshot(self, keys: Optional[Iterable[str]] = None) -> PageSnapshot:
+        """ Resolve every declared Test ID with one WebDriver round trip.
+
+        Arguments:
+            keys(Optional[Iterable[str]]): Test ID keys to resolve, all declared keys when None.
+        Returns:
+            PageSnapshot: presence, visibility and WebElements of each key.
+        Raises:
+            ValueError: a key is not declared or has format fields.
+        """
+        return take_snapshot(self, keys)
+
+    def wait_until_ready(self, keys: Iterable[str] = (), max_wait: float = 30) -> PageReadiness:
+        """ Wait until the page is usable by the rules in readiness, then until Test IDs are present.
+        Returns as soon as the page is quiet instead of waiting for a fixed time. A page never quiet,
+        e.g. polling every few msec, is used once its Test IDs are present on the complete document.
+
+        Arguments:
+            keys(Iterable[str]): Test ID keys to wait for once the page is ready (default=()).
+            max_wait(float): maximum wait time for both in seconds (default=30sec).
+        Returns:
+            PageReadiness: how the page got ready.
+        Raises:
+            ValueError: a key is not declared or has format fields.
+            TimeoutException: elements are not present.
+        """
+        keys = snapshot_keys(self, keys)
+        started = time.monotonic()
+        with get_tracer().command('wait:ready', 'script', 'readiness', type(self).__name__):
+            readiness = wait_until_ready(self.driver, self.readiness, max_wait, document_locators(self, keys))
+        if not readiness.ready:
+            logger.info("%s not ready after %.1f sec: readyState %s, %s request(s) in flight.", type(self).__name__,
+                        readiness.waited, readiness.ready_state, readiness.pending_requests)
+        if keys:
+            self.wait_for_elements(keys, max_wait=max(max_wait - (time.monotonic() - started), 1))
+        return readiness
+
+    def wait_for_elements(self, keys: Iterable[str], visible: bool = False, max_wait: float = 10) -> PageSnapshot:
+        """ Wait until Test IDs are present (or visible), one snapshot round trip per poll.
+
+        Arguments:
+            keys(Iterable[str]): Test ID keys to wait for.
+            visible(bool): wait for visibility instead of presence (default=False).
+            max_wait(float): maximum wait time for display elements (default=10sec).
+        Returns:
+            PageSnapshot: snapshot of every declared Test ID once the keys are ready.
+        Raises:
+            ValueError: a key is not declared or has format fields.
+            TimeoutException: elements are not ready.
+        """
+        keys = snapshot_keys(self, keys)
+
+        def ready(_: Remote) -> Optional[PageSnapshot]:
+            snapshot = self.snapshot()
+            if snapshot.all_visible(keys) if visible else snapshot.all_present(keys):
+                return snapshot
+            return None
+
+        try:
+            return cast(PageSnapshot, WebDriverWait(self.driver, max_wait).until(ready))
+        except TimeoutException as e:
+            e.msg = f'Waiting for {max_wait} sec, but elements {keys} of {type(self).__name__} are Not Found.'
+            raise e
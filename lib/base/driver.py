@@ -2,7 +2,11 @@
 """ Base of test class """
 
 import logging
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
 from selenium.webdriver import Remote, Chrome
+from lib.base.driver_pool import get_driver_pool
 from lib.utils.common.driver_setting import set_chrome_driver_options
 
 logger = logging.getLogger(__name__)
@@ -31,3 +35,18 @@ def teardown_driver(driver: Remote) -> None:
     """
     driver.quit()
     logger.info("Webdriver closed.")
+
+
+@contextmanager
+def pooled_chrome_driver(headless: bool = True, profile: Optional[str] = None) -> Iterator[Remote]:
+    """ Borrow a warm Chrome webdriver from the shared pool
+
+    Arguments:
+        headless(bool): Show browser or not.
+        profile(Optional[str]): Chrome launch profile name (default='default').
+
+    Yields:
+        driver(Remote): Chrome webdriver, returned to the pool on exit.
+    """
+    with get_driver_pool(headless, profile=profile).borrow() as driver:
+        yield driver
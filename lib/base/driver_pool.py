@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+""" Pool of reusable webdrivers """
+
+import atexit
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver import Remote
+
+from lib.utils.common.driver_setting import set_chrome_driver_options
+
+logger = logging.getLogger(__name__)
+
+DriverFactory = Callable[[], Remote]
+
+# Reason to retire a released driver, None to reuse it
+RetireCheck = Callable[[Remote], Optional[str]]
+
+BLANK_URL = 'about:blank'
+
+CLEAR_STORAGE_JS = """
+try { window.localStorage.clear(); } catch (e) {}
+try { window.sessionStorage.clear(); } catch (e) {}
+"""
+
+
+class DriverPoolError(Exception):
+    """ Failed to hand out a driver from the pool """
+
+
+class _PooledDriver:
+    """ Driver held by the pool with its usage count. """
+
+    def __init__(self, driver: Remote) -> None:
+        self.driver = driver
+        self.uses = 0
+
+
+class DriverPool:
+    """ Pool of warm webdriver sessions.
+    Drivers are reset between borrowers, health-checked before being handed out
+    and retired after `max_uses` borrows or when they crash.
+    Attributes:
+        size(int): maximum number of live drivers.
+        max_uses(int): number of borrows before a driver is retired (0 means unlimited).
+        acquire_timeout(float): maximum wait time for a free driver (default=300sec).
+        retire_when(Optional[RetireCheck]): called on release, a driver is retired when it returns
+            a reason, e.g. memory_recycle_reason (default=None).
+    """
+
+    def __init__(self,
+                 factory: DriverFactory,
+                 size: int = 1,
+                 max_uses: int = 50,
+                 acquire_timeout: float = 300,
+                 retire_when: Optional[RetireCheck] = None) -> None:
+        if size < 1:
+            raise ValueError(f'Invalid pool size: {size}')
+        self._factory = factory
+        self.size = size
+        self.max_uses = max_uses
+        self.acquire_timeout = acquire_timeout
+        self.retire_when = retire_when
+        self._idle: List[_PooledDriver] = []
+        self._in_use: Dict[int, _PooledDriver] = {}
+        self._live = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def acquire(self) -> Remote:
+        """ Borrow a warm driver, launching a new one while under `size`.
+        Returns:
+            Remote: healthy webdriver reset to a blank page.
+        Raises:
+            DriverPoolError: pool is closed or no driver became free in time.
+            Exception: the driver factory failed to launch a browser.
+        """
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            pooled: Optional[_PooledDriver] = None
+            with self._cond:
+                while not self._idle and self._live >= self.size:
+                    if self._closed:
+                        raise DriverPoolError('Driver pool is closed.')
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise DriverPoolError(
+                            f'Waiting for {self.acquire_timeout} sec, but no driver was released.')
+                    self._cond.wait(remaining)
+                if self._closed:
+                    raise DriverPoolError('Driver pool is closed.')
+                if self._idle:
+                    pooled = self._idle.pop()
+                else:
+                    self._live += 1
+
+            if pooled is None:
+                try:
+                    pooled = _PooledDriver(self._factory())
+                except Exception:
+                    self._forget()
+                    raise
+                logger.info("Webdriver created for pool (%s/%s).", self._live, self.size)
+            elif not self._is_healthy(pooled.driver):
+                self._retire(pooled, 'failed health check')
+                continue
+
+            with self._cond:
+                self._in_use[id(pooled.driver)] = pooled
+            return pooled.driver
+
+    def release(self, driver: Remote, discard: bool = False) -> None:
+        """ Return a borrowed driver to the pool.
+        Arguments:
+            driver(Remote): driver obtained from acquire().
+            discard(bool): retire the driver instead of reusing it (default=False).
+        """
+        with self._cond:
+            pooled = self._in_use.pop(id(driver), None)
+        if pooled is None:
+            logger.warning("Released driver does not belong to the pool.")
+            return
+        pooled.uses += 1
+        reason = self.retire_when(driver) if self.retire_when and not discard else None
+
+        if discard:
+            self._retire(pooled, 'discarded by borrower')
+        elif self._closed:
+            self._retire(pooled, 'pool closed')
+        elif self.max_uses and pooled.uses >= self.max_uses:
+            self._retire(pooled, f'reached {self.max_uses} uses')
+        elif reason:
+            self._retire(pooled, reason)
+        elif not self._reset(pooled.driver):
+            self._retire(pooled, 'failed to reset')
+        else:
+            with self._cond:
+                self._idle.append(pooled)
+                self._cond.notify()
+
+    @contextmanager
+    def borrow(self) -> Iterator[Remote]:
+        """ Borrow a driver for the duration of a with block.
+        A driver that stops responding while borrowed is retired.
+        Yields:
+            Remote: healthy webdriver.
+        """
+        driver = self.acquire()
+        try:
+            yield driver
+        except WebDriverException:
+            self.release(driver, discard=not self._is_healthy(driver))
+            raise
+        except BaseException:
+            self.release(driver)
+            raise
+        self.release(driver)
+
+    def close(self) -> None:
+        """ Quit every idle driver. Drivers still borrowed are quit on release. """
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for pooled in idle:
+            self._retire(pooled, 'pool closed')
+
+    @staticmethod
+    def _is_healthy(driver: Remote) -> bool:
+        """ Check the driver still answers commands.
+        Arguments:
+            driver(Remote): webdriver.
+        Returns:
+            bool: return True if the browser responded, False otherwise.
+        """
+        try:
+            driver.execute_script('return 1')
+        except WebDriverException as e:
+            logger.warning("Webdriver health check failed: %s", e)
+            return False
+        return True
+
+    @staticmethod
+    def _reset(driver: Remote) -> bool:
+        """ Clear tabs, cookies, storage and URL left by the previous borrower.
+        With DevTools, cookies of every domain, the storage of every origin and the history are cleared.
+        Otherwise only the cookies and storage of the current page can be cleared. The first tab is kept, so
+        DevTools state attached to it (network interception, scripts run on new documents) stays in place.
+        Arguments:
+            driver(Remote): webdriver.
+        Returns:
+            bool: return True if the driver was reset, False otherwise.
+        """
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            if not _clear_browsing_data(driver):
+                driver.execute_script(CLEAR_STORAGE_JS)
+                driver.delete_all_cookies()
+                driver.get(BLANK_URL)
+        except WebDriverException as e:
+            logger.warning("Failed to reset webdriver: %s", e)
+            return False
+        return True
+
+    def _retire(self, pooled: _PooledDriver, reason: str) -> None:
+        """ Quit a driver and free its slot.
+        Arguments:
+            pooled(_PooledDriver): driver to retire.
+            reason(str): reason written to the log.
+        """
+        try:
+            pooled.driver.quit()
+        except WebDriverException as e:
+            logger.debug("Ignored error while quitting webdriver: %s", e)
+        self._forget()
+        logger.info("Webdriver retired from pool after %s uses: %s.", pooled.uses, reason)
+
+    def _forget(self) -> None:
+        """ Release the slot of a driver that is no longer live. """
+        with self._cond:
+            self._live -= 1
+            self._cond.notify()
+
+
+def _origin(url: str) -> Optional[str]:
+    """ Origin of a web URL, None for about:, data: and other URLs without storage of their own. """
+    parts = urlsplit(url)
+    return f'{parts.scheme}://{parts.netloc}' if parts.scheme in ('http', 'https') and parts.netloc else None
+
+
+def _clear_browsing_data(driver: Remote) -> bool:
+    """ Clear the cookies of every domain, the storage of the origins the tab visited or holds cookies of and the
+    history of the tab through DevTools, leaving it on a blank page.
+    Arguments:
+        driver(Remote): webdriver with a single tab.
+    Returns:
+        bool: return True if cleared, False when the driver has no DevTools.
+    Raises:
+        WebDriverException: the browser failed to clear.
+    """
+    try:
+        history = driver.execute_cdp_cmd('Page.getNavigationHistory', {})['entries']
+    except (AttributeError, WebDriverException) as e:
+        logger.debug("Browsing data cleared for the current page only: %s", e)
+        return False
+    origins: Set[Optional[str]] = {_origin(entry['url']) for entry in history}
+    # Leave the page first, so its scripts cannot write the storage again once cleared.
+    driver.execute_script(CLEAR_STORAGE_JS)
+    driver.get(BLANK_URL)
+    for cookie in driver.execute_cdp_cmd('Network.getAllCookies', {})['cookies']:
+        domain = cookie['domain'].lstrip('.')
+        origins.update((f'http://{domain}', f'https://{domain}'))
+    driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+    for origin in sorted(origin for origin in origins if origin):
+        driver.execute_cdp_cmd('Storage.clearDataForOrigin', {'origin': origin, 'storageTypes': 'all'})
+        # sessionStorage belongs to the tab, Storage.clearDataForOrigin leaves it.
+        driver.execute_cdp_cmd('DOMStorage.clear', {'storageId': {'securityOrigin': origin, 'isLocalStorage': False}})
+    driver.execute_cdp_cmd('Page.resetNavigationHistory', {})
+    return True
+
+
+_pools: Dict[Tuple[bool, str], DriverPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_driver_pool(headless: bool = True, size: int = 1, max_uses: int = 50,
+                    profile: Optional[str] = None) -> DriverPool:
+    """ Get the process wide pool of Chrome drivers, creating it on first use.
+    Arguments:
+        headless(bool): Show browser or not.
+        profile(Optional[str]): Chrome launch profile name (default='default').
+        size(int): maximum number of live drivers, used only when the pool is created.
+        max_uses(int): number of borrows before a driver is retired, used only when the pool is created.
+    Returns:
+        DriverPool: shared driver pool.
+    """
+    key = (headless, profile or 'default')
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = DriverPool(lambda: set_chrome_driver_options(headless, profile),
+                              size=size,
+                              max_uses=max_uses)
+            _pools[key] = pool
+        return pool
+
+
+@atexit.register
+def close_driver_pools() -> None:
+    """ Quit the drivers of every shared pool. """
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
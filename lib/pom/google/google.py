@@ -24,7 +24,9 @@ class Google:
         """ Open the Google Top Page
         """
         logger.info("Open Google Top page from URL.")
-        self.driver.get('https://www.google.com/')
+        home = self.home
+        home.navigate()
+        home.wait_until_ready()
 
     def close(self) -> None:
         """
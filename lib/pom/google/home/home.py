@@ -34,5 +34,6 @@ class Home(Base):
             TimeoutException: Failed to open page.
         """
         logger.info("Open Google Search Home page from URL.")
-        self.driver.get('https://www.google.com/')
-        self.page_id.get(max_wait=wait_time)
+        self.navigate()
+        # Waits in the browser until the page is quiet or page_id is present, then one snapshot resolves the Test IDs.
+        self.wait_until_ready(['page_id'], max_wait=wait_time)
@@ -0,0 +1,2 @@
+#!/usr/bin/env python3
+"""This module is the runners behind commandline_tool"""
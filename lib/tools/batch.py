@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+""" Batch runner spreading search terms across parallel webdriver workers """
+
+import json
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, TextIO, Tuple
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver import Remote
+
+from lib.base.driver_pool import DriverPool
+
+logger = logging.getLogger(__name__)
+
+BatchTask = Callable[[Remote, str], None]
+
+""" Number of consecutive driver launch failures before a worker gives up """
+MAX_LAUNCH_FAILURES = 3
+
+
+def read_terms(source: TextIO) -> Iterator[str]:
+    """ Read one search term per line, skipping blank lines.
+    Arguments:
+        source(TextIO): file or stdin.
+    Yields:
+        str: search term.
+    """
+    for line in source:
+        term = line.strip()
+        if term:
+            yield term
+
+
+class BatchRunner:
+    """ Run a task for every term on `workers` threads, each holding its own long-lived driver.
+    Results are streamed as JSON lines as soon as each item finishes.
+    Attributes:
+        pool(DriverPool): pool the workers borrow their driver from.
+        task(BatchTask): operation executed for each term.
+        workers(int): number of parallel workers.
+        out(TextIO): stream receiving JSON lines.
+    """
+
+    def __init__(self, pool: DriverPool, task: BatchTask, workers: int, out: TextIO) -> None:
+        self.pool = pool
+        self.task = task
+        self.workers = workers
+        self.out = out
+        # None tells a worker the input is exhausted
+        self._queue: 'queue.Queue[Optional[Tuple[int, str]]]' = queue.Queue()
+        self._out_lock = threading.Lock()
+        self._succeeded = 0
+        self._failed = 0
+
+    def run(self, terms: Iterable[str]) -> Dict[str, Any]:
+        """ Process every term and write the throughput summary.
+        Workers start before the input is read, so items of a stream such as stdin run as they arrive.
+        A worker borrows its driver when it gets its first item.
+        Arguments:
+            terms(Iterable[str]): search terms.
+        Returns:
+            Dict[str, Any]: throughput summary.
+        """
+        started = time.monotonic()
+        threads = [
+            threading.Thread(target=self._work, args=(n, ), name=f'batch-worker-{n}', daemon=True)
+            for n in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        total = 0
+        for index, term in enumerate(terms):
+            self._queue.put((index, term))
+            total += 1
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join()
+
+        # Every worker gave up: report what is left instead of dropping it.
+        for index, term in self._drain():
+            self._emit(index, term, None, 0.0, 'No live worker left to run this item.')
+
+        elapsed = time.monotonic() - started
+        summary = {
+            'type': 'summary',
+            'total': total,
+            'succeeded': self._succeeded,
+            'failed': self._failed,
+            'workers': min(self.workers, total),
+            'elapsed': round(elapsed, 3),
+            'throughput_per_sec': round(total / elapsed, 3) if elapsed > 0 else 0.0,
+        }
+        self._write(summary)
+        logger.info("Batch finished: %s/%s succeeded in %.1f sec.", self._succeeded, total, elapsed)
+        return summary
+
+    def _work(self, worker: int) -> None:
+        """ Worker loop: keep one driver and pull terms until the end of the input.
+        Arguments:
+            worker(int): worker number.
+        """
+        driver: Optional[Remote] = None
+        launch_failures = 0
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    return
+                index, term = item
+
+                if driver is None:
+                    try:
+                        driver = self.pool.acquire()
+                        launch_failures = 0
+                    except Exception as e:  # pylint: disable=broad-except
+                        launch_failures += 1
+                        self._emit(index, term, worker, 0.0, f'Failed to launch webdriver: {e}')
+                        if launch_failures >= MAX_LAUNCH_FAILURES:
+                            logger.error("Batch worker %s stopped after %s launch failures.", worker,
+                                         launch_failures)
+                            return
+                        continue
+
+                started = time.monotonic()
+                try:
+                    self.task(driver, term)
+                except Exception as e:  # pylint: disable=broad-except
+                    self._emit(index, term, worker, time.monotonic() - started, f'{type(e).__name__}: {e}')
+                    if isinstance(e, WebDriverException):
+                        # Hand back a possibly crashed browser; the pool health-checks it.
+                        self.pool.release(driver)
+                        driver = None
+                else:
+                    self._emit(index, term, worker, time.monotonic() - started, None)
+        finally:
+            if driver is not None:
+                self.pool.release(driver)
+
+    def _drain(self) -> Iterator[Tuple[int, str]]:
+        """ Pop every item still queued, skipping the end markers of the workers that gave up.
+        Yields:
+            Tuple[int, str]: index and term.
+        """
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None:
+                yield item
+
+    def _emit(self, index: int, term: str, worker: Optional[int], elapsed: float, error: Optional[str]) -> None:
+        """ Write the result of one item.
+        Arguments:
+            index(int): position of the term in the input.
+            term(str): search term.
+            worker(Optional[int]): worker number, None when no worker ran it.
+            elapsed(float): wall time of the task in seconds.
+            error(Optional[str]): error message, None when the task succeeded.
+        """
+        record = {
+            'type': 'result',
+            'index': index,
+            'search_text': term,
+            'ok': error is None,
+            'worker': worker,
+            'elapsed': round(elapsed, 3),
+            'error': error,
+        }
+        self._write(record)
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        """ Write one JSON line and count the result.
+        Arguments:
+            record(Dict[str, Any]): record to write.
+        """
+        with self._out_lock:
+            if record['type'] == 'result':
+                if record['ok']:
+                    self._succeeded += 1
+                else:
+                    self._failed += 1
+            self.out.write(json.dumps(record) + '\n')
+            self.out.flush()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+""" Daemon keeping warm browsers alive and running jobs sent over a Unix socket
+
+The client half of this module only uses the standard library so that
+forwarding a job does not pay for importing selenium.
+"""
+
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, cast
+
+if TYPE_CHECKING:
+    from selenium.webdriver import Remote
+    from lib.base.driver_pool import DriverPool
+
+logger = logging.getLogger(__name__)
+
+DaemonJob = Callable[['Remote', Dict[str, Any]], None]
+
+SOCKET_ENV = 'COMMANDLINE_TOOL_SOCKET'
+
+# Maximum wait time for the result of a job in seconds
+JOB_TIMEOUT = 120.0
+
+
+def default_socket_path() -> str:
+    """ Socket path from $COMMANDLINE_TOOL_SOCKET, or one per user in the temp directory.
+    Returns:
+        str: path of the Unix socket.
+    """
+    return os.environ.get(SOCKET_ENV) or os.path.join(tempfile.gettempdir(),
+                                                      f'commandline_tool-{os.getuid()}.sock')
+
+
+class DaemonUnavailable(Exception):
+    """ No daemon is listening on the socket """
+
+
+def send_job(op: str, params: Dict[str, Any], socket_path: Optional[str] = None,
+             timeout: float = JOB_TIMEOUT) -> Dict[str, Any]:
+    """ Forward a job to the daemon and wait for its result.
+    Arguments:
+        op(str): job name.
+        params(Dict[str, Any]): job arguments.
+        socket_path(Optional[str]): Unix socket of the daemon (default=default_socket_path()).
+        timeout(float): maximum wait time for the connection and the result in seconds (default=JOB_TIMEOUT).
+    Returns:
+        Dict[str, Any]: response with 'ok', 'elapsed' and 'error' keys.
+    Raises:
+        DaemonUnavailable: no daemon is listening.
+        TimeoutError: the daemon did not answer in time, the job may still run.
+    """
+    path = socket_path or default_socket_path()
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        try:
+            sock.connect(path)
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            raise DaemonUnavailable(f'No daemon is listening on "{path}".') from e
+        sock.sendall(json.dumps({'op': op, 'params': params}).encode('utf8') + b'\n')
+        with sock.makefile('rb') as reader:
+            line = reader.readline()
+    except socket.timeout as e:
+        raise TimeoutError(f'Daemon on "{path}" did not answer {op} within {timeout} sec.') from e
+    finally:
+        sock.close()
+    if not line:
+        raise DaemonUnavailable(f'Daemon on "{path}" closed the connection.')
+    return cast(Dict[str, Any], json.loads(line))
+
+
+class _JobHandler(socketserver.StreamRequestHandler):
+    """ Run one JSON line job per connection. """
+    server: '_DaemonServer'
+
+    def handle(self) -> None:
+        """ Read the job, run it on a pooled driver and write the result. """
+        started = time.monotonic()
+        error: Optional[str] = None
+        try:
+            request = json.loads(self.rfile.readline())
+            op = request.get('op')
+            if op == 'ping':
+                pass
+            elif op in self.server.jobs:
+                with self.server.pool.borrow() as driver:
+                    self.server.jobs[op](driver, request.get('params') or {})
+            else:
+                error = f'Unknown job: {op}'
+        except Exception as e:  # pylint: disable=broad-except
+            logger.exception("Daemon job failed.")
+            error = f'{type(e).__name__}: {e}'
+        response = {'ok': error is None, 'elapsed': round(time.monotonic() - started, 3), 'error': error}
+        self.wfile.write(json.dumps(response).encode('utf8') + b'\n')
+
+
+class _DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """ Threaded Unix socket server sharing one driver pool. """
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, pool: 'DriverPool', jobs: Dict[str, DaemonJob]) -> None:
+        self.pool = pool
+        self.jobs = jobs
+        super().__init__(socket_path, _JobHandler)
+
+
+def _interrupt(signum: int, _frame: Any) -> None:
+    """ Turn SIGTERM into KeyboardInterrupt so the daemon quits its browsers. """
+    raise KeyboardInterrupt(f'Received signal {signum}')
+
+
+def serve(jobs: Dict[str, DaemonJob], browsers: int = 1, headless: bool = True,
+          socket_path: Optional[str] = None, profile: Optional[str] = None) -> None:
+    """ Launch `browsers` warm drivers and serve jobs until interrupted.
+    Arguments:
+        jobs(Dict[str, DaemonJob]): job name to function run with a pooled driver.
+        browsers(int): number of warm browsers, which is also the job concurrency (default=1).
+        headless(bool): Show browser or not (default=True).
+        socket_path(Optional[str]): Unix socket to listen on (default=default_socket_path()).
+        profile(Optional[str]): Chrome launch profile name (default='default').
+    Raises:
+        RuntimeError: another daemon is already listening on the socket.
+    """
+    # pylint: disable=import-outside-toplevel
+    from lib.base.driver_pool import DriverPool
+    from lib.utils.common.driver_setting import set_chrome_driver_options
+
+    path = socket_path or default_socket_path()
+    if os.path.exists(path):
+        try:
+            send_job('ping', {}, path, timeout=5)
+        except (DaemonUnavailable, OSError):
+            os.unlink(path)  # left behind by a daemon that did not shut down cleanly
+        else:
+            raise RuntimeError(f'A daemon is already listening on "{path}".')
+
+    pool = DriverPool(lambda: set_chrome_driver_options(headless, profile), size=browsers, max_uses=0)
+    warm = [pool.acquire() for _ in range(browsers)]
+    for driver in warm:
+        pool.release(driver)
+
+    server = _DaemonServer(path, pool, jobs)
+    os.chmod(path, 0o600)
+    logger.info("Daemon listening on %s with %s warm browser(s).", path, browsers)
+    thread = threading.Thread(target=server.serve_forever, name='daemon-server', daemon=True)
+    thread.start()
+    signal.signal(signal.SIGTERM, _interrupt)
+    try:
+        thread.join()
+    except KeyboardInterrupt:
+        logger.info("Daemon stopping.")
+    finally:
+        server.shutdown()
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+        pool.close()
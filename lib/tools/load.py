@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+""" Load generation: run a POM scenario on many concurrent browser sessions
+
+Sessions start one after another over the ramp-up, then take iterations
+from a shared schedule paced at the target rate until the duration is over.
+The latency of every step of the scenario is recorded, and the report gives
+p50/p95/p99, a histogram and the error rate of each step. Paced runs also
+record each iteration from its scheduled start, so iterations delayed by a
+slow one before them are not left out of the latencies (coordinated omission).
+
+The stand-in site serves a minimal page with the Test IDs of the Google
+Search Home page object, so scenarios can be run without the live site.
+"""
+
+import json
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver import Remote
+
+from lib.base.driver_pool import DriverFactory, DriverPool
+from lib.tools.batch import MAX_LAUNCH_FAILURES
+
+logger = logging.getLogger(__name__)
+
+# Step recording the whole scenario
+ITERATION = 'iteration'
+
+# Step recording the whole scenario from its scheduled start, in paced runs
+SCHEDULED = 'iteration_from_schedule'
+
+# Upper bounds of the latency histogram buckets in msec, the last bucket is unbounded
+HISTOGRAM_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Sleep granularity of the pacing loop, so sessions notice the end of the run
+PACING_SLICE = 0.5
+
+
+class LoadConfig(NamedTuple):
+    """ Shape of the load.
+    Attributes:
+        sessions(int): concurrent browser sessions.
+        ramp_up(float): time until every session runs in sec, sessions start evenly spread over it.
+        rate(float): iterations started per sec over all sessions, 0 runs them back to back.
+        duration(float): time during which iterations start in sec, ramp-up included.
+    """
+    sessions: int = 1
+    ramp_up: float = 0
+    rate: float = 0
+    duration: float = 60
+
+
+def percentile(values: List[float], q: float) -> float:
+    """ Nearest-rank percentile.
+    Arguments:
+        values(List[float]): sorted values, not empty.
+        q(float): percentile between 0 and 100.
+    Returns:
+        float: value below which q percent of the values are.
+    """
+    rank = max(int(-(-q * len(values) // 100)), 1)
+    return values[min(rank, len(values)) - 1]
+
+
+class StepStats:
+    """ Latencies and errors of one step.
+    Attributes:
+        count(int): number of runs of the step.
+        latencies(List[float]): wall time of every run of the step in msec, failed ones included when they ran.
+        errors(Dict[str, int]): number of failures by exception class name.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.latencies: List[float] = []
+        self.errors: Dict[str, int] = {}
+
+    def add(self, elapsed_ms: Optional[float], error: Optional[str] = None) -> None:
+        """ Record one run of the step.
+        Arguments:
+            elapsed_ms(Optional[float]): wall time in msec, None when the step failed before it started.
+            error(Optional[str]): exception class name, None when the step succeeded.
+        """
+        self.count += 1
+        if elapsed_ms is not None:
+            self.latencies.append(elapsed_ms)
+        if error is not None:
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+    def summary(self) -> Dict[str, Any]:
+        """ Percentiles, histogram and error rate.
+        Returns:
+            Dict[str, Any]: figures of the step, latencies in msec.
+        """
+        values = sorted(self.latencies)
+        failed = sum(self.errors.values())
+        summary: Dict[str, Any] = {
+            'count': self.count,
+            'errors': failed,
+            'error_rate': round(failed / self.count, 4) if self.count else 0.0,
+            'errors_by_type': dict(self.errors),
+        }
+        if not values:
+            return summary
+        histogram: Dict[str, int] = {}
+        for value in values:
+            bucket = next((f'<={bound}' for bound in HISTOGRAM_MS if value <= bound), f'>{HISTOGRAM_MS[-1]}')
+            histogram[bucket] = histogram.get(bucket, 0) + 1
+        summary.update({
+            'mean_ms': round(sum(values) / len(values), 1),
+            'p50_ms': round(percentile(values, 50), 1),
+            'p95_ms': round(percentile(values, 95), 1),
+            'p99_ms': round(percentile(values, 99), 1),
+            'max_ms': round(values[-1], 1),
+            'histogram': histogram,
+        })
+        return summary
+
+
+class LoadSession:
+    """ Browser session running iterations of a scenario.
+    Attributes:
+        driver(Remote): webdriver of the session.
+        number(int): session number.
+        iteration(int): iteration being run, counted over all sessions.
+    """
+
+    def __init__(self, runner: 'LoadRunner', driver: Remote, number: int, iteration: int) -> None:
+        self.driver = driver
+        self.number = number
+        self.iteration = iteration
+        self._runner = runner
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        """ Time a step of the scenario. A failing step is recorded as an error and the exception goes on.
+        Arguments:
+            name(str): step name, the same across iterations.
+        Yields:
+            None
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self._runner.record(name, (time.perf_counter() - started) * 1000, type(e).__name__)
+            raise
+        self._runner.record(name, (time.perf_counter() - started) * 1000)
+
+
+Scenario = Callable[[LoadSession], None]
+
+
+class LoadRunner:
+    """ Run a scenario on concurrent sessions, each holding its own driver from the pool.
+    Attributes:
+        pool(DriverPool): pool the sessions borrow their driver from, at least config.sessions large.
+        scenario(Scenario): one iteration, timing its steps with LoadSession.step.
+        config(LoadConfig): shape of the load.
+    """
+
+    def __init__(self, pool: DriverPool, scenario: Scenario, config: LoadConfig) -> None:
+        self.pool = pool
+        self.scenario = scenario
+        self.config = config
+        self.stats: Dict[str, StepStats] = {}
+        self._lock = threading.Lock()
+        self._started = 0.0
+        self._scheduled = 0
+
+    def run(self) -> Dict[str, Any]:
+        """ Run the load and summarize it.
+        Returns:
+            Dict[str, Any]: report with the config, the achieved rate and the figures of each step.
+        """
+        self._started = time.monotonic()
+        threads = [threading.Thread(target=self._session, args=(n, ), name=f'load-session-{n}', daemon=True)
+                   for n in range(self.config.sessions)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - self._started
+        iterations = self.stats.get(ITERATION, StepStats())
+        report = {
+            'config': self.config._asdict(),
+            'elapsed': round(elapsed, 3),
+            'iterations': iterations.count,
+            'achieved_rate': round(iterations.count / elapsed, 3) if elapsed > 0 else 0.0,
+            'steps': {name: stats.summary() for name, stats in self.stats.items()},
+        }
+        logger.info("Load finished: %s iterations in %.1f sec, %s failed.", report['iterations'], elapsed,
+                    sum(iterations.errors.values()))
+        return report
+
+    def record(self, step: str, elapsed_ms: Optional[float], error: Optional[str] = None) -> None:
+        """ Record one run of a step.
+        Arguments:
+            step(str): step name.
+            elapsed_ms(Optional[float]): wall time in msec, None when the step failed before it started.
+            error(Optional[str]): exception class name, None when the step succeeded.
+        """
+        with self._lock:
+            self.stats.setdefault(step, StepStats()).add(elapsed_ms, error)
+
+    def _next_start(self) -> Optional[Tuple[int, float]]:
+        """ Take the next iteration from the shared schedule.
+        Returns:
+            Optional[Tuple[int, float]]: iteration and monotonic time to start it at, None when the duration is over.
+        """
+        end = self._started + self.config.duration
+        with self._lock:
+            if self.config.rate:
+                start = self._started + self._scheduled / self.config.rate
+            else:
+                start = time.monotonic()
+            if start >= end:
+                return None
+            self._scheduled += 1
+            return self._scheduled - 1, start
+
+    def _sleep_until(self, when: float) -> None:
+        """ Sleep until a monotonic time.
+        Arguments:
+            when(float): monotonic time.
+        """
+        while True:
+            remaining = when - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, PACING_SLICE))
+
+    def _session(self, number: int) -> None:
+        """ Session loop: start after its ramp-up offset, then run scheduled iterations.
+        Arguments:
+            number(int): session number.
+        """
+        self._sleep_until(self._started + self.config.ramp_up * number / max(self.config.sessions, 1))
+        driver: Optional[Remote] = None
+        launch_failures = 0
+        try:
+            while True:
+                scheduled = self._next_start()
+                if scheduled is None:
+                    return
+                iteration, start = scheduled
+                if driver is None:
+                    try:
+                        driver = self.pool.acquire()
+                        launch_failures = 0
+                    except Exception as e:  # pylint: disable=broad-except
+                        launch_failures += 1
+                        self.record(ITERATION, None, type(e).__name__)
+                        if launch_failures >= MAX_LAUNCH_FAILURES:
+                            logger.error("Load session %s stopped after %s launch failures.", number,
+                                         launch_failures)
+                            return
+                        continue
+                self._sleep_until(start)
+                session = LoadSession(self, driver, number, iteration)
+                error: Optional[str] = None
+                try:
+                    with session.step(ITERATION):
+                        self.scenario(session)
+                except WebDriverException as e:
+                    error = type(e).__name__
+                    # Hand back a possibly crashed browser; the pool health-checks it.
+                    self.pool.release(driver)
+                    driver = None
+                except Exception as e:  # pylint: disable=broad-except
+                    error = type(e).__name__
+                    logger.debug("Load session %s iteration failed: %s", number, e)
+                if self.config.rate:
+                    self.record(SCHEDULED, (time.monotonic() - start) * 1000, error)
+        finally:
+            if driver is not None:
+                self.pool.release(driver)
+
+
+def run_load(factory: DriverFactory, scenario: Scenario, config: LoadConfig) -> Dict[str, Any]:
+    """ Run a load on a pool of config.sessions drivers, quit once the load is over.
+    Arguments:
+        factory(DriverFactory): launches a browser.
+        scenario(Scenario): one iteration.
+        config(LoadConfig): shape of the load.
+    Returns:
+        Dict[str, Any]: report of LoadRunner.run.
+    """
+    pool = DriverPool(factory, size=config.sessions, max_uses=0)
+    try:
+        return LoadRunner(pool, scenario, config).run()
+    finally:
+        pool.close()
+
+
+def write_report(report: Dict[str, Any], path: str) -> None:
+    """ Write a load report as JSON.
+    Arguments:
+        report(Dict[str, Any]): result of LoadRunner.run.
+        path(str): report file, '-' for stdout.
+    """
+    if path == '-':
+        sys.stdout.write(json.dumps(report, indent=2) + '\n')
+        return
+    with open(path, 'w', encoding='utf8') as f:
+        json.dump(report, f, indent=2)
+    logger.info("Load report written to %s", path)
+
+
+STAND_IN_HOME = b"""<!DOCTYPE html>
+<html><head><title>Stand-in search</title></head>
+<body><div id="gsr">
+<form id="tsf" action="/search" method="get">
+<input name="q" type="text" autocomplete="off">
+<input name="btnK" type="submit" value="Search">
+</form>
+</div></body></html>
+"""
+
+STAND_IN_RESULTS = """<!DOCTYPE html>
+<html><head><title>{query} - Stand-in search</title></head>
+<body><div id="gsr"><div id="search">{results}</div></div></body></html>
+"""
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """ Serve the stand-in home and results pages. """
+
+    server: 'StandInSite'
+
+    def log_message(self, format: str, *args: object) -> None:  # pylint: disable=redefined-builtin
+        """ Keep the stand-in site quiet. """
+        logger.debug("stand-in: " + format, *args)
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """ Home page on /, results on /search, 404 otherwise. """
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        url = urlsplit(self.path)
+        if url.path in ('/', '/index.html'):
+            body = STAND_IN_HOME
+        elif url.path == '/search':
+            query = parse_qs(url.query).get('q', [''])[0].replace('&', '&amp;').replace('<', '&lt;')
+            results = ''.join(f'<div class="g"><a href="/">{query} result {n}</a></div>' for n in range(10))
+            body = STAND_IN_RESULTS.format(query=query, results=results).encode('utf8')
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StandInSite(ThreadingHTTPServer):
+    """ Local site with the Test IDs of the Google Search Home page object, for load runs without the live site.
+    Attributes:
+        url(str): site root, to use as Base.base_url.
+        delay(float): server time added to every response in sec (default=0).
+    """
+    daemon_threads = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, delay: float = 0) -> None:
+        super().__init__((host, port), _StandInHandler)
+        self.delay = delay
+        self.url = f'http://{host}:{self.server_address[1]}/'
+
+    def start(self) -> 'StandInSite':
+        """ Serve on a daemon thread. """
+        threading.Thread(target=self.serve_forever, name='stand-in-site', daemon=True).start()
+        logger.info("Stand-in site served on %s", self.url)
+        return self
+
+    def stop(self) -> None:
+        """ Stop serving. """
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+""" Record the pages a POM flow touches and replay them from a local server
+
+Recording runs a reverse proxy in front of the origin: every response is
+stored in an archive directory and absolute URLs of the origin and of other
+hosts are rewritten to go back through the proxy, so subresources are
+captured too. The archive stores them against LOCAL_PLACEHOLDER, replaced
+by the URL of the server when served, so it replays on any host and port.
+Replaying serves the archive without any network access.
+
+Usage:
+    python -m lib.tools.replay record --origin https://www.google.com/ --archive recordings/google
+    python -m lib.tools.replay serve --archive recordings/google --port 8900
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = 'index.json'
+
+# Path prefix of requests proxied to another host than the origin: /__host__/<scheme>/<host>/<path>
+HOST_PREFIX = '/__host__/'
+
+# Response headers that are not replayed as recorded
+DROPPED_HEADERS = {
+    'connection', 'keep-alive', 'transfer-encoding', 'content-length', 'content-encoding', 'alt-svc',
+    'content-security-policy', 'content-security-policy-report-only', 'strict-transport-security',
+    'report-to', 'nel', 'expect-ct',
+}
+
+TEXT_TYPES = ('text/', 'application/javascript', 'application/json', 'application/x-javascript', 'image/svg')
+
+ABSOLUTE_URL = re.compile(rb'(https?):(\\?/\\?/)([a-z0-9-]+(?:\.[a-z0-9-]+)+(?::\d+)?)(?=[/"\'\\\s?#)])',
+                          re.IGNORECASE)
+
+COOKIE_DOMAIN = re.compile(r';\s*(domain=[^;]*|secure|samesite=none)', re.IGNORECASE)
+
+# Base URL of the local server in recorded bodies and Location headers, .invalid never resolves
+LOCAL_PLACEHOLDER = 'http://replay.invalid'
+
+
+class RecordedResponse:
+    """ Response stored in an archive.
+    Attributes:
+        status(int): HTTP status.
+        headers(List[Tuple[str, str]]): replayed headers.
+        body(bytes): body after URL rewriting.
+    """
+
+    def __init__(self, status: int, headers: List[Tuple[str, str]], body: bytes) -> None:
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+
+class Archive:
+    """ Directory of recorded responses keyed by method and request path.
+    Bodies are stored once per content digest next to an index.json.
+    Attributes:
+        path(str): archive directory.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._index: Dict[str, Dict[str, Any]] = {}
+        index_path = os.path.join(path, INDEX_FILE)
+        if os.path.exists(index_path):
+            with open(index_path, encoding='utf8') as f:
+                self._index = json.load(f)
+
+    @staticmethod
+    def key(method: str, path: str) -> str:
+        """ Archive key of a request.
+        Arguments:
+            method(str): HTTP method.
+            path(str): request path with query string.
+        Returns:
+            str: key.
+        """
+        return f'{method} {path}'
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get(self, method: str, path: str, exact: bool = False) -> Optional[RecordedResponse]:
+        """ Recorded response of a request, falling back to the same path with another query string.
+        Arguments:
+            method(str): HTTP method.
+            path(str): request path with query string.
+            exact(bool): do not fall back to another query string (default=False).
+        Returns:
+            Optional[RecordedResponse]: response, None when the request was never recorded.
+        """
+        entry = self._index.get(self.key(method, path))
+        if entry is None and not exact:
+            prefix = self.key(method, path.split('?', 1)[0])
+            entry = next((v for k, v in self._index.items() if k.split('?', 1)[0] == prefix), None)
+        if entry is None:
+            return None
+        with open(os.path.join(self.path, str(entry['body'])), 'rb') as f:
+            body = f.read()
+        headers = [(str(name), str(value)) for name, value in entry['headers']]
+        return RecordedResponse(int(entry['status']), headers, body)
+
+    def put(self, method: str, path: str, response: RecordedResponse) -> None:
+        """ Store a response and save the index.
+        Arguments:
+            method(str): HTTP method.
+            path(str): request path with query string.
+            response(RecordedResponse): response to replay.
+        """
+        digest = hashlib.sha256(response.body).hexdigest()
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            body_path = os.path.join(self.path, digest)
+            if not os.path.exists(body_path):
+                with open(body_path, 'wb') as f:
+                    f.write(response.body)
+            self._index[self.key(method, path)] = {
+                'status': response.status,
+                'headers': response.headers,
+                'body': digest,
+            }
+            with open(os.path.join(self.path, INDEX_FILE), 'w', encoding='utf8') as f:
+                json.dump(self._index, f, indent=1, sort_keys=True)
+
+
+def rewrite_urls(body: bytes, origin: str, local: str) -> bytes:
+    """ Point absolute URLs back to the local server.
+    URLs of the origin become local paths, other hosts go through HOST_PREFIX.
+    Arguments:
+        body(bytes): text body.
+        origin(str): recorded origin, e.g. https://www.google.com
+        local(str): local server, e.g. http://127.0.0.1:8900
+    Returns:
+        bytes: rewritten body.
+    """
+    origin_host = urlsplit(origin).netloc.lower()
+
+    def replace(match: 're.Match[bytes]') -> bytes:
+        scheme, slashes, host = match.group(1), match.group(2), match.group(3)
+        escaped = b'\\/' if b'\\' in slashes else b'/'
+        base = local.encode('ascii').replace(b'/', escaped)
+        if host.decode('ascii').lower() == origin_host:
+            return base
+        return base + escaped.join([b'', b'__host__', scheme.lower(), host])
+
+    return ABSOLUTE_URL.sub(replace, body)
+
+
+def localize(body: bytes, local: str) -> bytes:
+    """ Point the URLs rewritten to LOCAL_PLACEHOLDER to the serving local server.
+    Arguments:
+        body(bytes): recorded text body or header value.
+        local(str): local server, e.g. http://127.0.0.1:8900
+    Returns:
+        bytes: body with the URL of the local server.
+    """
+    placeholder, url = LOCAL_PLACEHOLDER.encode('ascii'), local.encode('ascii')
+    return body.replace(placeholder, url).replace(placeholder.replace(b'/', b'\\/'), url.replace(b'/', b'\\/'))
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    """ Serve (and in record mode, fetch) one request. """
+    server: 'ReplayServer'
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args: object) -> None:  # pylint: disable=redefined-builtin
+        """ Route request logs to the module logger. """
+        logger.debug(format, *args)
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """ Handle GET. """
+        self._respond('GET')
+
+    def do_HEAD(self) -> None:  # pylint: disable=invalid-name
+        """ Handle HEAD. """
+        self._respond('HEAD')
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        """ Handle POST. """
+        self._respond('POST')
+
+    def _respond(self, method: str) -> None:
+        length = int(self.headers.get('Content-Length') or 0)
+        data = self.rfile.read(length) if length else None
+        response = self.server.archive.get(method, self.path, exact=self.server.origin is not None)
+        if response is None and self.server.origin:
+            response = self.server.fetch(method, self.path, data, self.headers.get('User-Agent'))
+        if response is None:
+            self.server.misses.append(self.path)
+            logger.warning("Not recorded: %s %s", method, self.path)
+            response = RecordedResponse(404, [('Content-Type', 'text/plain')], b'Not recorded')
+        body = response.body
+        self.send_response(response.status)
+        for name, value in response.headers:
+            if name.lower() == 'location':
+                value = localize(value.encode('latin-1'), self.server.url).decode('latin-1')
+            if name.lower() == 'content-type' and value.startswith(TEXT_TYPES):
+                body = localize(body, self.server.url)
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if method != 'HEAD':
+            self.wfile.write(body)
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """ Local server replaying an archive, recording missing responses from `origin` when given.
+    Attributes:
+        archive(Archive): recorded responses.
+        origin(Optional[str]): site recorded through the proxy, None to replay only.
+        url(str): base URL of the local server, used as the POM base URL.
+        misses(List[str]): paths that were requested but not recorded.
+    """
+    daemon_threads = True
+
+    def __init__(self, archive: str, origin: Optional[str] = None, host: str = '127.0.0.1', port: int = 0) -> None:
+        super().__init__((host, port), _ReplayHandler)
+        self.archive = Archive(archive)
+        self.origin = origin.rstrip('/') if origin else None
+        self.url = f'http://{host}:{self.server_address[1]}'
+        self.misses: List[str] = []
+
+    def start(self) -> 'ReplayServer':
+        """ Serve on a daemon thread.
+        Returns:
+            ReplayServer: self.
+        """
+        threading.Thread(target=self.serve_forever, name='replay-server', daemon=True).start()
+        logger.info("%s %s on %s.", 'Recording' if self.origin else 'Replaying', self.archive.path, self.url)
+        return self
+
+    def stop(self) -> None:
+        """ Stop serving. """
+        self.shutdown()
+        self.server_close()
+
+    def upstream(self, path: str) -> str:
+        """ URL a local path was rewritten from.
+        Arguments:
+            path(str): request path with query string.
+        Returns:
+            str: absolute URL on the origin or on another host.
+        """
+        if path.startswith(HOST_PREFIX):
+            scheme, host, rest = (path[len(HOST_PREFIX):].split('/', 2) + ['', ''])[:3]
+            return f'{scheme}://{host}/{rest}'
+        return f'{self.origin}{path}'
+
+    def _replayed_headers(self, raw_headers: List[Tuple[str, str]]) -> Tuple[List[Tuple[str, str]], str]:
+        """ Upstream headers as replayed locally.
+        Arguments:
+            raw_headers(List[Tuple[str, str]]): upstream response headers.
+        Returns:
+            Tuple[List[Tuple[str, str]], str]: kept headers and content type.
+        """
+        headers: List[Tuple[str, str]] = []
+        content_type = ''
+        for name, value in raw_headers:
+            lower = name.lower()
+            if lower in DROPPED_HEADERS:
+                continue
+            if lower == 'content-type':
+                content_type = value
+            if lower == 'set-cookie':
+                value = COOKIE_DOMAIN.sub('', value)
+            if lower == 'location':
+                value = rewrite_urls(value.encode('latin-1'), self.origin or '', LOCAL_PLACEHOLDER).decode('latin-1')
+            headers.append((name, value))
+        return headers, content_type
+
+    def fetch(self, method: str, path: str, data: Optional[bytes], user_agent: Optional[str]) -> RecordedResponse:
+        """ Fetch a request from upstream, rewrite and record it. URLs point to LOCAL_PLACEHOLDER.
+        Arguments:
+            method(str): HTTP method.
+            path(str): request path with query string.
+            data(Optional[bytes]): request body.
+            user_agent(Optional[str]): browser user agent, so the origin serves the same page.
+        Returns:
+            RecordedResponse: recorded response.
+        """
+        request = urllib.request.Request(self.upstream(path), data=data, method=method)
+        request.add_header('Accept-Encoding', 'identity')
+        if user_agent:
+            request.add_header('User-Agent', user_agent)
+        try:
+            with urllib.request.urlopen(request, timeout=30) as upstream:  # nosec: recording is opt-in
+                status, raw_headers, body = upstream.status, upstream.getheaders(), upstream.read()
+        except urllib.error.HTTPError as e:
+            status, raw_headers, body = e.code, list(e.headers.items()), e.read()
+        headers, content_type = self._replayed_headers(raw_headers)
+        if content_type.startswith(TEXT_TYPES):
+            body = rewrite_urls(body, self.origin or '', LOCAL_PLACEHOLDER)
+        response = RecordedResponse(status, headers, body)
+        self.archive.put(method, path, response)
+        logger.info("Recorded %s %s (%s, %s bytes).", method, path, status, len(body))
+        return response
+
+
+def main() -> None:
+    """ Record or serve an archive until interrupted. """
+    parser = argparse.ArgumentParser(prog='replay.py', description='Record and replay pages for POM tests.')
+    parser.add_argument('mode', choices=['record', 'serve'], help='record through a proxy, or serve the archive.')
+    parser.add_argument('--archive', required=True, help='Archive directory.')
+    parser.add_argument('--origin', default='https://www.google.com/', help='Site to record (default=Google).')
+    parser.add_argument('--port', type=int, default=8900, help='Local port (default=8900).')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    replay = ReplayServer(args.archive, args.origin if args.mode == 'record' else None, port=args.port)
+    print(f'Base URL: {replay.url}/  (Ctrl+C to stop)')
+    try:
+        replay.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        replay.server_close()
+
+
+if __name__ == '__main__':
+    main()
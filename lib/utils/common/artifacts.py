@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+""" Failure artifacts: screenshot, DOM and browser logs
+
+Only the WebDriver round trips happen on the caller's thread. Decoding,
+compressing and writing run on a background thread pool, and the artifact
+directory is pruned to the newest captures within a size budget.
+"""
+
+import base64
+import gzip
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver import Remote
+
+logger = logging.getLogger(__name__)
+
+UNSAFE_CHARS = re.compile(r'[^A-Za-z0-9_.-]+')
+
+
+class RawArtifacts(NamedTuple):
+    """ Data grabbed from the browser at the point of failure.
+    Attributes:
+        url(Optional[str]): current URL.
+        screenshot(Optional[str]): base64 PNG as sent by the driver.
+        dom(Optional[str]): page source.
+        browser_log(List[Dict[str, Any]]): console entries of the browser log.
+    """
+    url: Optional[str]
+    screenshot: Optional[str]
+    dom: Optional[str]
+    browser_log: List[Dict[str, Any]]
+
+
+def grab(driver: Remote) -> RawArtifacts:
+    """ Read the raw artifacts, skipping whatever the browser cannot return.
+    Arguments:
+        driver(Remote): webdriver.
+    Returns:
+        RawArtifacts: raw data, nothing decoded.
+    """
+    def read(func: Any, default: Any) -> Any:
+        try:
+            return func()
+        except WebDriverException as e:
+            logger.debug("Artifact not captured: %s", e)
+            return default
+
+    return RawArtifacts(read(lambda: driver.current_url, None),
+                        read(driver.get_screenshot_as_base64, None),
+                        read(lambda: driver.page_source, None),
+                        read(lambda: driver.get_log('browser'), []))
+
+
+class ArtifactWriter:
+    """ Write failure artifacts in the background.
+    Attributes:
+        directory(str): artifact root, one sub directory per capture.
+        max_captures(int): number of newest captures kept (0 keeps all).
+        max_bytes(int): total size kept (0 is unlimited).
+    """
+
+    def __init__(self, directory: str, max_captures: int = 50, max_bytes: int = 200 * 1024 * 1024,
+                 workers: int = 2) -> None:
+        self.directory = directory
+        self.max_captures = max_captures
+        self.max_bytes = max_bytes
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='artifact-writer')
+        self._prune_lock = threading.Lock()
+
+    def capture(self, driver: Remote, name: str) -> 'Future[str]':
+        """ Grab the artifacts of a driver and write them in the background.
+        Arguments:
+            driver(Remote): webdriver, free to be reused as soon as this returns.
+            name(str): capture name, e.g. the test id.
+        Returns:
+            Future[str]: directory of the capture once written.
+        """
+        raw = grab(driver)
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        path = os.path.join(self.directory, f'{stamp}-{UNSAFE_CHARS.sub("_", name)[-150:]}')
+        return self._executor.submit(self._write, path, name, raw)
+
+    def close(self) -> None:
+        """ Wait for the pending writes. """
+        self._executor.shutdown(wait=True)
+
+    def _write(self, path: str, name: str, raw: RawArtifacts) -> str:
+        os.makedirs(path, exist_ok=True)
+        if raw.screenshot:
+            with open(os.path.join(path, 'screenshot.png'), 'wb') as f:
+                f.write(base64.b64decode(raw.screenshot))
+        if raw.dom is not None:
+            with gzip.open(os.path.join(path, 'dom.html.gz'), 'wt', encoding='utf8') as f:
+                f.write(raw.dom)
+        if raw.browser_log:
+            with gzip.open(os.path.join(path, 'browser_log.jsonl.gz'), 'wt', encoding='utf8') as f:
+                for entry in raw.browser_log:
+                    f.write(json.dumps(entry) + '\n')
+        with open(os.path.join(path, 'meta.json'), 'w', encoding='utf8') as f:
+            json.dump({'name': name, 'url': raw.url, 'time': time.time()}, f)
+        self._prune()
+        logger.info("Failure artifacts of %s written to %s", name, path)
+        return path
+
+    def _prune(self) -> None:
+        """ Delete the oldest captures beyond max_captures or max_bytes.
+        Only finished captures, with their meta.json, count: not the directories of xdist workers
+        sharing the root, nor captures still being written.
+        """
+        with self._prune_lock:
+            captures = []
+            for entry in os.scandir(self.directory):
+                if entry.is_dir() and os.path.isfile(os.path.join(entry.path, 'meta.json')):
+                    size = sum(f.stat().st_size for f in os.scandir(entry.path) if f.is_file())
+                    captures.append((entry.stat().st_mtime, entry.path, size))
+            captures.sort(reverse=True)
+            total = 0
+            for index, (_, path, size) in enumerate(captures):
+                total += size
+                too_many = bool(self.max_captures) and index >= self.max_captures
+                too_big = bool(self.max_bytes) and total > self.max_bytes and index > 0
+                if too_many or too_big:
+                    shutil.rmtree(path, ignore_errors=True)
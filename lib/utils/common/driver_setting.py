@@ -3,34 +3,166 @@
 # pylint: disable=unused-import
 
 import logging
+import os
+from typing import Any, Dict, NamedTuple, Optional, Tuple, Union
 from selenium.webdriver import Chrome
 from selenium.webdriver.chrome.options import Options
+from lib.utils.common.network import NetworkRules, attach_network
 
 logger = logging.getLogger(__name__)
 
+CHROME_BINARY_ENV = 'CHROME_BINARY'
+CHROMEDRIVER_PATH = '/bin/chromedriver'
 
-def set_chrome_driver_options(headless: bool = True) -> Chrome:
-    """ Setup webdriver
+# Flags of every profile
+COMMON_ARGUMENTS = (
+    '--disable-infobars',
+    '--hide-scrollbars',
+    '--no-sandbox',
+    '--enable-logging',
+    '--log-level=2',
+    '--ignore-certificate-errors',
+)
+
+# Keep timers and rendering of background tabs and occluded windows at full speed
+NO_THROTTLING_ARGUMENTS = (
+    '--disable-background-timer-throttling',
+    '--disable-backgrounding-occluded-windows',
+    '--disable-renderer-backgrounding',
+)
+
+
+class LaunchProfile(NamedTuple):
+    """ How Chrome is launched.
+    Attributes:
+        name(str): profile name.
+        page_load_strategy(str): 'normal' waits for the load event, 'eager' for DOMContentLoaded,
+            'none' returns as soon as navigation starts.
+        images(bool): load images.
+        fonts(bool): load remote web fonts.
+        background_throttling(bool): let Chrome throttle background timers and renderers.
+        window_size(Optional[Tuple[int, int]]): width and height, None maximizes the window.
+        gpu_flags(Tuple[str, ...]): GPU and raster flags.
+        binary_location(Optional[str]): Chrome binary, None uses $CHROME_BINARY when set, else finds it on the PATH.
+        application_cache(bool): keep the application cache enabled.
+        network(NetworkRules): requests blocked by URL pattern or resource type, and disk caching of
+            static responses, applied through the DevTools protocol.
+    """
+    name: str
+    page_load_strategy: str = 'normal'
+    images: bool = True
+    fonts: bool = True
+    background_throttling: bool = True
+    window_size: Optional[Tuple[int, int]] = None
+    gpu_flags: Tuple[str, ...] = ('--disable-gpu', )
+    binary_location: Optional[str] = None
+    application_cache: bool = False
+    network: NetworkRules = NetworkRules()
+
+
+# Analytics and ad requests blocked by the 'fast' profile
+TRACKER_URLS = (
+    '*://*.google-analytics.com/*',
+    '*://*.googletagmanager.com/*',
+    '*://*.doubleclick.net/*',
+    '*://*.googlesyndication.com/*',
+    '*/gen_204?*',
+    '*/client_204?*',
+)
+
+# Named launch profiles. 'fast' skips what functional tests rarely need: waiting for subresources,
+# images, web fonts, media, trackers and GPU compositing, and caches static responses across sessions.
+PROFILES: Dict[str, LaunchProfile] = {
+    'default': LaunchProfile('default'),
+    'fast': LaunchProfile('fast',
+                          page_load_strategy='eager',
+                          images=False,
+                          fonts=False,
+                          background_throttling=False,
+                          window_size=(1366, 768),
+                          gpu_flags=('--disable-gpu', '--disable-software-rasterizer',
+                                     '--disable-smooth-scrolling'),
+                          application_cache=True,
+                          network=NetworkRules(block_urls=TRACKER_URLS,
+                                               block_types=('Image', 'Font', 'Media', 'Ping'),
+                                               response_cache=True)),
+}
+
+
+def get_launch_profile(profile: Union[str, LaunchProfile, None] = None) -> LaunchProfile:
+    """ Resolve a launch profile.
+
+    Arguments:
+        profile(Union[str, LaunchProfile, None]): profile or name in PROFILES, None is 'default'.
+
+    Return:
+        LaunchProfile: launch profile.
+
+    Raises:
+        ValueError: unknown profile name.
+    """
+    if isinstance(profile, LaunchProfile):
+        return profile
+    try:
+        return PROFILES[profile or 'default']
+    except KeyError as e:
+        raise ValueError(f'Unknown launch profile: {profile} (choose from {", ".join(PROFILES)})') from e
+
+
+def build_chrome_options(headless: bool = True, profile: Union[str, LaunchProfile, None] = None) -> Options:
+    """ Chrome options of a launch profile
 
     Arguments:
         headless(bool): Show browser or not.
+        profile(Union[str, LaunchProfile, None]): launch profile or its name (default='default').
 
     Return:
-        driver(Chrome): Chrome webdriver
+        options(Options): Chrome options
     """
+    launch = get_launch_profile(profile)
     options = Options()
-    options.sebinary_location = '/bin/google-chrome'
+    binary_location = launch.binary_location or os.environ.get(CHROME_BINARY_ENV)
+    if binary_location:
+        options.binary_location = binary_location
+    options.page_load_strategy = launch.page_load_strategy
+    # Console messages of the page, read back as failure artifacts
+    options.set_capability('goog:loggingPrefs', {'browser': 'ALL'})
     if headless:
         options.add_argument('--headless')
-    options.add_argument('--disable-gpu')
-    options.add_argument("--disable-application-cache")
-    options.add_argument("--disable-infobars")
-    options.add_argument("--hide-scrollbars")
-    options.add_argument('--no-sandbox')
-    options.add_argument("--enable-logging")
-    options.add_argument("--log-level=2")
-    options.add_argument("--ignore-certificate-errors")
-    driver = Chrome(options=options, executable_path='/bin/chromedriver')
-    driver.maximize_window()
+    for argument in launch.gpu_flags + COMMON_ARGUMENTS:
+        options.add_argument(argument)
+    if not launch.application_cache:
+        options.add_argument('--disable-application-cache')
+    if not launch.background_throttling:
+        for argument in NO_THROTTLING_ARGUMENTS:
+            options.add_argument(argument)
+    if not launch.fonts:
+        options.add_argument('--disable-remote-fonts')
+    if not launch.images:
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        prefs: Dict[str, Any] = {'profile.managed_default_content_settings.images': 2}
+        options.add_experimental_option('prefs', prefs)
+    if launch.window_size:
+        width, height = launch.window_size
+        options.add_argument(f'--window-size={width},{height}')
+    return options
+
+
+def set_chrome_driver_options(headless: bool = True, profile: Union[str, LaunchProfile, None] = None) -> Chrome:
+    """ Setup webdriver
+
+    Arguments:
+        headless(bool): Show browser or not.
+        profile(Union[str, LaunchProfile, None]): launch profile or its name (default='default').
+
+    Return:
+        driver(Chrome): Chrome webdriver
+    """
+    launch = get_launch_profile(profile)
+    driver = Chrome(options=build_chrome_options(headless, launch), executable_path=CHROMEDRIVER_PATH)
+    if launch.window_size is None:
+        driver.maximize_window()
+    attach_network(driver, launch.network)
+    logger.debug("Chrome launched with the %s profile.", launch.name)
 
     return driver
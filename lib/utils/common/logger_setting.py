@@ -1,14 +1,190 @@
 #!/usr/bin/env python3
-""" Base of setting log """
+""" Base of setting log
 
+Handlers configured from logging.ini run on a background QueueListener, so a
+log call only enqueues the record. Tests can also buffer their records in
+memory and write them as JSON lines once the test is over.
+"""
+
+import atexit
+import copy
+import json
 import logging
 import logging.config
+import os
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, List, Optional
+
+_listeners: List[QueueListener] = []
+_listeners_lock = threading.Lock()
+
+# Test and worker ids attached to records by ContextFilter
+_context: Dict[str, Optional[str]] = {'test_id': None, 'worker_id': os.environ.get('PYTEST_XDIST_WORKER')}
 
 
 def get_logger() -> logging.Logger:
     """ Setup logger
     """
     logging.config.fileConfig('logging.ini', disable_existing_loggers=False)
+    enable_queue_logging()
     logger = logging.getLogger(__name__)
 
     return logger
+
+
+def start_listener(*handlers: logging.Handler) -> QueueHandler:
+    """ Run handlers on a background thread.
+
+    Arguments:
+        *handlers(logging.Handler): handlers doing the I/O.
+
+    Return:
+        QueueHandler: handler enqueuing records for them.
+    """
+    records: 'queue.SimpleQueue[logging.LogRecord]' = queue.SimpleQueue()
+    listener = QueueListener(records, *handlers, respect_handler_level=True)
+    listener.start()
+    with _listeners_lock:
+        _listeners.append(listener)
+    return QueueHandler(records)
+
+
+def enable_queue_logging(logger: Optional[logging.Logger] = None) -> None:
+    """ Move the handlers of a logger behind a queue, so log calls never wait for I/O.
+
+    Arguments:
+        logger(Optional[logging.Logger]): logger to rewire (default=root logger).
+    """
+    logger = logger or logging.getLogger()
+    handlers = [h for h in logger.handlers if not isinstance(h, QueueHandler)]
+    if not handlers:
+        return
+    for handler in handlers:
+        logger.removeHandler(handler)
+    logger.addHandler(start_listener(*handlers))
+
+
+@atexit.register
+def stop_queue_logging() -> None:
+    """ Write the queued records and stop the background threads. """
+    with _listeners_lock:
+        listeners = list(_listeners)
+        _listeners.clear()
+    for listener in listeners:
+        listener.stop()
+
+
+def set_log_context(test_id: Optional[str] = None, worker_id: Optional[str] = None) -> None:
+    """ Set the ids attached to the next records.
+
+    Arguments:
+        test_id(Optional[str]): id of the running test, None outside tests.
+        worker_id(Optional[str]): id of the worker process, unchanged when None.
+    """
+    _context['test_id'] = test_id
+    if worker_id is not None:
+        _context['worker_id'] = worker_id
+
+
+def freeze_record(record: logging.LogRecord) -> logging.LogRecord:
+    """ Copy of a record with its message and traceback rendered, so it can be written later:
+    arguments changed after the log call and exceptions gone out of scope do not matter anymore.
+
+    Arguments:
+        record(logging.LogRecord): record being emitted.
+
+    Return:
+        logging.LogRecord: record with msg rendered and no args nor exc_info.
+    """
+    frozen = copy.copy(record)
+    frozen.msg = record.getMessage()
+    frozen.args = None
+    if record.exc_info and not record.exc_text:
+        frozen.exc_text = logging.Formatter().formatException(record.exc_info)
+    frozen.exc_info = None
+    return frozen
+
+
+class ContextFilter(logging.Filter):
+    """ Attach the test and worker ids to records. """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.test_id = _context['test_id']
+        record.worker_id = _context['worker_id']
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """ One JSON object per record. """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'test_id': getattr(record, 'test_id', None),
+            'worker_id': getattr(record, 'worker_id', None),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class TestLogBuffer(logging.Handler):
+    """ Keep the records of the running test in memory and hand them to a background
+    JSON lines writer when the test ends.
+
+    Attributes:
+        path(str): JSON lines file.
+        failures_only(bool): drop the records of passed tests.
+    """
+
+    def __init__(self, path: str, failures_only: bool = False, level: int = logging.NOTSET) -> None:
+        super().__init__(level)
+        self.path = path
+        self.failures_only = failures_only
+        self.records: List[logging.LogRecord] = []
+        self.addFilter(ContextFilter())
+        writer = logging.FileHandler(path, mode='a', encoding='utf8', delay=True)
+        writer.setFormatter(JsonFormatter())
+        self._queue: 'queue.SimpleQueue[logging.LogRecord]' = queue.SimpleQueue()
+        self._listener: Optional[QueueListener] = QueueListener(self._queue, writer)
+        self._listener.start()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        record = freeze_record(record)
+        with self.lock:  # type: ignore
+            self.records.append(record)
+
+    def flush_test(self, failed: bool) -> int:
+        """ End the buffer of the running test.
+
+        Arguments:
+            failed(bool): the test failed.
+
+        Return:
+            int: number of records written.
+        """
+        with self.lock:  # type: ignore
+            records, self.records = self.records, []
+        if self.failures_only and not failed:
+            return 0
+        for record in records:
+            self._queue.put(record)
+        return len(records)
+
+    def close(self) -> None:
+        """ Write the records logged outside of any test, e.g. by session fixtures, and wait for the writer. """
+        with self.lock:  # type: ignore
+            records, self.records = self.records, []
+            listener, self._listener = self._listener, None
+        if listener is not None:
+            for record in records:
+                self._queue.put(record)
+            listener.stop()
+        super().close()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+""" Memory budget of the browser, sampled through the Chrome DevTools Protocol
+
+A background thread reads Performance.getMetrics of the current page while a
+test runs and keeps the peak. When the test ends the page is garbage collected
+and measured again: what is still held counts against the budget of the driver
+session, so leaking drivers are retired by the pool before Chrome slows down.
+"""
+
+import logging
+import threading
+import weakref
+from typing import Dict, List, NamedTuple, Optional
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver import Remote
+
+from lib.utils.common.web_element.exceptions import MemoryExceeded
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+class MemorySample(NamedTuple):
+    """ Memory of the current page at one time.
+    Attributes:
+        js_heap_used(int): bytes of live JavaScript objects.
+        js_heap_total(int): bytes allocated for the JavaScript heap.
+        nodes(int): DOM nodes, detached ones included.
+        documents(int): documents, frames included.
+        listeners(int): JavaScript event listeners.
+    """
+    js_heap_used: int
+    js_heap_total: int
+    nodes: int
+    documents: int
+    listeners: int
+
+    @property
+    def used_mb(self) -> float:
+        """ JavaScript heap used in MB. """
+        return self.js_heap_used / MB
+
+
+def read_memory(driver: Remote) -> MemorySample:
+    """ Read the memory metrics of the current page.
+    The Performance domain must be enabled, see MemoryMonitor.start.
+    Arguments:
+        driver(Remote): Chrome webdriver.
+    Returns:
+        MemorySample: current metrics.
+    Raises:
+        WebDriverException: the browser did not answer.
+    """
+    metrics = {m['name']: m['value'] for m in driver.execute_cdp_cmd('Performance.getMetrics', {})['metrics']}
+    return MemorySample(int(metrics.get('JSHeapUsedSize', 0)),
+                        int(metrics.get('JSHeapTotalSize', 0)),
+                        int(metrics.get('Nodes', 0)),
+                        int(metrics.get('Documents', 0)),
+                        int(metrics.get('JSEventListeners', 0)))
+
+
+class MemoryBudget(NamedTuple):
+    """ Memory limits of a driver in MB, 0 disables a limit.
+    Attributes:
+        test_mb(float): peak JavaScript heap used during one test.
+        session_mb(float): JavaScript heap the driver session still holds after a test, garbage collected.
+        recycle_ratio(float): part of session_mb from which the driver is retired when released (default=0.8).
+    """
+    test_mb: float = 0
+    session_mb: float = 0
+    recycle_ratio: float = 0.8
+
+    def __bool__(self) -> bool:
+        return bool(self.test_mb or self.session_mb)
+
+
+class MemoryReport(NamedTuple):
+    """ Memory of a driver during one test, in MB.
+    Attributes:
+        test(str): test name.
+        start_mb(float): JavaScript heap used when the test started.
+        peak_mb(float): highest JavaScript heap used sampled during the test.
+        retained_mb(float): JavaScript heap used after the test, garbage collected when session_mb is set.
+        peak_nodes(int): highest number of DOM nodes sampled during the test.
+        samples(int): number of samples.
+    """
+    test: str
+    start_mb: float
+    peak_mb: float
+    retained_mb: float
+    peak_nodes: int
+    samples: int
+
+    def as_dict(self) -> Dict[str, float]:
+        """ Figures rounded for reports.
+        Returns:
+            Dict[str, float]: value by field name, test excluded.
+        """
+        return {name: round(value, 1) for name, value in self._asdict().items() if name != 'test'}
+
+
+class MemoryMonitor:
+    """ Sample the memory of one driver on a background thread while a test runs.
+    Each sample is one DevTools command. Chromedriver runs commands one at a time,
+    so a sample may delay a command of the test by about a millisecond.
+    Attributes:
+        driver(Remote): Chrome webdriver.
+        budget(MemoryBudget): memory limits.
+        interval(float): time between samples in sec (default=0.5sec).
+        retained_mb(float): JavaScript heap used after the last test.
+    """
+
+    def __init__(self, driver: Remote, budget: MemoryBudget = MemoryBudget(), interval: float = 0.5) -> None:
+        self.driver = driver
+        self.budget = budget
+        self.interval = interval
+        self.retained_mb = 0.0
+        self._test = ''
+        self._samples: List[MemorySample] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, test: str) -> None:
+        """ Start sampling.
+        Arguments:
+            test(str): test name used by reports and errors.
+        """
+        self.stop()
+        self._test = test
+        self._samples = []
+        try:
+            self.driver.execute_cdp_cmd('Performance.enable', {})
+        except WebDriverException as e:
+            logger.warning("Memory of %s not monitored: %s", test, e)
+            return
+        self._sample()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='memory-monitor', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Optional[MemoryReport]:
+        """ Stop sampling and measure what the page still holds.
+        Returns:
+            Optional[MemoryReport]: memory during the test, None when not sampling.
+        """
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return None
+        self._stop.set()
+        thread.join()
+        last = self._sample(collect_garbage=bool(self.budget.session_mb))
+        if last is not None:
+            self.retained_mb = last.used_mb
+        samples = self._samples
+        if not samples:
+            return MemoryReport(self._test, 0.0, 0.0, self.retained_mb, 0, 0)
+        return MemoryReport(self._test,
+                            samples[0].used_mb,
+                            max(sample.used_mb for sample in samples),
+                            self.retained_mb,
+                            max(sample.nodes for sample in samples),
+                            len(samples))
+
+    def check(self, report: MemoryReport) -> None:
+        """ Enforce the budget.
+        Arguments:
+            report(MemoryReport): memory during the test.
+        Raises:
+            MemoryExceeded: the test or the driver session went over its limit.
+        """
+        if self.budget.test_mb and report.peak_mb > self.budget.test_mb:
+            raise MemoryExceeded(f'{report.test} used {report.peak_mb:.1f} MB of JavaScript heap, '
+                                 f'over the test limit of {self.budget.test_mb:g} MB.')
+        if self.budget.session_mb and report.retained_mb > self.budget.session_mb:
+            raise MemoryExceeded(f'The browser holds {report.retained_mb:.1f} MB of JavaScript heap after '
+                                 f'{report.test}, over the session limit of {self.budget.session_mb:g} MB.')
+
+    def recycle_reason(self) -> Optional[str]:
+        """ Why the driver should be retired instead of reused, see DriverPool retire_when.
+        Returns:
+            Optional[str]: reason, None when the driver is within its budget.
+        """
+        limit = self.budget.session_mb * self.budget.recycle_ratio
+        if limit and self.retained_mb >= limit:
+            return f'holds {self.retained_mb:.1f} MB of JavaScript heap, recycled from {limit:g} MB'
+        return None
+
+    def _run(self) -> None:
+        """ Sample until stopped, warning once when the budget is blown. """
+        warned = False
+        while not self._stop.wait(self.interval):
+            sample = self._sample()
+            if sample is None or warned:
+                continue
+            if self.budget.test_mb and sample.used_mb > self.budget.test_mb:
+                logger.warning("%s went over the memory limit of %g MB: %.1f MB", self._test, self.budget.test_mb,
+                               sample.used_mb)
+                warned = True
+
+    def _sample(self, collect_garbage: bool = False) -> Optional[MemorySample]:
+        """ Take one sample and keep it.
+        Arguments:
+            collect_garbage(bool): collect garbage first, so only memory still referenced counts (default=False).
+        Returns:
+            Optional[MemorySample]: sample, None when the browser did not answer.
+        """
+        try:
+            if collect_garbage:
+                self.driver.execute_cdp_cmd('HeapProfiler.collectGarbage', {})
+            sample = read_memory(self.driver)
+        except WebDriverException as e:
+            logger.debug("Memory sample skipped: %s", e)
+            return None
+        self._samples.append(sample)
+        return sample
+
+
+_monitors: 'weakref.WeakKeyDictionary[Remote, MemoryMonitor]' = weakref.WeakKeyDictionary()
+_monitors_lock = threading.Lock()
+
+
+def get_memory_monitor(driver: Remote, budget: MemoryBudget = MemoryBudget(), interval: float = 0.5) -> MemoryMonitor:
+    """ Monitor of a driver, created on first use and kept as long as the driver.
+    Arguments:
+        driver(Remote): Chrome webdriver.
+        budget(MemoryBudget): memory limits, used only when the monitor is created.
+        interval(float): time between samples in sec, used only when the monitor is created (default=0.5sec).
+    Returns:
+        MemoryMonitor: monitor of the driver.
+    """
+    with _monitors_lock:
+        monitor = _monitors.get(driver)
+        if monitor is None:
+            monitor = _monitors[driver] = MemoryMonitor(driver, budget, interval)
+        return monitor
+
+
+def memory_recycle_reason(driver: Remote) -> Optional[str]:
+    """ Why a driver should be retired for its memory, usable as DriverPool retire_when.
+    Arguments:
+        driver(Remote): webdriver.
+    Returns:
+        Optional[str]: reason, None when the driver is not monitored or within its budget.
+    """
+    monitor = _monitors.get(driver)
+    return monitor.recycle_reason() if monitor is not None else None
@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+""" Network layer driven through the Chrome DevTools Protocol
+
+Requests are paused with the Fetch domain: blocked ones are failed, repeated
+static responses are fulfilled from a content-addressed disk cache shared by
+every driver session, as long as their Cache-Control max-age or Expires header
+keeps them fresh. Stale responses are revalidated with their ETag or
+Last-Modified date. Fetch events need a DevTools websocket, which uses the
+optional websocket-client package. Without it only URL patterns are blocked,
+through Network.setBlockedURLs, and nothing is cached or counted.
+"""
+
+import base64
+import email.utils
+import fnmatch
+import hashlib
+import itertools
+import json
+import logging
+import os
+import queue
+import tempfile
+import re
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver import Remote
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR_ENV = 'CHROME_RESPONSE_CACHE'
+
+# Resource types whose successful GET responses are cached
+CACHED_TYPES = ('Script', 'Stylesheet', 'Font', 'Image')
+
+# Response headers not replayed from the cache
+UNCACHED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'date', 'set-cookie'}
+
+# Maximum wait time for the answer of a DevTools command in seconds
+COMMAND_TIMEOUT = 10
+
+
+class NetworkRules(NamedTuple):
+    """ What the network layer does with the requests of a driver.
+    Attributes:
+        block_urls(Tuple[str, ...]): glob patterns of blocked URLs, e.g. '*://*.doubleclick.net/*'.
+        block_types(Tuple[str, ...]): blocked DevTools resource types, e.g. 'Image', 'Font', 'Media'.
+        response_cache(bool): serve repeated static responses from the disk cache.
+    """
+    block_urls: Tuple[str, ...] = ()
+    block_types: Tuple[str, ...] = ()
+    response_cache: bool = False
+
+    def __bool__(self) -> bool:
+        return bool(self.block_urls or self.block_types or self.response_cache)
+
+    def blocks(self, url: str, resource_type: str) -> bool:
+        """ Whether a request is blocked.
+        Arguments:
+            url(str): request URL.
+            resource_type(str): DevTools resource type.
+        Returns:
+            bool: return True if the request must fail.
+        """
+        return resource_type in self.block_types or any(fnmatch.fnmatchcase(url, p) for p in self.block_urls)
+
+
+class NetworkStats:
+    """ Counters of the network layer.
+    Attributes:
+        blocked(int): failed requests.
+        cache_hits(int): responses served from the disk cache.
+        cache_stores(int): responses written to the disk cache.
+        bytes_from_cache(int): body bytes served from the disk cache.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.blocked = 0
+        self.cache_hits = 0
+        self.cache_stores = 0
+        self.bytes_from_cache = 0
+
+    def add(self, **counts: int) -> None:
+        """ Increment counters.
+        Arguments:
+            **counts(int): increment by counter name.
+        """
+        with self._lock:
+            for name, count in counts.items():
+                setattr(self, name, getattr(self, name) + count)
+
+    def as_dict(self) -> Dict[str, int]:
+        """ Current counters.
+        Returns:
+            Dict[str, int]: value by counter name.
+        """
+        with self._lock:
+            return {
+                'blocked': self.blocked,
+                'cache_hits': self.cache_hits,
+                'cache_stores': self.cache_stores,
+                'bytes_from_cache': self.bytes_from_cache,
+            }
+
+
+MAX_AGE = re.compile(r'(?:^|,)\s*max-age\s*=\s*"?(\d+)', re.IGNORECASE)
+
+
+def _header(headers: List[Dict[str, str]], name: str) -> Optional[str]:
+    """ Value of a response header, None when missing. """
+    return next((h['value'] for h in headers if h['name'].lower() == name), None)
+
+
+def freshness_lifetime(headers: List[Dict[str, str]], now: Optional[float] = None) -> Optional[float]:
+    """ Time until which a response may be served from the cache without asking the server.
+    Cache-Control max-age comes before Expires, and the Age header is taken off.
+    Arguments:
+        headers(List[Dict[str, str]]): response headers as DevTools names and values.
+        now(Optional[float]): time the response was received (default=time.time()).
+    Returns:
+        Optional[float]: expiry time, now when the response must be revalidated, None when it must not be stored.
+    """
+    now = time.time() if now is None else now
+    cache_control = (_header(headers, 'cache-control') or '').lower()
+    if 'no-store' in cache_control:
+        return None
+    if 'no-cache' in cache_control:
+        return now
+    max_age = MAX_AGE.search(cache_control)
+    age = _header(headers, 'age') or '0'
+    if max_age:
+        return now + int(max_age.group(1)) - (int(age) if age.isdigit() else 0)
+    try:
+        expires = email.utils.parsedate_to_datetime(_header(headers, 'expires') or '').timestamp()
+    except (TypeError, ValueError):
+        # No expiry, or an invalid one like 'Expires: 0' meaning already expired.
+        return now
+    try:
+        # Relative to the clock of the server.
+        return now + expires - email.utils.parsedate_to_datetime(_header(headers, 'date') or '').timestamp()
+    except (TypeError, ValueError):
+        return expires
+
+
+class CachedResponse(NamedTuple):
+    """ Response stored in the disk cache.
+    Attributes:
+        status(int): HTTP status.
+        headers(List[Dict[str, str]]): replayed headers.
+        body(bytes): body.
+        expires(float): time until which the response is fresh, revalidated afterwards (default=0).
+    """
+    status: int
+    headers: List[Dict[str, str]]
+    body: bytes
+    expires: float = 0.0
+
+    @property
+    def fresh(self) -> bool:
+        """ Whether the response may be served without asking the server. """
+        return time.time() < self.expires
+
+    def validators(self) -> List[Dict[str, str]]:
+        """ Conditional request headers revalidating the response.
+        Returns:
+            List[Dict[str, str]]: If-None-Match and If-Modified-Since headers, empty without ETag nor Last-Modified.
+        """
+        validators = []
+        for name, condition in (('etag', 'If-None-Match'), ('last-modified', 'If-Modified-Since')):
+            value = _header(self.headers, name)
+            if value:
+                validators.append({'name': condition, 'value': value})
+        return validators
+
+
+class ResponseCache:
+    """ Content-addressed response cache on disk.
+    Bodies are stored once per sha256 digest under blobs/, and each URL has a small
+    entry under urls/ pointing to its body. Writes are atomic renames, so concurrent
+    sessions and processes can share the directory.
+    Attributes:
+        directory(str): cache directory.
+    """
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        self.directory = directory or os.environ.get(CACHE_DIR_ENV) or os.path.join(
+            tempfile.gettempdir(), 'selenium-response-cache')
+        os.makedirs(os.path.join(self.directory, 'blobs'), exist_ok=True)
+        os.makedirs(os.path.join(self.directory, 'urls'), exist_ok=True)
+
+    def _entry_path(self, url: str) -> str:
+        return os.path.join(self.directory, 'urls', hashlib.sha256(url.encode('utf8')).hexdigest() + '.json')
+
+    def _write(self, path: str, data: bytes) -> None:
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """ Cached response of a URL.
+        Arguments:
+            url(str): request URL.
+        Returns:
+            Optional[CachedResponse]: response, None when not cached.
+        """
+        try:
+            with open(self._entry_path(url), encoding='utf8') as f:
+                entry = json.load(f)
+            with open(os.path.join(self.directory, 'blobs', entry['digest']), 'rb') as f:
+                return CachedResponse(entry['status'], entry['headers'], f.read(), float(entry.get('expires', 0)))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def put(self, url: str, response: CachedResponse) -> None:
+        """ Store a response.
+        Arguments:
+            url(str): request URL.
+            response(CachedResponse): response to serve next time.
+        """
+        digest = hashlib.sha256(response.body).hexdigest()
+        blob = os.path.join(self.directory, 'blobs', digest)
+        if not os.path.exists(blob):
+            self._write(blob, response.body)
+        entry = {'url': url, 'status': response.status, 'headers': response.headers, 'digest': digest,
+                 'expires': response.expires}
+        self._write(self._entry_path(url), json.dumps(entry).encode('utf8'))
+
+
+class _DevToolsConnection:
+    """ DevTools websocket of one page target, answering commands and queueing events. """
+
+    def __init__(self, url: str) -> None:
+        import websocket  # pylint: disable=import-outside-toplevel
+        self._ws = websocket.create_connection(url, timeout=None, suppress_origin=True)
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, 'Future[Dict[str, Any]]'] = {}
+        self._lock = threading.Lock()
+        self.events: 'queue.Queue[Optional[Dict[str, Any]]]' = queue.Queue()
+        self.closed = False
+        threading.Thread(target=self._read, name='devtools-reader', daemon=True).start()
+
+    def send(self, method: str, params: Optional[Dict[str, Any]] = None, wait: bool = True) -> Dict[str, Any]:
+        """ Send a command.
+        Arguments:
+            method(str): DevTools method.
+            params(Optional[Dict[str, Any]]): command parameters.
+            wait(bool): wait for the result (default=True).
+        Returns:
+            Dict[str, Any]: result, empty when not waiting.
+        Raises:
+            WebDriverException: the command failed or the connection is closed.
+        """
+        future: 'Future[Dict[str, Any]]' = Future()
+        with self._lock:
+            if self.closed:
+                raise WebDriverException('DevTools connection is closed.')
+            command_id = next(self._ids)
+            self._pending[command_id] = future
+            self._ws.send(json.dumps({'id': command_id, 'method': method, 'params': params or {}}))
+        if not wait:
+            return {}
+        return future.result(COMMAND_TIMEOUT)
+
+    def _read(self) -> None:
+        try:
+            while True:
+                message = json.loads(self._ws.recv())
+                if 'id' not in message:
+                    self.events.put(message)
+                    continue
+                with self._lock:
+                    future = self._pending.pop(message['id'], None)
+                if future is None:
+                    continue
+                if 'error' in message:
+                    future.set_exception(WebDriverException(message['error'].get('message')))
+                else:
+                    future.set_result(message.get('result', {}))
+        except Exception as e:  # pylint: disable=broad-except
+            logger.debug("DevTools connection closed: %s", e)
+        with self._lock:
+            self.closed = True
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.set_exception(WebDriverException('DevTools connection is closed.'))
+        self.events.put(None)
+
+    def close(self) -> None:
+        """ Close the websocket. """
+        self._ws.close()
+
+
+class NetworkInterceptor:
+    """ Apply NetworkRules to the requests of one driver.
+    Attributes:
+        rules(NetworkRules): blocking and caching rules.
+        stats(NetworkStats): counters of this driver.
+    """
+
+    def __init__(self, driver: Remote, rules: NetworkRules, cache: Optional[ResponseCache] = None) -> None:
+        self.rules = rules
+        self.stats = NetworkStats()
+        self._cache = cache if cache is not None or not rules.response_cache else ResponseCache()
+        self._connection = _DevToolsConnection(self._websocket_url(driver))
+        patterns: List[Dict[str, str]] = [{'urlPattern': '*', 'requestStage': 'Request'}]
+        if self._cache is not None:
+            patterns += [{'urlPattern': '*', 'resourceType': t, 'requestStage': 'Response'} for t in CACHED_TYPES]
+        self._connection.send('Fetch.enable', {'patterns': patterns})
+        threading.Thread(target=self._handle_events, name='network-interceptor', daemon=True).start()
+
+    @staticmethod
+    def _websocket_url(driver: Remote) -> str:
+        """ DevTools websocket of the page target the driver controls.
+        Arguments:
+            driver(Remote): Chrome webdriver.
+        Returns:
+            str: websocket URL.
+        Raises:
+            WebDriverException: Chrome does not expose a debugger address.
+        """
+        address = (driver.capabilities.get('goog:chromeOptions') or {}).get('debuggerAddress')
+        if not address:
+            raise WebDriverException('Chrome does not expose a debugger address.')
+        target = driver.execute_cdp_cmd('Target.getTargetInfo', {})['targetInfo']['targetId']
+        return f'ws://{address}/devtools/page/{target}'
+
+    def close(self) -> None:
+        """ Stop intercepting. """
+        try:
+            self._connection.send('Fetch.disable')
+        except WebDriverException:
+            pass
+        self._connection.close()
+
+    def _handle_events(self) -> None:
+        while True:
+            event = self._connection.events.get()
+            if event is None:
+                return
+            if event.get('method') != 'Fetch.requestPaused':
+                continue
+            try:
+                self._on_request_paused(event['params'])
+            except Exception as e:  # pylint: disable=broad-except
+                # e.g. a DevTools command timed out: keep handling the next requests.
+                logger.debug("Paused request not handled: %s", e)
+
+    def _count(self, **counts: int) -> None:
+        self.stats.add(**counts)
+        get_network_stats().add(**counts)
+
+    def _on_request_paused(self, params: Dict[str, Any]) -> None:
+        request_id = params['requestId']
+        request = params['request']
+        url, resource_type = request['url'], params.get('resourceType', 'Other')
+        cacheable = self._cache is not None and request['method'] == 'GET' and resource_type in CACHED_TYPES
+        if 'responseStatusCode' in params:
+            fulfilled = False
+            try:
+                fulfilled = cacheable and self._on_response(request_id, url, params)
+            finally:
+                # A request left paused would hang the page.
+                if not fulfilled:
+                    self._connection.send('Fetch.continueResponse', {'requestId': request_id}, wait=False)
+            return
+        if self.rules.blocks(url, resource_type):
+            self._count(blocked=1)
+            self._connection.send('Fetch.failRequest', {'requestId': request_id, 'errorReason': 'BlockedByClient'},
+                                  wait=False)
+            return
+        cached = self._cache.get(url) if cacheable and self._cache is not None else None
+        if cached is not None and cached.fresh:
+            self._fulfill(request_id, cached)
+            return
+        headers = [{'name': name, 'value': value} for name, value in request.get('headers', {}).items()]
+        validators = cached.validators() if cached is not None else []
+        if validators and not any(h['name'].lower().startswith('if-') for h in headers):
+            self._connection.send('Fetch.continueRequest', {'requestId': request_id, 'headers': headers + validators},
+                                  wait=False)
+            return
+        self._connection.send('Fetch.continueRequest', {'requestId': request_id}, wait=False)
+
+    def _on_response(self, request_id: str, url: str, params: Dict[str, Any]) -> bool:
+        """ Store a cacheable response, or answer a revalidated one from the cache.
+        Arguments:
+            request_id(str): paused request.
+            url(str): request URL.
+            params(Dict[str, Any]): Fetch.requestPaused event parameters at the response stage.
+        Returns:
+            bool: return True if the request was fulfilled from the cache, False to continue the response.
+        """
+        status, raw_headers = params['responseStatusCode'], params.get('responseHeaders', [])
+        if status == 200:
+            self._store(request_id, url, raw_headers)
+            return False
+        cached = self._cache.get(url) if status == 304 and self._cache is not None else None
+        if cached is None:
+            return False
+        # Not modified: serve the cached body, fresh again for the lifetime given by the server.
+        expires = freshness_lifetime(raw_headers)
+        if expires is not None and self._cache is not None:
+            self._cache.put(url, cached._replace(expires=expires))
+        self._fulfill(request_id, cached)
+        return True
+
+    def _fulfill(self, request_id: str, cached: CachedResponse) -> None:
+        self._count(cache_hits=1, bytes_from_cache=len(cached.body))
+        self._connection.send('Fetch.fulfillRequest', {
+            'requestId': request_id,
+            'responseCode': cached.status,
+            'responseHeaders': cached.headers,
+            'body': base64.b64encode(cached.body).decode('ascii'),
+        }, wait=False)
+
+    def _store(self, request_id: str, url: str, raw_headers: List[Dict[str, str]]) -> None:
+        expires = freshness_lifetime(raw_headers)
+        if expires is None or self._cache is None:
+            return
+        headers = [h for h in raw_headers if h['name'].lower() not in UNCACHED_HEADERS]
+        result = self._connection.send('Fetch.getResponseBody', {'requestId': request_id})
+        body = base64.b64decode(result['body']) if result.get('base64Encoded') else result['body'].encode('utf8')
+        self._cache.put(url, CachedResponse(200, headers, body, expires))
+        self._count(cache_stores=1)
+
+
+_interceptors: 'weakref.WeakKeyDictionary[Remote, NetworkInterceptor]' = weakref.WeakKeyDictionary()
+_stats = NetworkStats()
+
+
+def get_network_stats() -> NetworkStats:
+    """ Counters of every driver of this process.
+    Returns:
+        NetworkStats: process wide counters.
+    """
+    return _stats
+
+
+def attach_network(driver: Remote, rules: NetworkRules) -> Optional[NetworkInterceptor]:
+    """ Apply network rules to a Chrome driver.
+    Without websocket-client, URL patterns are blocked through Network.setBlockedURLs only.
+    Arguments:
+        driver(Remote): Chrome webdriver.
+        rules(NetworkRules): blocking and caching rules.
+    Returns:
+        Optional[NetworkInterceptor]: interceptor, None when rules are empty or the fallback is used.
+    """
+    if not rules:
+        return None
+    try:
+        interceptor = NetworkInterceptor(driver, rules)
+    except ImportError:
+        logger.info("websocket-client is not installed: only URL patterns are blocked, nothing is cached.")
+    except WebDriverException as e:
+        logger.warning("DevTools network interception unavailable: %s", e)
+    else:
+        _interceptors[driver] = interceptor
+        return interceptor
+    if rules.block_urls:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(rules.block_urls)})
+    return None
+
+
+def get_interceptor(driver: Remote) -> Optional[NetworkInterceptor]:
+    """ Interceptor attached to a driver.
+    Arguments:
+        driver(Remote): Chrome webdriver.
+    Returns:
+        Optional[NetworkInterceptor]: interceptor, None when none is attached.
+    """
+    return _interceptors.get(driver)
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+""" Load performance of the pages opened by the page objects
+
+One script call after each navigation reads Navigation Timing, paint and
+largest contentful paint entries and a summary of the resource timings.
+Runs are compared page by page with a stored baseline, on the median load
+time, so the functional suite can gate front-end performance regressions.
+"""
+
+import json
+import logging
+import statistics
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver import Remote
+
+logger = logging.getLogger(__name__)
+
+# Slowest resources kept per page load
+SLOWEST_RESOURCES = 5
+
+# Regressions smaller than this are noise, whatever the tolerance
+MIN_REGRESSION_MS = 50.0
+
+""" Timings of the current document in msec from navigation start, null when not reached.
+LCP entries are only exposed to observers: a buffered observer holds them synchronously
+until takeRecords, so one synchronous call is enough.
+"""
+PAGE_METRICS_JS = """
+var slowest = arguments[0];
+var nav = performance.getEntriesByType('navigation')[0];
+var timing = function (value) { return value > 0 ? value : null; };
+var paints = {};
+performance.getEntriesByType('paint').forEach(function (e) { paints[e.name] = e.startTime; });
+var lcp = null;
+try {
+    var observer = new PerformanceObserver(function () {});
+    observer.observe({type: 'largest-contentful-paint', buffered: true});
+    var entries = observer.takeRecords();
+    observer.disconnect();
+    if (entries.length) { lcp = entries[entries.length - 1].startTime; }
+} catch (e) {}
+var resources = performance.getEntriesByType('resource');
+var bytes = 0;
+resources.forEach(function (e) { bytes += e.transferSize || 0; });
+var top = resources.slice().sort(function (a, b) { return b.duration - a.duration; }).slice(0, slowest)
+    .map(function (e) { return [e.name, e.duration]; });
+return {
+    url: location.href,
+    ttfb: nav ? timing(nav.responseStart) : null,
+    dom_content_loaded: nav ? timing(nav.domContentLoadedEventEnd) : null,
+    load: nav ? timing(nav.loadEventEnd) : null,
+    first_paint: timing(paints['first-paint']),
+    first_contentful_paint: timing(paints['first-contentful-paint']),
+    largest_contentful_paint: timing(lcp),
+    resources: resources.length,
+    transfer_bytes: bytes + (nav ? nav.transferSize || 0 : 0),
+    slowest: top
+};
+"""
+
+
+class PageMetrics(NamedTuple):
+    """ Load performance of one page, times in msec from navigation start.
+    Attributes:
+        page(str): page object class name.
+        url(str): loaded URL.
+        ttfb_ms(Optional[float]): first byte of the document.
+        dom_content_loaded_ms(Optional[float]): end of DOMContentLoaded.
+        load_ms(Optional[float]): end of the load event, None while the page is still loading.
+        first_paint_ms(Optional[float]): first paint.
+        first_contentful_paint_ms(Optional[float]): first contentful paint.
+        largest_contentful_paint_ms(Optional[float]): latest largest contentful paint candidate.
+        resources(int): number of subresources fetched.
+        transfer_bytes(int): bytes fetched for the document and its subresources, cached ones count 0.
+        slowest(List[Tuple[str, float]]): URL and duration of the slowest subresources.
+    """
+    page: str
+    url: str
+    ttfb_ms: Optional[float]
+    dom_content_loaded_ms: Optional[float]
+    load_ms: Optional[float]
+    first_paint_ms: Optional[float]
+    first_contentful_paint_ms: Optional[float]
+    largest_contentful_paint_ms: Optional[float]
+    resources: int
+    transfer_bytes: int
+    slowest: List[Tuple[str, float]]
+
+
+def read_page_metrics(driver: Remote, page: str) -> Optional[PageMetrics]:
+    """ Read the load performance of the current document with one script call.
+    Arguments:
+        driver(Remote): webdriver.
+        page(str): page object class name.
+    Returns:
+        Optional[PageMetrics]: metrics, None when the browser did not answer.
+    """
+    try:
+        raw: Dict[str, Any] = driver.execute_script(PAGE_METRICS_JS, SLOWEST_RESOURCES)
+    except WebDriverException as e:
+        logger.debug("Page metrics of %s not read: %s", page, e)
+        return None
+    return PageMetrics(page, raw['url'], raw['ttfb'], raw['dom_content_loaded'], raw['load'], raw['first_paint'],
+                       raw['first_contentful_paint'], raw['largest_contentful_paint'], int(raw['resources']),
+                       int(raw['transfer_bytes']), [(name, float(ms)) for name, ms in raw['slowest']])
+
+
+class PageMetricsLog:
+    """ Page metrics recorded by Base.navigate while enabled.
+    Attributes:
+        enabled(bool): read the metrics after each navigation, one more script call each.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._records: List[PageMetrics] = []
+        self._lock = threading.Lock()
+
+    def add(self, metrics: PageMetrics) -> None:
+        """ Record the metrics of a page load.
+        Arguments:
+            metrics(PageMetrics): metrics.
+        """
+        with self._lock:
+            self._records.append(metrics)
+
+    def take(self) -> List[PageMetrics]:
+        """ Records since the last call.
+        Returns:
+            List[PageMetrics]: records in load order.
+        """
+        with self._lock:
+            records, self._records = self._records, []
+        return records
+
+
+_log = PageMetricsLog()
+
+
+def get_page_metrics_log() -> PageMetricsLog:
+    """ Page metrics log of this process.
+    Returns:
+        PageMetricsLog: process wide log.
+    """
+    return _log
+
+
+class Regression(NamedTuple):
+    """ Page whose median load time went over its baseline.
+    Attributes:
+        page(str): page object class name.
+        baseline_ms(float): stored median load time.
+        median_ms(float): median load time of this run.
+        limit_ms(float): highest accepted median.
+    """
+    page: str
+    baseline_ms: float
+    median_ms: float
+    limit_ms: float
+
+
+def _load_time_metric(loads: List[Dict[str, Any]]) -> str:
+    """ Timing compared with the baseline: the load event, or DOMContentLoaded when a load was read before its
+    load event, e.g. with the 'eager' strategy. One kind is used for every load of a page, so medians are not mixed.
+    """
+    return 'load_ms' if all(load.get('load_ms') is not None for load in loads) else 'dom_content_loaded_ms'
+
+
+def summarize(records: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """ Median timings of each page.
+    Arguments:
+        records(List[Dict[str, Any]]): PageMetrics as dicts, e.g. read back from a run file.
+    Returns:
+        Dict[str, Dict[str, Any]]: loads and median of each timing by page, with the median load time and the
+            name of the timing it was taken from in load_time_metric.
+    """
+    pages: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        pages.setdefault(record['page'], []).append(record)
+    summary: Dict[str, Dict[str, Any]] = {}
+    for page, loads in sorted(pages.items()):
+        figures: Dict[str, Any] = {'loads': len(loads)}
+        for name in ('ttfb_ms', 'dom_content_loaded_ms', 'load_ms', 'first_contentful_paint_ms',
+                     'largest_contentful_paint_ms', 'transfer_bytes'):
+            values = [load[name] for load in loads if load.get(name) is not None]
+            if values:
+                figures[name] = round(statistics.median(values), 1)
+        metric = _load_time_metric(loads)
+        if metric in figures:
+            figures['load_time_ms'] = figures[metric]
+            figures['load_time_metric'] = metric
+        summary[page] = figures
+    return summary
+
+
+def load_baseline(path: str) -> Dict[str, Dict[str, Any]]:
+    """ Read a baseline written by save_baseline.
+    Arguments:
+        path(str): baseline file.
+    Returns:
+        Dict[str, Dict[str, Any]]: median timings by page, empty when the file is missing or broken.
+    """
+    try:
+        with open(path, encoding='utf8') as f:
+            return {str(page): dict(figures) for page, figures in json.load(f).items()}
+    except (OSError, ValueError, AttributeError, TypeError) as e:
+        logger.debug("No page metrics baseline loaded from %s: %s", path, e)
+        return {}
+
+
+def save_baseline(path: str, summary: Dict[str, Dict[str, Any]]) -> None:
+    """ Merge the medians of a run into a baseline file.
+    Arguments:
+        path(str): baseline file.
+        summary(Dict[str, Dict[str, Any]]): result of summarize.
+    """
+    baseline = load_baseline(path)
+    baseline.update(summary)
+    with open(path, 'w', encoding='utf8') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+
+
+def _reference(figures: Dict[str, Any], metric: str) -> Optional[float]:
+    """ Baseline median of the load time timing of a run, None when the baseline measured another timing. """
+    stored = figures.get('load_time_metric')
+    if stored is None:
+        # Baseline written before the timing was stored: its median of the same timing.
+        return figures.get(metric)
+    return figures.get('load_time_ms') if stored == metric else None
+
+
+def find_regressions(summary: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+                     tolerance: float) -> List[Regression]:
+    """ Pages whose median load time is over the baseline by more than the tolerance.
+    A page is only compared when the baseline measured the same timing, load event or DOMContentLoaded.
+    Arguments:
+        summary(Dict[str, Dict[str, Any]]): result of summarize for this run.
+        baseline(Dict[str, Dict[str, Any]]): stored medians, pages missing from it are not checked.
+        tolerance(float): accepted slowdown, e.g. 0.2 for 20%. At least MIN_REGRESSION_MS is accepted.
+    Returns:
+        List[Regression]: regressions by page name.
+    """
+    regressions = []
+    for page, figures in summary.items():
+        median = figures.get('load_time_ms')
+        if median is None or page not in baseline:
+            continue
+        reference = _reference(baseline[page], figures['load_time_metric'])
+        if reference is None:
+            logger.info("Load time of %s not compared: the baseline measured %s, this run %s.", page,
+                        baseline[page].get('load_time_metric'), figures['load_time_metric'])
+            continue
+        limit = max(reference * (1 + tolerance), reference + MIN_REGRESSION_MS)
+        if median > limit:
+            regressions.append(Regression(page, reference, median, round(limit, 1)))
+    return regressions
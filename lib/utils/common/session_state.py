@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+""" Snapshot and restore of the browser state reached by a setup flow
+
+A setup flow (sign in, accept the consent, fill a cart...) is driven once, then
+its cookies, localStorage, sessionStorage and URL are captured and cached on
+disk under a key and a declared version. Later sessions restore the snapshot
+with one navigation instead of driving the flow again. A snapshot of another
+version, or whose sign-in cookies expired, is stale: the flow runs again.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+from urllib.parse import urljoin, urlsplit
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver import Remote
+
+from lib.utils.common.web_element.element import Element
+from lib.utils.common.web_element.wait import install_ready_hook
+
+logger = logging.getLogger(__name__)
+
+# Layout of the snapshot files, snapshots of another layout are stale
+STATE_FORMAT = 1
+
+# Cookie fields of the WebDriver format kept in a snapshot
+COOKIE_FIELDS = ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'expiry', 'sameSite')
+
+""" Returns {local, session}: localStorage and sessionStorage of the current document """
+READ_STORAGE_JS = """
+function read(storage) {
+    var items = {};
+    for (var i = 0; i < storage.length; i++) {
+        var name = storage.key(i);
+        items[name] = storage.getItem(name);
+    }
+    return items;
+}
+return {local: read(window.localStorage), session: read(window.sessionStorage)};
+"""
+
+""" arguments[0]: localStorage items, arguments[1]: sessionStorage items. Replaces the storage of the origin """
+WRITE_STORAGE_JS = """
+function write(storage, items) {
+    storage.clear();
+    for (var name in items) {
+        storage.setItem(name, items[name]);
+    }
+}
+write(window.localStorage, arguments[0]);
+write(window.sessionStorage, arguments[1]);
+"""
+
+""" Registered before the navigation of a restore: writes the storage in the top document of the snapshot origin
+before the page scripts read it. Formatted with the origin and the items as JSON """
+SEED_STORAGE_JS = """
+(function (origin, local, session) {
+    if (window.top !== window || window.location.origin !== origin) {
+        return;
+    }
+    function write(storage, items) {
+        storage.clear();
+        for (var name in items) {
+            storage.setItem(name, items[name]);
+        }
+    }
+    write(window.localStorage, local);
+    write(window.sessionStorage, session);
+})(%s, %s, %s);
+"""
+
+
+class SessionState(NamedTuple):
+    """ Browser state captured after a setup flow.
+    Attributes:
+        key(str): name of the setup flow.
+        version(str): declared version of the setup flow, bump it when the flow or the site changes.
+        url(str): URL of the page the flow ended on.
+        cookies(List[Dict[str, Any]]): cookies of every domain in the WebDriver format.
+        local_storage(Dict[str, str]): localStorage of the origin of url.
+        session_storage(Dict[str, str]): sessionStorage of the origin of url.
+    """
+    key: str
+    version: str
+    url: str
+    cookies: List[Dict[str, Any]]
+    local_storage: Dict[str, str]
+    session_storage: Dict[str, str]
+
+    @property
+    def expires_at(self) -> Optional[float]:
+        """ Epoch time the first sign-in cookie expires, None when they last the session.
+        Sign-in cookies are the HttpOnly cookies of the site of url, or all of its cookies when it sets none, so
+        short-lived tracking and third-party cookies do not make the snapshot stale.
+        """
+        host = urlsplit(self.url).hostname or ''
+        own = [cookie for cookie in self.cookies if _same_site(str(cookie.get('domain', '')), host)]
+        auth = [cookie for cookie in own if cookie.get('httpOnly')] or own
+        expiries = [float(cookie['expiry']) for cookie in auth if cookie.get('expiry') is not None]
+        return min(expiries) if expiries else None
+
+
+def _same_site(domain: str, host: str) -> bool:
+    """ Whether a cookie of a domain is sent to a host. """
+    domain = domain.lstrip('.')
+    return bool(domain) and (host == domain or host.endswith('.' + domain))
+
+
+def _from_cdp(cookie: Dict[str, Any]) -> Dict[str, Any]:
+    """ WebDriver format of a DevTools cookie. """
+    converted = {name: cookie[name] for name in COOKIE_FIELDS if name in cookie}
+    if not cookie.get('session') and cookie.get('expires', -1) >= 0:
+        converted['expiry'] = int(cookie['expires'])
+    return converted
+
+
+def _to_cdp(cookie: Dict[str, Any]) -> Dict[str, Any]:
+    """ DevTools CookieParam of a WebDriver cookie. """
+    converted = {name: cookie[name] for name in COOKIE_FIELDS if name in cookie and name != 'expiry'}
+    if cookie.get('expiry') is not None:
+        converted['expires'] = cookie['expiry']
+    return converted
+
+
+def capture_state(driver: Remote, key: str, version: str) -> SessionState:
+    """ Capture the state of the browser. With DevTools, cookies of every domain are captured,
+    otherwise only those visible from the current page.
+    Arguments:
+        driver(Remote): webdriver.
+        key(str): name of the setup flow.
+        version(str): declared version of the setup flow.
+    Returns:
+        SessionState: snapshot.
+    """
+    try:
+        cookies = [_from_cdp(cookie) for cookie in driver.execute_cdp_cmd('Network.getAllCookies', {})['cookies']]
+    except (AttributeError, WebDriverException) as e:
+        logger.debug("Cookies of the current page only captured: %s", e)
+        cookies = [{name: cookie[name] for name in COOKIE_FIELDS if name in cookie} for cookie in driver.get_cookies()]
+    storage: Dict[str, Dict[str, str]] = driver.execute_script(READ_STORAGE_JS)
+    return SessionState(key, version, driver.current_url, cookies, storage['local'], storage['session'])
+
+
+def _restore_with_cdp(driver: Remote, state: SessionState, origin: str) -> None:
+    """ Set the cookies and register the storage before one navigation to the snapshot URL. """
+    driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+    driver.execute_cdp_cmd('Network.setCookies', {'cookies': [_to_cdp(cookie) for cookie in state.cookies]})
+    seed = SEED_STORAGE_JS % (json.dumps(origin), json.dumps(state.local_storage), json.dumps(state.session_storage))
+    script = driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': seed})['identifier']
+    try:
+        driver.get(state.url)
+    finally:
+        driver.execute_cdp_cmd('Page.removeScriptToEvaluateOnNewDocument', {'identifier': script})
+
+
+def _restore_with_webdriver(driver: Remote, state: SessionState) -> None:
+    """ Open the snapshot origin to set its cookies and storage, then load the snapshot URL. """
+    driver.get(urljoin(state.url, '/'))
+    driver.delete_all_cookies()
+    for cookie in state.cookies:
+        try:
+            driver.add_cookie(cookie)
+        except WebDriverException as e:
+            logger.debug("Cookie %s of %s not restored: %s", cookie.get('name'), cookie.get('domain'), e)
+    driver.execute_script(WRITE_STORAGE_JS, state.local_storage, state.session_storage)
+    driver.get(state.url)
+
+
+def restore_state(driver: Remote, state: SessionState) -> None:
+    """ Restore a snapshot into the browser and load its URL, dropping the WebElements of the previous page.
+    With DevTools this is one navigation, otherwise two and only cookies of the snapshot origin are restored.
+    Arguments:
+        driver(Remote): webdriver.
+        state(SessionState): snapshot.
+    """
+    parts = urlsplit(state.url)
+    Element.invalidate_cache(driver)
+    # Registered for wait_until_ready as Base.navigate does, it also tells whether DevTools is available.
+    if install_ready_hook(driver):
+        try:
+            _restore_with_cdp(driver, state, f'{parts.scheme}://{parts.netloc}')
+            return
+        except WebDriverException as e:
+            logger.debug("Session state %s not restored with DevTools: %s", state.key, e)
+    _restore_with_webdriver(driver, state)
+
+
+class SessionStateCache:
+    """ Snapshots by setup flow, kept in memory and in one file per key.
+    Attributes:
+        directory(str): directory of the snapshot files, they hold session cookies: keep it out of version control.
+        refresh(bool): ignore the snapshot files of earlier runs, every setup flow runs once again (default=False).
+    """
+
+    def __init__(self, directory: str, refresh: bool = False) -> None:
+        self.directory = directory
+        self.refresh = refresh
+        self._states: Dict[str, SessionState] = {}
+        self._lock = threading.Lock()
+
+    def path(self, key: str) -> str:
+        """ File of the snapshot of a key.
+        Arguments:
+            key(str): name of the setup flow.
+        Returns:
+            str: file path.
+        """
+        return os.path.join(self.directory, re.sub(r'[^\w.-]', '_', key) + '.json')
+
+    def load(self, key: str, version: str) -> Optional[SessionState]:
+        """ Fresh snapshot of a setup flow.
+        Arguments:
+            key(str): name of the setup flow.
+            version(str): declared version of the setup flow.
+        Returns:
+            Optional[SessionState]: snapshot, None when missing or stale.
+        """
+        with self._lock:
+            state = self._states.get(key)
+        if state is None and not self.refresh:
+            state = self._read(key)
+        if state is None:
+            return None
+        expires_at = state.expires_at
+        if state.version != version:
+            logger.info("Session state %s is stale: version %s, declared %s.", key, state.version, version)
+            state = None
+        elif expires_at is not None and expires_at <= time.time():
+            logger.info("Session state %s is stale: a sign-in cookie expired at %s.", key, time.ctime(expires_at))
+            state = None
+        with self._lock:
+            if state is None:
+                self._states.pop(key, None)
+            else:
+                self._states[key] = state
+        return state
+
+    def _read(self, key: str) -> Optional[SessionState]:
+        """ Snapshot file of a key, None when missing, broken or of another layout. """
+        try:
+            with open(self.path(key), encoding='utf8') as f:
+                data = json.load(f)
+            if data.pop('format') != STATE_FORMAT:
+                return None
+            return SessionState(**data)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.debug("No session state %s loaded: %s", key, e)
+            return None
+
+    def save(self, state: SessionState) -> None:
+        """ Keep a snapshot and write its file, readable by the owner only.
+        Arguments:
+            state(SessionState): snapshot.
+        """
+        with self._lock:
+            self._states[state.key] = state
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(state.key)
+        temporary = f'{path}.{os.getpid()}.tmp'
+        with open(os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w', encoding='utf8') as f:
+            json.dump(dict(state._asdict(), format=STATE_FORMAT), f, indent=2)
+        # Atomic, so pytest-xdist workers running the same flow never read half a file.
+        os.replace(temporary, path)
+
+    def prepare(self, driver: Remote, key: str, version: str, setup: Callable[[Remote], Any]) -> SessionState:
+        """ Restore the snapshot of a setup flow, or run the flow and capture it when there is no fresh one.
+        Arguments:
+            driver(Remote): webdriver.
+            key(str): name of the setup flow.
+            version(str): declared version of the setup flow.
+            setup(Callable[[Remote], Any]): setup flow, ends on the page the tests start from.
+        Returns:
+            SessionState: snapshot now loaded in the browser.
+        """
+        state = self.load(key, version)
+        if state is not None:
+            started = time.monotonic()
+            restore_state(driver, state)
+            logger.info("Session state %s restored in %.3f sec.", key, time.monotonic() - started)
+            return state
+        started = time.monotonic()
+        setup(driver)
+        state = capture_state(driver, key, version)
+        self.save(state)
+        logger.info("Session state %s set up in %.3f sec and captured.", key, time.monotonic() - started)
+        return state
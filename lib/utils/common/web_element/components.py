@@ -0,0 +1,224 @@
+""" Lazy collections of the Components of list-typed Test IDs. """
+from typing import cast, overload, Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar, Union
+import logging
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver import Remote
+from selenium.webdriver.remote.webelement import WebElement
+
+from .element import Element
+from .scripts import ATTACHED_JS, SLICE_JS
+from .trace import get_tracer
+from .wait import Condition, wait_until
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class ComponentList(Sequence[T]):
+    """ Lazy, read-only list of the Components of a list-typed Test ID.
+    Matches are located by script in the browser; their WebElements are fetched and wrapped only when accessed.
+    len() takes one count query, indexing and slicing one query for the missing range, and iteration one
+    query per chunk, chunks starting at chunk_size elements and doubling. The first query waits for a match
+    like the eager list did, and its count is kept until the page object rebuilds the collection after
+    navigation, or lowered when a later query finds fewer matches. Elements not fetched yet are located when
+    accessed, so matches inserted before them meanwhile shift them.
+    Attributes:
+        driver(Remote): Web Driver.
+        root(Union[Remote, WebElement]): driver or parent element to search in.
+        locator(Tuple[str, str]): search method and value.
+        page_object_type(Callable[..., T]): Component type, called with the driver and a WebElement.
+        url(Optional[str]): page URL of the first query.
+        name(Optional[str]): page object attribute name, used by tracing (default=None).
+        page(Optional[str]): page object class name, used by tracing (default=None).
+    Class Attributes:
+        max_wait(float): maximum wait time of the first query for a match (default=10sec).
+        chunk_size(int): elements fetched by the first query of an iteration (default=20).
+    """
+    max_wait: float = 10
+    chunk_size: int = 20
+
+    def __init__(self,
+                 driver: Remote,
+                 root: Union[Remote, WebElement],
+                 locator: Tuple[str, str],
+                 page_object_type: Callable[..., T],
+                 elements: Optional[List[WebElement]] = None,
+                 url: Optional[str] = None,
+                 name: Optional[str] = None,
+                 page: Optional[str] = None) -> None:
+        self.driver = driver
+        self.root = root
+        self.locator = locator
+        self.page_object_type = page_object_type
+        self.url = url
+        self.name = name
+        self.page = page
+        self._count: Optional[int] = None if elements is None else len(elements)
+        self._elements: Dict[int, WebElement] = dict(enumerate(elements or []))
+        self._components: Dict[int, T] = {}
+
+    def __len__(self) -> int:
+        if self._count is None:
+            self.__fetch(0, 0)
+        return cast(int, self._count)
+
+    @overload
+    def __getitem__(self, index: int) -> T:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[T]:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[T, List[T]]:
+        if isinstance(index, slice):
+            if self._count is None and (index.start or 0) >= 0 and (index.stop or -1) >= 0:
+                # e.g. [:3] counts and fetches with the same query
+                self.__ensure(index.start or 0, index.stop)
+            indices = range(*index.indices(len(self)))
+            if indices:
+                self.__ensure(min(indices), max(indices) + 1)
+            return [self.__component(i) for i in indices]
+        if index < 0:
+            index += len(self)
+        if index >= 0:
+            self.__ensure(index, index + 1)
+        if not 0 <= index < len(self):
+            raise IndexError('component index out of range')
+        return self.__component(index)
+
+    def __iter__(self) -> Iterator[T]:
+        return self.stream()
+
+    def __repr__(self) -> str:
+        count = '?' if self._count is None else self._count
+        return f'<ComponentList of {getattr(self.page_object_type, "__name__", "Component")}: {count}>'
+
+    def stream(self, chunk_size: Optional[int] = None) -> Iterator[T]:
+        """ Components in document order, fetched chunk by chunk as the iteration goes.
+        Arguments:
+            chunk_size(Optional[int]): fixed number of elements fetched per query, 1 fetches each on its own.
+                None starts at the chunk_size class attribute and doubles the chunk after each query (default=None).
+        Yields:
+            T: Components.
+        Raises:
+            TimeoutException: no element matched within max_wait.
+        """
+        size = max(chunk_size or self.chunk_size, 1)
+        grow = chunk_size is None
+        start = 0
+        while True:
+            self.__ensure(start, start + size)
+            stop = min(start + size, len(self))
+            if start >= stop:
+                return
+            for index in range(start, stop):
+                yield self.__component(index)
+            start = stop
+            size = size * 2 if grow else size
+
+    def fetched(self) -> List[WebElement]:
+        """ WebElements fetched so far.
+        Returns:
+            List[WebElement]: elements in index order.
+        """
+        return [self._elements[index] for index in sorted(self._elements)]
+
+    def is_current(self) -> bool:
+        """ Whether the collection still describes the page, checked with one call once queried:
+        the URL must be unchanged and every fetched WebElement still attached to the document.
+        Returns:
+            bool: return True if the collection can still be used, False otherwise.
+        """
+        if self._count is None:
+            # Not queried yet: the first query sees the current page.
+            return True
+        elems = self.fetched()
+        try:
+            if not elems:
+                return bool(self.driver.current_url == self.url)
+            url, attached = self.driver.execute_script(ATTACHED_JS, elems)
+        except WebDriverException:
+            return False
+        return bool(attached) and url == self.url
+
+    def __component(self, index: int) -> T:
+        """ Component wrapping a fetched element, built once.
+        Arguments:
+            index(int): position in the matches.
+        Returns:
+            T: Component.
+        Raises:
+            IndexError: the element is gone, the matches shrank since they were counted.
+        """
+        component = self._components.get(index)
+        if component is None:
+            if index not in self._elements:
+                raise IndexError(f'component index out of range, matches of "{self.locator[1]}" shrank')
+            component = self._components[index] = self.page_object_type(self.driver, self._elements[index])
+        return component
+
+    def __ensure(self, start: int, stop: int) -> None:
+        """ Fetch the elements from start to stop that are not fetched yet, with one query.
+        Arguments:
+            start(int): first position.
+            stop(int): position after the last one.
+        """
+        if self._count is not None:
+            stop = min(stop, self._count)
+        missing = [index for index in range(start, stop) if index not in self._elements]
+        if missing:
+            self.__fetch(missing[0], missing[-1] + 1)
+        elif self._count is None:
+            self.__fetch(start, start)
+
+    def __fetch(self, start: int, stop: int) -> None:
+        """ Count the matches and fetch the elements from start to stop.
+        The first query waits for a match like the eager list did.
+        Arguments:
+            start(int): first position.
+            stop(int): position after the last one.
+        Raises:
+            TimeoutException: no element matched within max_wait.
+        """
+        found = self.__query(start, stop)
+        if self._count is None:
+            if not found['count']:
+                self.__wait()
+                found = self.__query(start, stop)
+            self._count = found['count']
+            self.url = found['url']
+        elif found['count'] != self._count:
+            logger.debug('Matches of %s changed from %d to %d', self.locator[1], self._count, found['count'])
+            self._count = min(self._count, found['count'])
+        for offset, elem in enumerate(found['elements']):
+            self._elements[start + offset] = elem
+
+    def __query(self, start: int, stop: int) -> Dict[str, Any]:
+        """ Run SLICE_JS.
+        Arguments:
+            start(int): first position.
+            stop(int): position after the last one.
+        Returns:
+            Dict[str, Any]: url, count and elements.
+        """
+        by, value = self.locator
+        parent = self.root if isinstance(self.root, WebElement) else None
+        with get_tracer().command('slice', by, value, self.page, self.name):
+            return cast(Dict[str, Any], self.driver.execute_script(SLICE_JS, parent, by, value, start, stop))
+
+    def __wait(self) -> None:
+        """ Wait until at least one element matches.
+        Raises:
+            TimeoutException: no element matched within max_wait.
+        """
+        by, value = self.locator
+        try:
+            with get_tracer().command('wait_all:presence', by, value, self.page, self.name):
+                wait_until(self.driver, self.root, Condition.PRESENCE, self.locator, self.max_wait,
+                           Element.wait_engine, all_elements=True)
+        except TimeoutException as e:
+            e.msg = f'Waiting for {self.max_wait} sec, but element "{value}":"{by}" is Not Found.'
+            raise e
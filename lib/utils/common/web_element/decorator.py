@@ -1,13 +1,16 @@
 """ Decorator for RNPS POM. """
 import logging
-from typing import TypeVar, Mapping, Any, Union, Optional, Callable, Tuple, List, cast, Dict
+from typing import TypeVar, Mapping, Any, Union, Optional, Callable, Tuple, List, Dict, Iterable, NamedTuple
 
-from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as ec
-from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.remote.webelement import WebElement
 
-from .element import Element
+from .components import ComponentList
+from .element import Element, get_element_cache
+from .exceptions import LocatorError
+from .locator import Locator, compile_locator
+from .scripts import SNAPSHOT_JS
+from .trace import get_tracer
 
 logger = logging.getLogger(__name__)
 
@@ -20,12 +23,56 @@ TestIDValueType = Union[
     str,  # TestID: 'popup'
     Tuple[str, By]]  # XPath: ('//*[@TestId="popup"]//Label[1]', By.XPATH)
 
-AttrValue = Optional[Union[Element, List[Element]]]
+AttrValue = Union[Element, ComponentList[Any]]
+
+""" Instance attribute holding memoized property values """
+MEMO_ATTR = '_elements_memo'
+
+""" Class attribute holding every Test ID declared through @elements, compiled """
+TEST_IDS_ATTR = '_elements_test_ids'
 
 
 # yapf: enable
 
 
+class CompiledTestId(NamedTuple):
+    """ Test ID Dictionary value compiled by @elements.
+    Attributes:
+        locator(Locator): compiled element id.
+        page_object_type(Optional[Callable[..., Any]]): Component type of an Element List, None for an Element.
+        formatted(bool): whether test_id_param fills the fields of the id, only for ids given as a str (default=True).
+    """
+    locator: Locator
+    page_object_type: Optional[Callable[..., Any]]
+    formatted: bool = True
+
+
+def compile_test_id(test_id_key: str, test_id_value: Any) -> CompiledTestId:
+    """ Compile a value of Test ID Dictionary.
+    Arguments:
+        test_id_key(str): key of Test ID Dictionary.
+        test_id_value(Any): value of Test ID Dictionary, see TestIDValueType.
+    Returns:
+        CompiledTestId: compiled locator and Component type.
+    Raises:
+        LocatorError: the value is not a valid Test ID.
+    """
+    if isinstance(test_id_value, str):
+        return CompiledTestId(compile_locator(test_id_value, By.ID), None)
+    if isinstance(test_id_value, tuple) and len(test_id_value) == 2:
+        element_id, kind = test_id_value
+        if isinstance(element_id, str):
+            if isinstance(kind, str):
+                return CompiledTestId(compile_locator(element_id, kind), None)
+            if callable(kind):
+                return CompiledTestId(compile_locator(element_id, By.ID), kind)
+        if isinstance(element_id, tuple) and len(element_id) == 2 and callable(kind):
+            # Used as written: braces are literal, not format fields.
+            literal = element_id[0].replace('{', '{{').replace('}', '}}')
+            return CompiledTestId(compile_locator(literal, element_id[1]), kind, formatted=False)
+    raise LocatorError(f'Invalid Test ID "{test_id_key}": {test_id_value!r}')
+
+
 def id_formatter(element_id: str, test_id_param: Dict[str, str]) -> str:
     """ format element_id string
     Arguments:
@@ -34,78 +81,288 @@ def id_formatter(element_id: str, test_id_param: Dict[str, str]) -> str:
     Returns:
         str: formatted element_id
     """
-    for key, value in test_id_param.items():
-        element_id = element_id.replace(f'{{{key}}}', value)
-    return element_id
+    return compile_locator(element_id).bind(test_id_param).template
+
+
+def _parent_element(self: Any) -> Any:
+    """ Parent element of a component, None for application and page instances.
+    Arguments:
+        self(Any): Component or Application Instance.
+    Returns:
+        Any: parent WebElement or None.
+    """
+    if 'parent_element' in vars(self):
+        return self.parent_element
+    return None
+
+
+def _locator(self: Any, compiled: CompiledTestId) -> Locator:
+    """ Locator of a Test ID, formatted with test_id_param.
+    Arguments:
+        self(Any): Component or Application Instance.
+        compiled(CompiledTestId): compiled value of Test ID Dictionary.
+    Returns:
+        Locator: locator with the test_id_param fields filled, a lookup once seen.
+    """
+    params = getattr(self, 'test_id_param', None)
+    if params and compiled.formatted:
+        return compiled.locator.bind(params)
+    return compiled.locator
+
+
+def _build_attr(self: Any, test_id_key: str, compiled: CompiledTestId,
+                elems: Optional[List[WebElement]] = None, url: Optional[str] = None) -> AttrValue:
+    """ Build an Element or a lazy Element List. Nothing is searched until the value is used.
+    Arguments:
+        self(Any): Component or Application Instance.
+        test_id_key(str): key of Test ID Dictionary.
+        compiled(CompiledTestId): compiled value of Test ID Dictionary.
+        elems(Optional[List[WebElement]]): every match of an Element List when already known (default=None).
+        url(Optional[str]): page URL elems were found on (default=None).
+    Returns:
+        AttrValue: Element or ComponentList.
+    """
+    parent_element = _parent_element(self)
+    root = parent_element or self.driver
+    locator = _locator(self, compiled)
+    page = type(self).__name__
+    if compiled.page_object_type is None:
+        return Element(self.driver, locator, root, name=test_id_key, page=page)
+    return ComponentList(self.driver, root, locator.resolve(document=parent_element is None),
+                         compiled.page_object_type, elements=elems, url=url, name=test_id_key, page=page)
+
+
+class _Memo:
+    """ Memoized attribute value and the state it was built for.
+    Attributes:
+        key(Tuple[Any, ...]): test_id_param and parent element the value was built with.
+        generation(int): element cache generation of the driver when built.
+        value(AttrValue): memoized attribute value.
+    """
+
+    def __init__(self, key: Tuple[Any, ...], generation: int, value: AttrValue) -> None:
+        self.key = key
+        self.generation = generation
+        self.value = value
+
+    def is_valid(self, key: Tuple[Any, ...], generation: int) -> bool:
+        """ Whether the memoized value can still be returned.
+        A list value is checked with one script call once it fetched elements: the URL must be
+        unchanged and every fetched WebElement still attached to the document.
+        Arguments:
+            key(Tuple[Any, ...]): current test_id_param and parent element.
+            generation(int): current element cache generation.
+        Returns:
+            bool: return True if the value is still valid, False otherwise.
+        """
+        if key != self.key or generation != self.generation:
+            return False
+        if isinstance(self.value, ComponentList):
+            return self.value.is_current()
+        return True
+
+
+def _memo_key(self: Any) -> Tuple[Any, ...]:
+    """ State an attribute value depends on besides the page.
+    Arguments:
+        self(Any): Component or Application Instance.
+    Returns:
+        Tuple[Any, ...]: test_id_param items and parent element identity.
+    """
+    params = getattr(self, 'test_id_param', None) or {}
+    return (tuple(sorted(params.items())), id(_parent_element(self)))
+
+
+def _make_property(test_id_key: str, compiled: CompiledTestId, memoize: bool) -> property:
+    """ Make the property returning the Element of one Test ID.
+    Arguments:
+        test_id_key(str): key of Test ID Dictionary.
+        compiled(CompiledTestId): compiled value of Test ID Dictionary.
+        memoize(bool): reuse the value per instance until the page or test_id_param changes.
+    Returns:
+        property: property for the class.
+    """
+
+    def get_attr(self: Any) -> AttrValue:
+        """ Returns an Element or Element List.
+        Arguments:
+            self(Any): Component or Application Instance.
+        Returns:
+            AttrValue: Element or ComponentList
+        """
+        if not memoize:
+            return _build_attr(self, test_id_key, compiled)
+
+        memos: Dict[str, _Memo] = vars(self).setdefault(MEMO_ATTR, {})
+        key = _memo_key(self)
+        generation = get_element_cache(self.driver).generation
+        memo = memos.get(test_id_key)
+        if memo is not None and memo.is_valid(key, generation):
+            return memo.value
 
+        value = _build_attr(self, test_id_key, compiled)
+        memos[test_id_key] = _Memo(key, generation, value)
+        return value
 
-def elements(test_ids: Mapping[str, object]) -> Callable[[Tclass], Tclass]:
+    return property(get_attr)
+
+
+def elements(test_ids: Mapping[str, object], memoize: bool = True) -> Callable[[Tclass], Tclass]:
     """ Decorator to add properties to a class.
+    Property values are memoized per instance. Element values are lazy and survive
+    navigation. Element List values are lazy ComponentList sequences, dropped when the URL or document changes.
+    Both are rebuilt when test_id_param changes.
+    Test IDs are compiled once here, so an invalid one fails when the page object module is imported.
     Arguments:
         test_ids(Mapping[str, object]): test_id dictionary object.
+        memoize(bool): memoize property values per instance (default=True).
     Returns:
         class(Callable[[Tclass], Tclass]): Class with properties named by values in the test_ids dictionary.
+    Raises:
+        LocatorError: a Test ID is invalid.
     """
+    compiled = {key: compile_test_id(key, value) for key, value in test_ids.items()}
 
     def deco(cls: Tclass) -> Tclass:
         """ Sets up each property to be Element """
-        value = None
-        for test_id_key, value in test_ids.items():
-
-            def get_attr(
-                    self: Any,
-                    test_id_value: TestIDValueType = cast(TestIDValueType, value)
-            ) -> AttrValue:
-                """ Returns an Element or Element List.
-                Arguments:
-                    self(Any): Component or Application Instance.
-                    test_id_value(TestIDValueType): value of Test ID Dictionary.
-                Returns:
-                    AttrValue: None or Element or List[Element]
-                Raises:
-                    TimeoutException: WebElement is not found, only when specifying Component type.
-                """
-                parent_element = self.driver
-                if 'parent_element' in vars(self):
-                    parent_element = self.parent_element
-
-                if isinstance(test_id_value, tuple):
-                    element_id = test_id_value[0]
-                    page_object_type = test_id_value[1]
-                    if isinstance(element_id, str):
-                        if hasattr(self, 'test_id_param'):
-                            element_id = id_formatter(element_id,
-                                                      self.test_id_param)
-                        if page_object_type is By.XPATH:
-                            return Element(self.driver, element_id,
-                                           parent_element or self.driver, True)
-                        if page_object_type is By.ID:
-                            return Element(self.driver, element_id,
-                                           parent_element or self.driver,
-                                           False)
-                    by = By.ID
-                    if isinstance(element_id, tuple):
-                        by = By.XPATH
-                        element_id = element_id[0]
-
-                    root = parent_element if parent_element else self.driver
-                    try:
-                        elems = WebDriverWait(root, 10).until(
-                            ec.presence_of_all_elements_located(
-                                (by, element_id)))
-                    except TimeoutException as e:
-                        e.msg = f'Waiting for 10 sec, but element "{element_id}":"{by}" is Not Found.'
-                        raise e
-                    return [page_object_type(self.driver, e) for e in elems]
-
-                element_id = test_id_value
-                if hasattr(self, 'test_id_param'):
-                    element_id = id_formatter(test_id_value,
-                                              self.test_id_param)
-                return Element(self.driver, element_id, parent_element or self.driver, False)
-
-            prop = property(get_attr)
-            setattr(cls, test_id_key, prop)
+        for test_id_key, value in compiled.items():
+            setattr(cls, test_id_key, _make_property(test_id_key, value, memoize))
+        declared = dict(getattr(cls, TEST_IDS_ATTR, {}))
+        declared.update(compiled)
+        setattr(cls, TEST_IDS_ATTR, declared)
         return cls
 
     return deco
+
+
+class ElementState(NamedTuple):
+    """ State of one Test ID in a page snapshot.
+    Attributes:
+        present(bool): at least one element matched.
+        visible(bool): every matched element is displayed.
+        elements(List[WebElement]): first match of an Element, every match of an Element List.
+    """
+    present: bool
+    visible: bool
+    elements: List[WebElement]
+
+
+class PageSnapshot:
+    """ States of the Test IDs of a page object, resolved with one script call.
+    Attributes:
+        url(str): page URL when the snapshot was taken.
+        states(Dict[str, ElementState]): state per Test ID key.
+    """
+
+    def __init__(self, url: str, states: Dict[str, ElementState]) -> None:
+        self.url = url
+        self.states = states
+
+    def __getitem__(self, key: str) -> ElementState:
+        return self.states[key]
+
+    def all_present(self, keys: Iterable[str]) -> bool:
+        """ Whether every key matched at least one element.
+        Arguments:
+            keys(Iterable[str]): Test ID keys.
+        Returns:
+            bool: return True if every key is present, False otherwise.
+        """
+        return all(self.states[key].present for key in keys)
+
+    def all_visible(self, keys: Iterable[str]) -> bool:
+        """ Whether every key is displayed.
+        Arguments:
+            keys(Iterable[str]): Test ID keys.
+        Returns:
+            bool: return True if every key is visible, False otherwise.
+        """
+        return all(self.states[key].visible for key in keys)
+
+
+def snapshot_keys(self: Any, keys: Iterable[str]) -> List[str]:
+    """ Check that Test ID keys can be resolved by a snapshot.
+    Arguments:
+        self(Any): Component or Application Instance decorated with @elements.
+        keys(Iterable[str]): Test ID keys.
+    Returns:
+        List[str]: the keys.
+    Raises:
+        ValueError: a key is not declared, or its id still has format fields for Element.get.
+    """
+    test_ids: Dict[str, CompiledTestId] = getattr(type(self), TEST_IDS_ATTR, {})
+    keys = list(keys)
+    for key in keys:
+        if key not in test_ids:
+            raise ValueError(f'{type(self).__name__} has no Test ID {key!r}.')
+        if not _locator(self, test_ids[key]).static:
+            raise ValueError(f'Test ID {key!r} of {type(self).__name__} has format fields, use Element.get instead.')
+    return keys
+
+
+def document_locators(self: Any, keys: Iterable[str]) -> List[Tuple[str, str]]:
+    """ Search method and value of Test IDs searched from the document, e.g. readiness sentinels.
+    Arguments:
+        self(Any): Application Instance decorated with @elements.
+        keys(Iterable[str]): Test ID keys checked by snapshot_keys.
+    Returns:
+        List[Tuple[str, str]]: locator of each key, empty for a Component, whose Test IDs are searched in its element.
+    """
+    if _parent_element(self) is not None:
+        return []
+    test_ids: Dict[str, CompiledTestId] = getattr(type(self), TEST_IDS_ATTR, {})
+    return [_locator(self, test_ids[key]).resolve() for key in keys]
+
+
+def take_snapshot(self: Any, keys: Optional[Iterable[str]] = None) -> PageSnapshot:
+    """ Resolve the declared Test IDs in one execute_script call and prime the Elements with the result.
+    Test IDs whose id still has format fields for Element.get are skipped when keys is None.
+    Arguments:
+        self(Any): Component or Application Instance decorated with @elements.
+        keys(Optional[Iterable[str]]): Test ID keys to resolve, all declared keys when None.
+    Returns:
+        PageSnapshot: presence, visibility and WebElements of each key.
+    Raises:
+        ValueError: a key in keys is not declared or has format fields.
+    """
+    test_ids: Dict[str, CompiledTestId] = getattr(type(self), TEST_IDS_ATTR, {})
+    document = _parent_element(self) is None
+    specs: List[Dict[str, Any]] = []
+    for key in (snapshot_keys(self, keys) if keys is not None else test_ids):
+        locator = _locator(self, test_ids[key])
+        if not locator.static:
+            continue
+        by, element_id = locator.resolve(document=document)
+        specs.append({'key': key, 'by': by, 'value': element_id, 'all': test_ids[key].page_object_type is not None})
+
+    with get_tracer().command('snapshot', 'script', ','.join(spec['key'] for spec in specs), type(self).__name__):
+        result = self.driver.execute_script(SNAPSHOT_JS, _parent_element(self), specs)
+    snapshot = PageSnapshot(result['url'], {
+        key: ElementState(state['present'], state['visible'], state['elements'] or [])
+        for key, state in result['states'].items()
+    })
+    _prime(self, test_ids, specs, snapshot)
+    return snapshot
+
+
+def _prime(self: Any, test_ids: Dict[str, CompiledTestId], specs: List[Dict[str, Any]],
+           snapshot: PageSnapshot) -> None:
+    """ Seed the element cache and the memoized Element Lists with the elements of a snapshot.
+    Arguments:
+        self(Any): Component or Application Instance decorated with @elements.
+        test_ids(Dict[str, CompiledTestId]): declared Test IDs.
+        specs(List[Dict[str, Any]]): locators sent to the snapshot script.
+        snapshot(PageSnapshot): result of the snapshot script.
+    """
+    root = _parent_element(self) or self.driver
+    generation = get_element_cache(self.driver).generation
+    memos: Dict[str, _Memo] = vars(self).setdefault(MEMO_ATTR, {})
+    for spec in specs:
+        state = snapshot[spec['key']]
+        if not state.present:
+            continue
+        if spec['all']:
+            value = _build_attr(self, spec['key'], test_ids[spec['key']], state.elements, snapshot.url)
+            memos[spec['key']] = _Memo(_memo_key(self), generation, value)
+        else:
+            Element(self.driver, _locator(self, test_ids[spec['key']]), root).prime(state.elements[0])
@@ -1,22 +1,30 @@
 # pylint: disable=E1136
 """ RNPS Element Module. """
-from typing import cast, List, Optional, Union
+from typing import cast, Any, Callable, Dict, List, Optional, Tuple, TypeVar, Union
 from enum import Enum, auto
 import logging
+import threading
+import weakref
 
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as ec
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
 
 from selenium.webdriver import Remote
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.remote.webelement import WebElement
 
 from .exceptions import MoveToError, FocusToError
+from .locator import Locator, compile_locator
+from .scripts import ATTACHED_JS, LOCATE_READ_JS, READ_JS
+from .trace import get_tracer
+from .wait import Condition, WaitEngine, probe, settled, wait_until
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar('T')
+
+CacheKey = Tuple[Union[Remote, WebElement], str, str]
+
 
 class Method(Enum):
     """ Which selected Expected Conditions. """
@@ -25,95 +33,212 @@ class Method(Enum):
     PRESENCE = auto()
 
 
+class Check(Enum):
+    """ How is_displayed and is_hidden answer. """
+    BLOCKING = auto()  # wait up to max_wait for the state
+    PROBE = auto()  # answer from the current DOM in one round trip
+    SETTLED = auto()  # answer once the state is reached or the DOM has been quiet for quiet_period
+
+
+# Condition waited for by each Method
+METHOD_CONDITIONS = {
+    Method.VISIBILITY: Condition.VISIBILITY,
+    Method.INVISIBILITY: Condition.INVISIBILITY,
+    Method.PRESENCE: Condition.PRESENCE,
+}
+
+# Traced command names, built once instead of on every wait
+WAIT_COMMANDS = {condition: f'wait:{condition.value}' for condition in Condition}
+WAIT_ALL_COMMANDS = {condition: f'wait_all:{condition.value}' for condition in Condition}
+
+
 class FormatError(Exception):
     """ Invalid arguments error to format Element ID """
 
 
+class ElementCache:
+    """ Resolved WebElements of one driver, keyed by root and formatted locator.
+    Attributes:
+        hits(int): lookups answered from the cache.
+        misses(int): lookups that needed a WebDriver find.
+        stale(int): cached elements dropped after StaleElementReferenceException.
+        generation(int): incremented on every clear(), i.e. every known navigation.
+    """
+
+    def __init__(self) -> None:
+        self._elements: Dict[CacheKey, WebElement] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.generation = 0
+
+    def get(self, key: CacheKey) -> Optional[WebElement]:
+        """ Look up a resolved element and count the hit or miss.
+        Arguments:
+            key(CacheKey): root, search method and formatted target.
+        Returns:
+            Optional[WebElement]: cached element, None when it has not been resolved.
+        """
+        with self._lock:
+            elem = self._elements.get(key)
+            if elem is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return elem
+
+    def put(self, key: CacheKey, elem: WebElement) -> None:
+        """ Store a resolved element.
+        Arguments:
+            key(CacheKey): root, search method and formatted target.
+            elem(WebElement): resolved element.
+        """
+        with self._lock:
+            self._elements[key] = elem
+
+    def discard(self, key: CacheKey) -> None:
+        """ Drop a stale element.
+        Arguments:
+            key(CacheKey): root, search method and formatted target.
+        """
+        with self._lock:
+            if self._elements.pop(key, None) is not None:
+                self.stale += 1
+
+    def clear(self) -> None:
+        """ Drop every element, e.g. after navigation. """
+        with self._lock:
+            self._elements.clear()
+            self.generation += 1
+
+    def stats(self) -> Dict[str, int]:
+        """ Counters of the cache.
+        Returns:
+            Dict[str, int]: hits, misses, stale and number of cached elements.
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'stale': self.stale, 'size': len(self._elements)}
+
+    def reset_stats(self) -> None:
+        """ Reset counters, e.g. at the start of each test. """
+        with self._lock:
+            self.hits = self.misses = self.stale = 0
+
+
+_element_caches: 'weakref.WeakKeyDictionary[Remote, ElementCache]' = weakref.WeakKeyDictionary()
+_element_caches_lock = threading.Lock()
+
+
+def get_element_cache(driver: Remote) -> ElementCache:
+    """ Element cache of a driver, created on first use.
+    Arguments:
+        driver(Remote): Web Driver.
+    Returns:
+        ElementCache: cache shared by every Element of the driver.
+    """
+    with _element_caches_lock:
+        cache = _element_caches.get(driver)
+        if cache is None:
+            cache = _element_caches[driver] = ElementCache()
+        return cache
+
+
 class Element:
     """ RNPS Element Utility class.
+    Resolved WebElements are cached per driver and reused by the interaction
+    methods until they go stale or the page is navigated.
     Attributes:
         driver(Remote): Web Driver.
-        id_(str): Element id. test_id or xpath.
+        id_(Union[str, Locator]): Element id template, test_id or xpath, or a compiled locator.
         parent(Optional[WebElement]): Parent WebElement (default=None).
         xpath(bool): xpath flag.
+        cache(Optional[bool]): reuse resolved WebElement, None follows Element.cache_enabled (default=None).
+        name(Optional[str]): page object attribute name, used by tracing (default=None).
+        page(Optional[str]): page object class name, used by tracing (default=None).
+    Class Attributes:
+        cache_enabled(bool): reuse resolved WebElements unless an Element opts out (default=True).
+        wait_engine(WaitEngine): engine of waits that do not choose one (default=WaitEngine.POLLING).
     """
+    cache_enabled: bool = True
+    wait_engine: WaitEngine = WaitEngine.POLLING
 
     def __init__(self,
                  driver: Remote,
-                 id_: str,
+                 id_: Union[str, Locator],
                  parent: Union[WebElement, Remote],
-                 xpath: bool = False) -> None:
+                 xpath: bool = False,
+                 cache: Optional[bool] = None,
+                 name: Optional[str] = None,
+                 page: Optional[str] = None) -> None:
         self.driver: Remote = driver
-        self._parent = parent
-        self._id = id_
-        self.root: Union[Remote, WebElement] = self._parent
-
-        if xpath:
-            self.mode = By.XPATH
-        else:
-            self.mode = By.ID
+        self._locator = id_ if isinstance(id_, Locator) else compile_locator(id_, By.XPATH if xpath else By.ID)
+        self._id = self._locator.template
+        self.mode = self._locator.mode
+        self.root: Union[Remote, WebElement] = parent
+        self._cache = cache
+        self.name = name
+        self.page = page
+        # Search method and value last resolved from the template, for messages and tracing
+        self.by: str = self.mode
+        self.target: str = self._id
 
     def __get_element(self,
                       target: str,
                       by: By,
                       method: Method = Method.VISIBILITY,
-                      max_wait: int = 30) -> WebElement:
+                      max_wait: int = 30,
+                      engine: Optional[WaitEngine] = None) -> WebElement:
         """ Wait until Web Element of 'target' is 'method'.
         Arguments:
             target(str): target id.
             by(By): search target by.
             method(Method): type of expected condition.
             max_wait(int): maximum wait time for display elements (default=30sec).
+            engine(Optional[WaitEngine]): wait engine, None follows Element.wait_engine (default=None).
         Returns:
             WebElement: An element with the specified test ID.
         Raises:
             TimeoutException: element is not found.
             ValueError: invalid method name.
         """
+        if method not in METHOD_CONDITIONS:
+            raise ValueError(f'Invalid method name: {method}')
         try:
-            if method == Method.VISIBILITY:
-                elem = WebDriverWait(self.root, max_wait).until(
-                    ec.visibility_of_element_located((by, target)))
-            elif method == Method.INVISIBILITY:
-                elem = WebDriverWait(self.root, max_wait).until(
-                    ec.invisibility_of_element_located((by, target)))
-            elif method == Method.PRESENCE:
-                elem = WebDriverWait(self.root, max_wait).until(
-                    ec.presence_of_element_located((by, target)))
-            else:
-                raise ValueError(f'Invalid method name: {method}')
+            with self.__trace(WAIT_COMMANDS[METHOD_CONDITIONS[method]], by, target):
+                elem = wait_until(self.driver, self.root, METHOD_CONDITIONS[method], (by, target), max_wait,
+                                  engine or Element.wait_engine)
         except TimeoutException as e:
             e.msg = f'Waiting for {max_wait} sec, but element with target of "{target}":"{by}":"{method}" is Not Found.'
             raise e
-        return elem
+        return cast(WebElement, elem)
 
     def __get_elements(self,
                        target: str,
                        by: By,
                        method: Method = Method.VISIBILITY,
-                       max_wait: int = 30) -> List[WebElement]:
+                       max_wait: int = 30,
+                       engine: Optional[WaitEngine] = None) -> List[WebElement]:
         """ Get list of Web Elements of 'target'.
         Arguments:
             target(str): target id.
             by(By): search method.
             method(Method): type of expected condition.
             max_wait(int): maximum wait time to find elements (default = 10sec).
+            engine(Optional[WaitEngine]): wait engine, None follows Element.wait_engine (default=None).
         Returns:
             List[WebElements]: a list of WebElements.
         Raises:
             TimeoutException: element is not found.
             ValueError: invalid method name.
         """
+        if method not in (Method.VISIBILITY, Method.PRESENCE):
+            raise ValueError(f'Invalid method name: {method}')
         try:
-            elem_list: List[WebElement]
-            if method == Method.VISIBILITY:
-                elem_list = WebDriverWait(self.root, max_wait).until(
-                    ec.visibility_of_all_elements_located((by, target)))
-            elif method == Method.PRESENCE:
-                elem_list = WebDriverWait(self.root, max_wait).until(
-                    ec.presence_of_all_elements_located((by, target)))
-            else:
-                raise ValueError(f'Invalid method name: {method}')
+            with self.__trace(WAIT_ALL_COMMANDS[METHOD_CONDITIONS[method]], by, target):
+                elem_list: List[WebElement] = wait_until(self.driver, self.root, METHOD_CONDITIONS[method],
+                                                         (by, target), max_wait, engine or Element.wait_engine,
+                                                         all_elements=True)
         except TimeoutException as e:
             e.msg = f'Waiting for {max_wait} sec, but element with target of "{target}":"{by}":"{method}" is Not Found.'
             raise e
@@ -130,10 +255,12 @@ class Element:
         """
         try:
             ActionChains(self.root).move_to_element(element).perform()
-            logger.debug('Move to element of target : %s', self._id)
+            logger.debug('Move to element of target : %s', self.target)
+        except StaleElementReferenceException:
+            raise
         except WebDriverException as e:
             raise MoveToError(
-                f'Another exception occurred when trying to move to element "{self._id}":"{self.mode}"'
+                f'Another exception occurred when trying to move to element "{self.target}":"{self.by}"'
             ) from e
         return element
 
@@ -147,38 +274,127 @@ class Element:
         try:
             element.location_once_scrolled_into_view  # pylint: disable=W0104
             element.click()
-            logger.debug('Click element of target : %s', self._id)
+            logger.debug('Click element of target : %s', self.target)
         except TimeoutException as e:
             raise MoveToError(
-                f'Failed to click to element with target "{self._id}":"{self.mode}"'
+                f'Failed to click to element with target "{self.target}":"{self.by}"'
             ) from e
 
-    def __format_element_id(self, *args: str, **kwargs: str) -> str:
-        """ Format self._id
+    def __resolve(self, *args: str, **kwargs: str) -> Tuple[str, str]:
+        """ Resolve the compiled _id template. The template itself is never modified.
         Arguments:
             *args(str): values for positional arguments field in _id
             **kwargs(str): values for keyword arguments field in _id
         Returns:
-            str: formatted _id
+            Tuple[str, str]: search method and formatted _id, also kept as self.by and self.target
         Raises:
             FormatError: Invalid argument
         """
         try:
-            return self._id.format(*args, **kwargs)
+            self.by, self.target = self._locator.resolve(args, kwargs, not isinstance(self.root, WebElement))
         except (IndexError, KeyError) as e:
             raise FormatError(
                 f'The element must take arguments. element_id: {self._id}'
             ) from e
+        return self.by, self.target
+
+    def __use_cache(self) -> bool:
+        """ Whether resolved WebElements are reused.
+        Returns:
+            bool: the Element flag, or Element.cache_enabled when not set.
+        """
+        return Element.cache_enabled if self._cache is None else self._cache
+
+    def __cache_key(self) -> CacheKey:
+        """ Cache key of the formatted element id.
+        Returns:
+            CacheKey: root, search method and formatted target.
+        """
+        return (self.root, self.by, self.target)
+
+    def __trace(self, command: str, by: Optional[str] = None, target: Optional[str] = None) -> Any:
+        """ Time a WebDriver command when tracing is enabled.
+        Arguments:
+            command(str): command name.
+            by(Optional[str]): search method (default=self.by).
+            target(Optional[str]): formatted element id (default=self.target).
+        Returns:
+            Any: context manager.
+        """
+        return get_tracer().command(command, by or self.by, target or self.target, self.page, self.name)
+
+    def __perform(self, command: str, action: Callable[[WebElement], T], *args: str, max_wait: int,
+                  **kwargs: str) -> T:
+        """ Resolve the element and run an action on it, re-resolving once if the cached element went stale.
+        Arguments:
+            command(str): command name for tracing.
+            action(Callable[[WebElement], T]): operation on the element.
+            max_wait(int): maximum wait time for display elements.
+            *args(str): arguments for _id.
+            **kwargs(str): keyword arguments for _id.
+        Returns:
+            T: result of the action.
+        Raises:
+            TimeoutException: element is not found.
+        """
+        self.__resolve(*args, **kwargs)
+        # A stale cached element raises and is resolved again below, no need to check it first.
+        elem = self.__lookup(Method.PRESENCE, max_wait, None, verify=False)
+        try:
+            with self.__trace(command):
+                return action(elem)
+        except StaleElementReferenceException:
+            if not self.__use_cache():
+                raise
+            logger.debug('Cached element went stale, resolving again : %s', self.target)
+            get_element_cache(self.driver).discard(self.__cache_key())
+            elem = self.__lookup(Method.PRESENCE, max_wait, None, verify=False)
+            with self.__trace(command):
+                return action(elem)
+
+    def locator(self, *args: str, **kwargs: str) -> Tuple[str, str]:
+        """ Search method and formatted id, e.g. to locate the element in a script.
+        Arguments:
+            *args(str): arguments for _id.
+            **kwargs(str): keyword arguments for _id.
+        Returns:
+            Tuple[str, str]: search method and formatted id, CSS for XPaths that have an equivalent.
+        Raises:
+            FormatError: Invalid argument
+        """
+        return self.__resolve(*args, **kwargs)
+
+    def prime(self, elem: WebElement, *args: str, **kwargs: str) -> None:
+        """ Store a WebElement resolved elsewhere, e.g. by a page snapshot, so the next get() reuses it.
+        Arguments:
+            elem(WebElement): element matching the formatted _id.
+            *args(str): arguments for _id.
+            **kwargs(str): keyword arguments for _id.
+        """
+        if self.__use_cache():
+            self.__resolve(*args, **kwargs)
+            get_element_cache(self.driver).put(self.__cache_key(), elem)
+
+    @staticmethod
+    def invalidate_cache(driver: Remote) -> None:
+        """ Forget every resolved element of the driver. Call after navigating outside of Element.
+        Arguments:
+            driver(Remote): Web Driver.
+        """
+        get_element_cache(driver).clear()
 
     def get(self,
             *args: str,
             method: Method = Method.PRESENCE,
             max_wait: int = 10,
+            engine: Optional[WaitEngine] = None,
             **kwargs: str) -> WebElement:
-        """ Get Web Element.
+        """ Get Web Element. A cached element is checked to be still in the document first,
+        as the page may have changed without going through Element, e.g. driver.back() or a redirect.
         Arguments:
             method(Method): type of expected condition.
             max_wait(int): maximum wait time for display elements (default=10sec).
+            engine(Optional[WaitEngine]): wait engine, None follows Element.wait_engine (default=None).
             *args(str): arguments for _id.
             **kwargs(str): keyword arguments for _id.
         Returns:
@@ -187,21 +403,68 @@ class Element:
             TimeoutException: element is not found.
             ValueError: invalid method name.
         """
-        self._id = self.__format_element_id(*args, **kwargs)
-        return self.__get_element(self._id,
-                                  self.mode,
-                                  method=method,
-                                  max_wait=max_wait)
+        self.__resolve(*args, **kwargs)
+        return self.__lookup(method, max_wait, engine, verify=True)
+
+    def __lookup(self, method: Method, max_wait: int, engine: Optional[WaitEngine], verify: bool) -> WebElement:
+        """ Element of the resolved target, from the cache when it can be used.
+        Arguments:
+            method(Method): type of expected condition.
+            max_wait(int): maximum wait time for display elements.
+            engine(Optional[WaitEngine]): wait engine, None follows Element.wait_engine.
+            verify(bool): check a cached element is still attached, one script call.
+        Returns:
+            WebElement: An element with the specified target.
+        Raises:
+            TimeoutException: element is not found.
+            ValueError: invalid method name.
+        """
+        if method != Method.PRESENCE or not self.__use_cache():
+            return self.__get_element(self.target,
+                                      self.by,
+                                      method=method,
+                                      max_wait=max_wait,
+                                      engine=engine)
+
+        cache = get_element_cache(self.driver)
+        key = self.__cache_key()
+        elem = cache.get(key)
+        if elem is not None and verify and not self.__attached(elem):
+            logger.debug('Cached element is no longer in the document, resolving again : %s', self.target)
+            cache.discard(key)
+            elem = None
+        if elem is None:
+            elem = self.__get_element(self.target,
+                                      self.by,
+                                      method=method,
+                                      max_wait=max_wait,
+                                      engine=engine)
+            cache.put(key, elem)
+        return elem
+
+    def __attached(self, elem: WebElement) -> bool:
+        """ Whether an element is still in the document.
+        Arguments:
+            elem(WebElement): element.
+        Returns:
+            bool: return True if the element is attached, False when stale.
+        """
+        try:
+            return bool(self.driver.execute_script(ATTACHED_JS, [elem])[1])
+        except WebDriverException:
+            return False
 
     def get_elements(self,
                      *args: str,
                      method: Method = Method.PRESENCE,
                      max_wait: int = 10,
+                     engine: Optional[WaitEngine] = None,
                      **kwargs: str) -> List[WebElement]:
         """ Get List of Web Elements.
         Arguments:
             method(Method): type of expected condition.
             max_wait(int): max wait time to find elements (default = 10 sec).
+            engine(Optional[WaitEngine]): wait engine, None follows Element.wait_engine (default=None).
             *args(str): arguments for _id.
             **kwargs(str): keyword arguments for _id.
         Returns:
@@ -210,11 +473,12 @@ class Element:
             TimeoutException: element is not found.
             ValueError: invalid method name.
         """
-        self._id = self.__format_element_id(*args, **kwargs)
-        elem_list = self.__get_elements(self._id,
-                                        self.mode,
+        self.__resolve(*args, **kwargs)
+        elem_list = self.__get_elements(self.target,
+                                        self.by,
                                         method=method,
-                                        max_wait=max_wait)
+                                        max_wait=max_wait,
+                                        engine=engine)
         return elem_list
 
     def get_attribute(self,
@@ -233,11 +497,77 @@ class Element:
         Raises:
             TimeoutException: element is not found.
         """
-        elem = self.get(*args,
-                        method=Method.PRESENCE,
-                        max_wait=max_wait,
-                        **kwargs)
-        return cast(str, elem.get_attribute(name))
+        return cast(str, self.__perform('get_attribute', lambda elem: elem.get_attribute(name), *args,
+                                        max_wait=max_wait, **kwargs))
+
+    def get_attributes(self,
+                       names: List[str],
+                       *args: str,
+                       max_wait: int = 10,
+                       **kwargs: str) -> Dict[str, Optional[str]]:
+        """ Get several Web Element Attributes or properties with one script.
+        Values are the ones get_attribute returns.
+        Arguments:
+            names(List[str]): attribute or property names.
+            max_wait(int): maximum wait time for display elements (default=10sec).
+            *args(str): arguments for _id.
+            **kwargs(str): keyword arguments for _id.
+        Returns:
+            Dict[str, Optional[str]]: value of each name, None if the attribute does not exist.
+        Raises:
+            TimeoutException: element is not found.
+        """
+        def read(elem: WebElement) -> List[Optional[str]]:
+            return cast(List[List[Optional[str]]], self.driver.execute_script(READ_JS, [elem], names))[0]
+
+        return dict(zip(names, self.__perform('get_attributes', read, *args, max_wait=max_wait, **kwargs)))
+
+    def get_columns(self,
+                    names: List[str],
+                    *args: str,
+                    max_wait: int = 10,
+                    **kwargs: str) -> Dict[str, List[Optional[str]]]:
+        """ Get attributes or properties of every matching Web Element, e.g. the cells of a table.
+        Matches are located and read with one script, waiting like get_elements only when none is present yet.
+        Arguments:
+            names(List[str]): attribute or property names.
+            max_wait(int): max wait time to find elements (default = 10 sec).
+            *args(str): arguments for _id.
+            **kwargs(str): keyword arguments for _id.
+        Returns:
+            Dict[str, List[Optional[str]]]: values of each name, one per element in document order.
+        Raises:
+            TimeoutException: element is not found.
+        """
+        rows = self.get_rows(names, *args, max_wait=max_wait, **kwargs)
+        return {name: [row[name] for row in rows] for name in names}
+
+    def get_rows(self,
+                 names: List[str],
+                 *args: str,
+                 max_wait: int = 10,
+                 **kwargs: str) -> List[Dict[str, Optional[str]]]:
+        """ Get attributes or properties of every matching Web Element, one dict per element.
+        Arguments:
+            names(List[str]): attribute or property names.
+            max_wait(int): max wait time to find elements (default = 10 sec).
+            *args(str): arguments for _id.
+            **kwargs(str): keyword arguments for _id.
+        Returns:
+            List[Dict[str, Optional[str]]]: value of each name per element in document order.
+        Raises:
+            TimeoutException: element is not found.
+        """
+        self.__resolve(*args, **kwargs)
+        parent = self.root if isinstance(self.root, WebElement) else None
+        with self.__trace('read_rows'):
+            found: Dict[str, Any] = self.driver.execute_script(LOCATE_READ_JS, parent, self.by, self.target, names)
+        values: List[List[Optional[str]]] = found['rows']
+        if not values:
+            elems = self.get_elements(*args, method=Method.PRESENCE, max_wait=max_wait, engine=None, **kwargs)
+            with self.__trace('read_rows'):
+                values = self.driver.execute_script(READ_JS, elems, names)
+        return [dict(zip(names, row)) for row in values]
 
     def move_to(self, *args: str, max_wait: int = 10, **kwargs: str) -> None:
         """ Move to Web Element.
@@ -248,11 +578,7 @@ class Element:
         Raises:
             MoveToError: failed to move to element.
         """
-        elem = self.get(*args,
-                        method=Method.PRESENCE,
-                        max_wait=max_wait,
-                        **kwargs)
-        self.__move_to_element(elem)
+        self.__perform('move_to', self.__move_to_element, *args, max_wait=max_wait, **kwargs)
 
     def click(self, *args: str, max_wait: int = 10, **kwargs: str) -> None:
         """ Click Web Element.
@@ -263,11 +589,9 @@ class Element:
         Raises:
             MoveToError: failed to move to element.
         """
-        elem = self.get(*args,
-                        method=Method.PRESENCE,
-                        max_wait=max_wait,
-                        **kwargs)
-        self.__click_element(elem)
+        # A click may navigate, which makes the resolved elements stale: get() checks a cached element is
+        # still attached and __perform resolves it again when it raises, so no URL is read here.
+        self.__perform('click', self.__click_element, *args, max_wait=max_wait, **kwargs)
 
     def focus(self,
               *args: str,
@@ -283,19 +607,30 @@ class Element:
         Raises:
             FocusToError: failed to focus to element.
         """
+        focus_to_element_js = "arguments[0].focus({'preventScroll': arguments[1]})"
         try:
-            elem = self.get(*args,
-                            method=Method.PRESENCE,
-                            max_wait=max_wait,
-                            **kwargs)
-            focus_to_element_js = "arguments[0].focus({'preventScroll': arguments[1]})"
-            self.driver.execute_script(focus_to_element_js, elem,
-                                       prevent_scroll)
+            self.__perform(
+                'focus',
+                lambda elem: self.driver.execute_script(focus_to_element_js, elem, prevent_scroll),
+                *args,
+                max_wait=max_wait,
+                **kwargs)
         except WebDriverException as e:
             raise FocusToError(
-                f'Failed to focus to element with target "{self._id}":"{self.mode}"'
+                f'Failed to focus to element with target "{self.target}":"{self.by}"'
             ) from e
 
+    def clear(self, *args: str, max_wait: int = 10, **kwargs: str) -> None:
+        """ Clear the text of Web Element.
+        Arguments:
+            max_wait(int): maximum wait time for display elements (default=10sec).
+            *args(str): arguments for _id.
+            **kwargs(str): keyword arguments for _id.
+        Raises:
+            TimeoutException: element is not found.
+        """
+        self.__perform('clear', lambda elem: elem.clear(), *args, max_wait=max_wait, **kwargs)
+
     def send_keys(self,
                   keys: str,
                   *args: str,
@@ -312,13 +647,12 @@ class Element:
         Raises:
             TimeoutException: element is not found.
         """
-        elem = self.get(*args,
-                        method=Method.PRESENCE,
-                        max_wait=max_wait,
-                        **kwargs)
-        if clear:
-            elem.clear()
-        elem.send_keys(keys)
+        def clear_and_send_keys(elem: WebElement) -> None:
+            if clear:
+                elem.clear()
+            elem.send_keys(keys)
+
+        self.__perform('send_keys', clear_and_send_keys, *args, max_wait=max_wait, **kwargs)
 
     def submit(self,
                *args: str,
@@ -332,80 +666,110 @@ class Element:
         Raises:
             TimeoutException: element is not found.
         """
-        elem = self.get(*args,
-                        method=Method.PRESENCE,
-                        max_wait=max_wait,
-                        **kwargs)
-        elem.submit()
+        self.__perform('submit', lambda elem: elem.submit(), *args, max_wait=max_wait, **kwargs)
+        # Submitting navigates, which makes every resolved element stale.
+        self.invalidate_cache(self.driver)
 
     def wait_for_text(self,
                       expected_text: str,
                       *args: str,
                       max_wait: int = 10,
                       value_flag: bool = False,
+                      engine: Optional[WaitEngine] = None,
                       **kwargs: str) -> bool:
         """ Wait for expected text to be displayed in Web Element Text Attribute.
         Arguments:
             expected_text(str): value of text attribute.
             max_wait(int): maximum wait time for text attribute (default=10sec).
             value_flag(bool): search attribute value or not (default=False).
+            engine(Optional[WaitEngine]): wait engine, None follows Element.wait_engine (default=None).
             *args(str): arguments for _id.
             **kwargs(str): keyword arguments for _id.
         Returns:
             bool: return True if expected value exists, False otherwise.
         """
-        self._id = self.__format_element_id(*args, **kwargs)
+        self.__resolve(*args, **kwargs)
+        condition = Condition.VALUE if value_flag else Condition.TEXT
         try:
-            if value_flag:
-                WebDriverWait(self.root, max_wait).until(
-                    ec.text_to_be_present_in_element_value(
-                        (self.mode, self._id), expected_text))
-            else:
-                WebDriverWait(self.root, max_wait).until(
-                    ec.text_to_be_present_in_element((self.mode, self._id),
-                                                     expected_text))
-
+            with self.__trace(WAIT_COMMANDS[condition]):
+                wait_until(self.driver, self.root, condition, (self.by, self.target), max_wait,
+                           engine or Element.wait_engine, text=expected_text)
         except TimeoutException:
-            logger.debug(
-                f'Waiting for {max_wait} sec, but text attribute is not "{expected_text}".'
-            )
+            logger.debug('Waiting for %s sec, but text attribute is not "%s".', max_wait, expected_text)
             return False
         return True
 
     def is_displayed(self,
                      *args: str,
                      max_wait: int = 10,
+                     engine: Optional[WaitEngine] = None,
+                     check: Check = Check.BLOCKING,
+                     quiet_period: float = 0.5,
                      **kwargs: str) -> bool:
         """ Web Element is displayed.
+        BLOCKING waits up to max_wait for the element to be present. PROBE and SETTLED
+        answer whether it is present and visible without waiting out max_wait when it is not.
         Arguments:
             max_wait(int): maximum wait time for display elements (default=10sec).
+            engine(Optional[WaitEngine]): wait engine of BLOCKING, None follows Element.wait_engine (default=None).
+            check(Check): how to answer (default=Check.BLOCKING).
+            quiet_period(float): seconds without DOM mutation after which SETTLED answers (default=0.5sec).
             *args(str): arguments for _id.
             **kwargs(str): keyword arguments for _id.
         Returns:
             bool: return True if element displayed, False otherwise.
         """
+        # Always ask the browser: a cached element may have been removed since.
+        self.__resolve(*args, **kwargs)
+        if check == Check.PROBE:
+            with self.__trace('probe'):
+                return probe(self.driver, self.root, (self.by, self.target))[1]
+        if check == Check.SETTLED:
+            with self.__trace('settled'):
+                return settled(self.driver, self.root, (self.by, self.target), True, quiet_period, max_wait)
         try:
-            self.get(*args,
-                     method=Method.PRESENCE,
-                     max_wait=max_wait,
-                     **kwargs)
+            self.__get_element(self.target,
+                               self.by,
+                               method=Method.PRESENCE,
+                               max_wait=max_wait,
+                               engine=engine)
         except TimeoutException:
             return False
         return True
 
-    def is_hidden(self, *args: str, max_wait: int = 10, **kwargs: str) -> bool:
+    def is_hidden(self,
+                  *args: str,
+                  max_wait: int = 10,
+                  engine: Optional[WaitEngine] = None,
+                  check: Check = Check.BLOCKING,
+                  quiet_period: float = 0.5,
+                  **kwargs: str) -> bool:
         """ Web Element is hidden.
+        BLOCKING waits up to max_wait for the element to become invisible. PROBE and SETTLED
+        answer without waiting out max_wait when it stays visible.
         Arguments:
             max_wait(int): maximum wait time for element to become invisible (default=10sec).
+            engine(Optional[WaitEngine]): wait engine of BLOCKING, None follows Element.wait_engine (default=None).
+            check(Check): how to answer (default=Check.BLOCKING).
+            quiet_period(float): seconds without DOM mutation after which SETTLED answers (default=0.5sec).
             *args(str): arguments for _id.
             **kwargs(str): keyword arguments for _id.
         Returns:
             result(bool): return True if element is hidden, False otherwise.
         """
+        if check == Check.PROBE:
+            self.__resolve(*args, **kwargs)
+            with self.__trace('probe'):
+                return not probe(self.driver, self.root, (self.by, self.target))[1]
+        if check == Check.SETTLED:
+            self.__resolve(*args, **kwargs)
+            with self.__trace('settled'):
+                return settled(self.driver, self.root, (self.by, self.target), False, quiet_period, max_wait)
         try:
             self.get(*args,
                      method=Method.INVISIBILITY,
                      max_wait=max_wait,
+                     engine=engine,
                      **kwargs)
         except TimeoutException:
             return False
@@ -15,3 +15,7 @@ class OskOperationError(Exception):
 
 class MemoryExceeded(Exception):
     """ Set Memory Limit has been exceeded during test"""
+
+
+class LocatorError(Exception):
+    """ Invalid element id template """
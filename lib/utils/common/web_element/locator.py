@@ -0,0 +1,288 @@
+""" Compiled locators: element id templates parsed once, formatted by lookup. """
+from string import Formatter
+from typing import cast, Any, Dict, FrozenSet, List, Mapping, Optional, Tuple
+import logging
+import re
+import sys
+import threading
+
+from selenium.webdriver.common.by import By
+
+from .exceptions import LocatorError
+
+logger = logging.getLogger(__name__)
+
+# Search methods a template can be compiled for
+BY_VALUES = (By.ID, By.XPATH, By.CSS_SELECTOR)
+
+# Resolved locators kept per Locator, the memo is cleared when full
+MEMO_SIZE = 256
+
+# XPath subset translated to CSS: descendant or child steps of a lowercase tag or '*', with attribute predicates
+XPATH_STEP = re.compile(
+    r'(?P<sep>//|/)(?P<name>\*|[a-z][a-z0-9-]*)(?P<preds>(?:\[(?:"[^"]*"|\'[^\']*\'|[^\]"\'])*\])*)')
+XPATH_PREDICATE = re.compile(r'\[((?:"[^"]*"|\'[^\']*\'|[^\]"\'])*)\]')
+XPATH_CONDITION = re.compile(
+    r'\s*(?:@(?P<attr>[a-z_][a-z0-9_-]*)\s*(?:=\s*(?P<value>"[^"]*"|\'[^\']*\'))?'
+    r'|(?P<fn>contains|starts-with)\(\s*@(?P<fattr>[a-z_][a-z0-9_-]*)\s*,\s*(?P<fvalue>"[^"]*"|\'[^\']*\')\s*\))\s*')
+CSS_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_-]*$')
+CSS_OPERATORS = {'contains': '*=', 'starts-with': '^='}
+
+_registry: Dict[Tuple[str, str], 'Locator'] = {}
+_registry_lock = threading.Lock()
+
+
+def _css_string(literal: str) -> Optional[str]:
+    """ CSS string of an XPath string literal.
+    Arguments:
+        literal(str): quoted XPath literal.
+    Returns:
+        Optional[str]: quoted CSS string, None when escaping would be needed.
+    """
+    value = literal[1:-1]
+    if '\\' in value or '\n' in value:
+        return None
+    return f"'{value}'" if '"' in value else f'"{value}"'
+
+
+def _css_predicate(predicate: str) -> Optional[str]:
+    """ CSS attribute selectors of one XPath predicate, conditions joined by 'and'.
+    Arguments:
+        predicate(str): predicate without brackets, e.g. '@name="q" and @type'.
+    Returns:
+        Optional[str]: selectors, None when not translatable.
+    """
+    selectors = []
+    # 'and' outside of quotes separates the conditions
+    for condition in re.split(r'\s+and\s+(?=(?:[^"\']|"[^"]*"|\'[^\']*\')*$)', predicate):
+        match = XPATH_CONDITION.fullmatch(condition)
+        if match is None:
+            return None
+        if match['fn']:
+            value = _css_string(match['fvalue'])
+            # contains(@a, "") is true for any element, [a*=""] matches none.
+            if value is None or len(value) == 2:
+                return None
+            selectors.append(f'[{match["fattr"]}{CSS_OPERATORS[match["fn"]]}{value}]')
+        elif match['value'] is None:
+            selectors.append(f'[{match["attr"]}]')
+        else:
+            value = _css_string(match['value'])
+            if value is None:
+                return None
+            if match['attr'] == 'id' and CSS_IDENTIFIER.match(value[1:-1]):
+                selectors.append(f'#{value[1:-1]}')
+            else:
+                selectors.append(f'[{match["attr"]}={value}]')
+    return ''.join(selectors)
+
+
+def xpath_to_css(xpath: str, document: bool = True) -> Optional[str]:
+    """ Equivalent CSS selector of a simple XPath, e.g. //*[@name="q"] to [name="q"].
+    Steps are '*' or lowercase tags with attribute predicates: @a, @a="v", contains(@a, "v"),
+    starts-with(@a, "v") and 'and'. Positions, text(), axes and unions are not translated.
+    Attribute values compare alike, except the few HTML attributes CSS matches case-insensitively such as type.
+    Arguments:
+        xpath(str): XPath.
+        document(bool): the search starts from the document, otherwise from an element (default=True).
+    Returns:
+        Optional[str]: CSS selector, None when there is no equivalent.
+    """
+    relative = xpath.startswith('.//')
+    path = xpath[1:] if relative else xpath
+    if not path.startswith('//') or (not relative and not document):
+        # '//' from an element still searches the whole document, which CSS cannot express.
+        return None
+    parts: List[str] = []
+    position = 0
+    for step in XPATH_STEP.finditer(path):
+        if step.start() != position:
+            return None
+        position = step.end()
+        selectors = [_css_predicate(p) for p in XPATH_PREDICATE.findall(step['preds'])]
+        if None in selectors:
+            return None
+        predicates = ''.join(cast(List[str], selectors))
+        name = '' if step['name'] == '*' and predicates else step['name']
+        parts.append(('' if not parts else ' ' if step['sep'] == '//' else ' > ') + name + predicates)
+    if not parts or position != len(path):
+        return None
+    if relative and len(parts) > 1:
+        # Later steps must stay inside the start element, as with the XPath.
+        return ':scope ' + ''.join(parts)
+    return ''.join(parts)
+
+
+def _parse(template: str) -> Tuple[List[Tuple[str, Optional[str], Optional[str], Optional[str]]], FrozenSet[str], int]:
+    """ Split a template like str.format does and check its fields.
+    Arguments:
+        template(str): element id template.
+    Returns:
+        Tuple: (literal, field, spec, conversion) segments, keyword field names and number of positional fields.
+    Raises:
+        LocatorError: invalid template.
+    """
+    try:
+        segments = list(Formatter().parse(template))
+    except ValueError as e:
+        raise LocatorError(f'Invalid element id template "{template}": {e}') from e
+    names = set()
+    auto = 0
+    indexes = []
+    for _, field, _, _ in segments:
+        if field is None:
+            continue
+        head = re.split(r'[.\[]', field, maxsplit=1)[0]
+        if head == '':
+            auto += 1
+        elif head.isdigit():
+            indexes.append(int(head))
+        else:
+            names.add(head)
+    if auto and indexes:
+        raise LocatorError(f'Element id template "{template}" mixes automatic and manual field numbering')
+    return segments, frozenset(names), auto or (max(indexes) + 1 if indexes else 0)
+
+
+def _check_xpath(template: str) -> None:
+    """ Catch unbalanced brackets and quotes of an XPath template.
+    Arguments:
+        template(str): XPath template.
+    Raises:
+        LocatorError: unbalanced brackets or quotes.
+    """
+    stack: List[str] = []
+    quote = ''
+    for char in template:
+        if quote:
+            quote = '' if char == quote else quote
+        elif char in '"\'':
+            quote = char
+        elif char in '[(':
+            stack.append(']' if char == '[' else ')')
+        elif char in '])':
+            if not stack or stack.pop() != char:
+                raise LocatorError(f'Unbalanced "{char}" in XPath "{template}"')
+    if quote or stack:
+        raise LocatorError(f'Unbalanced {"quote" if quote else "brackets"} in XPath "{template}"')
+
+
+class Locator:
+    """ Immutable element id template compiled for one search method.
+    Compile with compile_locator, which returns the same instance for the same template.
+    Attributes:
+        mode(str): search method, By.ID, By.XPATH or By.CSS_SELECTOR.
+        template(str): element id, str.format fields filled by the Element method arguments.
+        fields(FrozenSet[str]): keyword field names.
+        positional(int): number of positional fields.
+    """
+    __slots__ = ('mode', 'template', 'fields', 'positional', '_segments', '_memo', '_bound')
+
+    mode: str
+    template: str
+    fields: FrozenSet[str]
+    positional: int
+    _segments: List[Tuple[str, Optional[str], Optional[str], Optional[str]]]
+    _memo: Dict[Tuple[Any, ...], Tuple[str, str]]
+    _bound: Dict[Tuple[Tuple[str, str], ...], 'Locator']
+
+    def __init__(self, template: str, by: str) -> None:
+        if by not in BY_VALUES:
+            raise LocatorError(f'Unsupported search method "{by}" for element id "{template}"')
+        segments, fields, positional = _parse(template)
+        if by == By.XPATH:
+            _check_xpath(template)
+        for name, value in (('mode', by), ('template', sys.intern(template)), ('fields', fields),
+                            ('positional', positional), ('_segments', segments), ('_memo', {}), ('_bound', {})):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f'Locator is immutable, cannot set {name}')
+
+    def __repr__(self) -> str:
+        return f'Locator({self.template!r}, {self.mode!r})'
+
+    @property
+    def static(self) -> bool:
+        """ Whether the template has no field. """
+        return not self.fields and not self.positional
+
+    def bind(self, params: Mapping[str, str]) -> 'Locator':
+        """ Fill the keyword fields found in params, e.g. the test_id_param of a page object.
+        Arguments:
+            params(Mapping[str, str]): field values, names that are not fields are ignored.
+        Returns:
+            Locator: compiled locator of the partly formatted template, self when nothing applies.
+        """
+        if not params or not self.fields:
+            return self
+        key = tuple(sorted(params.items()))
+        bound = self._bound.get(key)
+        if bound is None:
+            formatter = Formatter()
+            parts: List[str] = []
+            for literal, field, spec, conversion in self._segments:
+                parts.append(literal.replace('{', '{{').replace('}', '}}'))
+                if field is None:
+                    continue
+                if field in params:
+                    value = params[field] if not conversion else formatter.convert_field(params[field], conversion)
+                    value = formatter.format_field(value, spec or '')
+                    parts.append(value.replace('{', '{{').replace('}', '}}'))
+                else:
+                    conversion_part = f'!{conversion}' if conversion else ''
+                    spec_part = f':{spec}' if spec else ''
+                    parts.append(f'{{{field}{conversion_part}{spec_part}}}')
+            bound = compile_locator(''.join(parts), self.mode)
+            if len(self._bound) >= MEMO_SIZE:
+                self._bound.clear()
+            self._bound[key] = bound
+        return bound
+
+    def resolve(self, args: Tuple[Any, ...] = (), kwargs: Optional[Mapping[str, Any]] = None,
+                document: bool = True) -> Tuple[str, str]:
+        """ Search method and value for the given field values. XPaths with a CSS equivalent are translated.
+        Arguments:
+            args(Tuple[Any, ...]): positional field values (default=()).
+            kwargs(Optional[Mapping[str, Any]]): keyword field values (default=None).
+            document(bool): the search starts from the document, otherwise from an element (default=True).
+        Returns:
+            Tuple[str, str]: search method and value.
+        Raises:
+            IndexError: a positional field has no value.
+            KeyError: a keyword field has no value.
+        """
+        key = (args, tuple(sorted(kwargs.items())) if kwargs else (), document)
+        resolved = self._memo.get(key)
+        if resolved is None:
+            value = sys.intern(self.template.format(*args, **(kwargs or {})))
+            resolved = (self.mode, value)
+            if self.mode == By.XPATH:
+                css = xpath_to_css(value, document)
+                if css is not None:
+                    resolved = (By.CSS_SELECTOR, sys.intern(css))
+                    logger.debug('XPath %s searched as CSS %s', value, css)
+            if len(self._memo) >= MEMO_SIZE:
+                self._memo.clear()
+            self._memo[key] = resolved
+        return resolved
+
+
+def compile_locator(template: str, by: str = By.ID) -> Locator:
+    """ Compiled locator of an element id, shared by every user of the same template.
+    Arguments:
+        template(str): element id, str.format fields filled later.
+        by(str): search method (default=By.ID).
+    Returns:
+        Locator: compiled locator.
+    Raises:
+        LocatorError: invalid template or search method.
+    """
+    key = (by, template)
+    locator = _registry.get(key)
+    if locator is None:
+        with _registry_lock:
+            locator = _registry.get(key)
+            if locator is None:
+                locator = _registry[key] = Locator(template, by)
+    return locator
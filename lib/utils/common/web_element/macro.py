@@ -0,0 +1,297 @@
+""" Action macros: record Element steps and run them in as few WebDriver calls as possible. """
+from typing import cast, Any, Dict, List, NamedTuple, Optional, Tuple
+import logging
+
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver import Remote
+from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.remote.webelement import WebElement
+
+from .element import Element, Method
+from .scripts import MACRO_JS
+from .trace import get_tracer
+
+logger = logging.getLogger(__name__)
+
+# Steps after which the page may have been navigated away
+NAVIGATING_STEPS = ('click', 'submit')
+
+
+def needs_key_events(keys: str) -> bool:
+    """ Whether typing keys has effects setting the value cannot reproduce.
+    Arguments:
+        keys(str): input keys.
+    Returns:
+        bool: keys hold a selenium Keys value (private use characters) or a control character.
+    """
+    return any(ch in '\n\r\t' or '\ue000' <= ch <= '\uf8ff' for ch in keys)
+
+
+class Step(NamedTuple):
+    """ One recorded step.
+    Attributes:
+        kind(str): 'focus', 'clear', 'type', 'click' or 'submit'.
+        element(Element): target.
+        args(Tuple[str, ...]): arguments for the element id.
+        kwargs(Dict[str, str]): keyword arguments for the element id.
+        keys(str): input keys of 'type' steps.
+        trusted(bool): needs real input events, i.e. an ActionChains.
+    """
+    kind: str
+    element: Element
+    args: Tuple[str, ...]
+    kwargs: Dict[str, str]
+    keys: str = ''
+    trusted: bool = False
+
+    @property
+    def label(self) -> str:
+        """ Step name for reports, e.g. 'type Home.search_box_input'. """
+        if self.element.name:
+            owner = f'{self.element.page}.' if self.element.page else ''
+            return f'{self.kind} {owner}{self.element.name}'
+        return f'{self.kind} {self.element.locator(*self.args, **self.kwargs)[1]}'
+
+
+class StepResult(NamedTuple):
+    """ How a step was run.
+    Attributes:
+        step(str): step label.
+        mode(str): 'script' (fused into a script), 'actions' (fused into an ActionChains)
+            or 'element' (not fused, run by the Element method).
+        reason(Optional[str]): why the step was not fused.
+    """
+    step: str
+    mode: str
+    reason: Optional[str] = None
+
+
+class MacroReport(NamedTuple):
+    """ Result of ActionMacro.run.
+    Attributes:
+        steps(List[StepResult]): one result per step, in order.
+        batches(int): scripts and action chains sent, unfused steps not included.
+    """
+    steps: List[StepResult]
+    batches: int
+
+    @property
+    def unfused(self) -> List[StepResult]:
+        """ Steps run one by one by the Element methods. """
+        return [result for result in self.steps if result.mode == 'element']
+
+
+class ActionMacro:
+    """ Record a chain of steps against POM Elements, then run them together.
+    Consecutive DOM-level steps run as one script, steps needing real input events as one
+    ActionChains. A batch ends after a click or submit, as the page may navigate.
+    Steps the script cannot apply (e.g. typing into a file input) run through the Element
+    method instead and are reported as unfused.
+
+        ActionMacro(driver).type(home.search_box_input, text).submit(home.google_search_submit).run()
+
+    Attributes:
+        driver(Remote): Web Driver.
+        max_wait(int): maximum wait time for each element to be present (default=10sec).
+    """
+
+    def __init__(self, driver: Remote, max_wait: int = 10) -> None:
+        self.driver = driver
+        self.max_wait = max_wait
+        self.steps: List[Step] = []
+
+    def focus(self, element: Element, *args: str, **kwargs: str) -> 'ActionMacro':
+        """ Focus without scrolling.
+        Arguments:
+            element(Element): target.
+            *args(str): arguments for the element id.
+            **kwargs(str): keyword arguments for the element id.
+        Returns:
+            ActionMacro: self, to chain steps.
+        """
+        self.steps.append(Step('focus', element, args, kwargs))
+        return self
+
+    def clear(self, element: Element, *args: str, **kwargs: str) -> 'ActionMacro':
+        """ Clear the text.
+        Arguments:
+            element(Element): target.
+            *args(str): arguments for the element id.
+            **kwargs(str): keyword arguments for the element id.
+        Returns:
+            ActionMacro: self, to chain steps.
+        """
+        self.steps.append(Step('clear', element, args, kwargs))
+        return self
+
+    def type(self, element: Element, keys: str, *args: str, clear: bool = True, trusted: bool = False,
+             **kwargs: str) -> 'ActionMacro':
+        """ Type text, like Element.send_keys.
+        Arguments:
+            element(Element): target.
+            keys(str): input keys.
+            clear(bool): clear text before input text (default=True).
+            trusted(bool): send real key events, e.g. for autocomplete reacting to keydown (default=False).
+                Always the case when keys hold selenium Keys or control characters.
+            *args(str): arguments for the element id.
+            **kwargs(str): keyword arguments for the element id.
+        Returns:
+            ActionMacro: self, to chain steps.
+        """
+        if clear:
+            self.clear(element, *args, **kwargs)
+        self.steps.append(Step('type', element, args, kwargs, keys, trusted or needs_key_events(keys)))
+        return self
+
+    def click(self, element: Element, *args: str, trusted: bool = False, **kwargs: str) -> 'ActionMacro':
+        """ Click.
+        Arguments:
+            element(Element): target.
+            trusted(bool): move the pointer and click, e.g. for hover menus (default=False).
+            *args(str): arguments for the element id.
+            **kwargs(str): keyword arguments for the element id.
+        Returns:
+            ActionMacro: self, to chain steps.
+        """
+        self.steps.append(Step('click', element, args, kwargs, trusted=trusted))
+        return self
+
+    def submit(self, element: Element, *args: str, **kwargs: str) -> 'ActionMacro':
+        """ Submit the form of the element, like Element.submit.
+        Arguments:
+            element(Element): form or form field.
+            *args(str): arguments for the element id.
+            **kwargs(str): keyword arguments for the element id.
+        Returns:
+            ActionMacro: self, to chain steps.
+        """
+        self.steps.append(Step('submit', element, args, kwargs))
+        return self
+
+    def batches(self) -> List[Tuple[str, List[Step]]]:
+        """ Group the steps the way run sends them.
+        Returns:
+            List[Tuple[str, List[Step]]]: 'script' or 'actions' and the steps of each batch.
+        """
+        batches: List[Tuple[str, List[Step]]] = []
+        for step in self.steps:
+            mode = 'actions' if step.trusted else 'script'
+            if batches and batches[-1][0] == mode and batches[-1][1][-1].kind not in NAVIGATING_STEPS:
+                batches[-1][1].append(step)
+            else:
+                batches.append((mode, [step]))
+        return batches
+
+    def run(self) -> MacroReport:
+        """ Run the recorded steps.
+        Returns:
+            MacroReport: how each step was run.
+        Raises:
+            TimeoutException: an element is not found.
+        """
+        results: List[StepResult] = []
+        sent = 0
+        for mode, steps in self.batches():
+            if mode == 'actions':
+                sent += self.__run_actions(steps)
+                results += [StepResult(step.label, 'actions') for step in steps]
+            else:
+                sent += self.__run_script(steps, results)
+            if steps[-1].kind in NAVIGATING_STEPS:
+                Element.invalidate_cache(self.driver)
+        report = MacroReport(results, sent)
+        for result in report.unfused:
+            logger.info('Macro step not fused : %s (%s)', result.step, result.reason)
+        return report
+
+    def __run_script(self, steps: List[Step], results: List[StepResult]) -> int:
+        """ Apply DOM-level steps with MACRO_JS, waiting for elements that are not present yet.
+        Arguments:
+            steps(List[Step]): steps of one batch.
+            results(List[StepResult]): results to append to.
+        Returns:
+            int: number of scripts sent.
+        """
+        sent = 0
+        start = 0
+        waited = -1
+        while start < len(steps):
+            ops = [self.__op(step) for step in steps[start:]]
+            with get_tracer().command('macro:script', 'macro', steps[start].label):
+                outcome: Dict[str, Any] = self.driver.execute_script(MACRO_JS, ops)
+            sent += 1
+            done = start + outcome['done']
+            results += [StepResult(step.label, 'script') for step in steps[start:done]]
+            if done == len(steps):
+                break
+            step = steps[done]
+            if outcome['missing'] and waited != done:
+                # Wait like the Element methods do, then apply the rest.
+                step.element.get(*step.args, method=Method.PRESENCE, max_wait=self.max_wait, **step.kwargs)
+                waited, start = done, done
+                continue
+            reason = outcome['reason'] or 'not located by the script'
+            self.__run_element(step)
+            results.append(StepResult(step.label, 'element', reason))
+            start = done + 1
+        return sent
+
+    def __run_actions(self, steps: List[Step]) -> int:
+        """ Send trusted steps as one ActionChains, resolving the elements again once if one went stale.
+        Arguments:
+            steps(List[Step]): steps of one batch.
+        Returns:
+            int: number of action chains sent.
+        """
+        try:
+            self.__perform_actions(steps)
+        except StaleElementReferenceException:
+            logger.debug('Element of macro went stale, resolving again : %s', steps[0].label)
+            Element.invalidate_cache(self.driver)
+            self.__perform_actions(steps)
+        return 1
+
+    def __perform_actions(self, steps: List[Step]) -> None:
+        """ Build and perform the ActionChains of a batch.
+        Arguments:
+            steps(List[Step]): steps of one batch.
+        """
+        chain = ActionChains(self.driver)
+        for step in steps:
+            elem: WebElement = step.element.get(*step.args, method=Method.PRESENCE, max_wait=self.max_wait,
+                                                engine=None, **step.kwargs)
+            if step.kind == 'type':
+                chain.send_keys_to_element(elem, step.keys)
+            else:
+                chain.click(elem)
+        with get_tracer().command('macro:actions', 'macro', steps[0].label):
+            chain.perform()
+
+    def __run_element(self, step: Step) -> None:
+        """ Run a step through its Element method.
+        Arguments:
+            step(Step): step the script could not apply.
+        """
+        element, args, kwargs = step.element, step.args, step.kwargs
+        if step.kind == 'focus':
+            element.focus(*args, max_wait=self.max_wait, **cast(Dict[str, Any], kwargs))
+        elif step.kind == 'clear':
+            element.clear(*args, max_wait=self.max_wait, **kwargs)
+        elif step.kind == 'type':
+            element.send_keys(step.keys, *args, max_wait=self.max_wait, clear=False, **kwargs)
+        elif step.kind == 'click':
+            element.click(*args, max_wait=self.max_wait, **kwargs)
+        else:
+            element.submit(*args, max_wait=self.max_wait, **kwargs)
+
+    @staticmethod
+    def __op(step: Step) -> Dict[str, Any]:
+        """ Argument of MACRO_JS for a step.
+        Arguments:
+            step(Step): recorded step.
+        Returns:
+            Dict[str, Any]: kind, root, by, value and keys.
+        """
+        by, value = step.element.locator(*step.args, **step.kwargs)
+        root = step.element.root if isinstance(step.element.root, WebElement) else None
+        return {'kind': step.kind, 'root': root, 'by': by, 'value': value, 'keys': step.keys}
@@ -0,0 +1,381 @@
+""" JavaScript snippets executed by the web element utilities. """
+
+# yapf: disable
+
+# Defines locate(ctx, by, value): Array of elements matching a Selenium locator ('id', 'xpath' or 'css selector')
+# and isVisible(e): approximation of WebElement.is_displayed
+LOCATE_FN_JS = """
+function locate(ctx, by, value) {
+    ctx = ctx || document;
+    if (by === 'xpath') {
+        var found = document.evaluate(value, ctx, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        var list = [];
+        for (var i = 0; i < found.snapshotLength; i++) {
+            list.push(found.snapshotItem(i));
+        }
+        return list;
+    }
+    if (by === 'id') {
+        if (ctx === document) {
+            var byId = document.getElementById(value);
+            return byId ? [byId] : [];
+        }
+        value = '[id="' + value.replace(/(["\\\\])/g, '\\\\$1') + '"]';
+    }
+    return Array.prototype.slice.call(ctx.querySelectorAll(value));
+}
+function isVisible(e) {
+    if (!(e.offsetWidth || e.offsetHeight || e.getClientRects().length)) {
+        return false;
+    }
+    var style = window.getComputedStyle(e);
+    return style.visibility !== 'hidden' && style.opacity !== '0';
+}
+"""
+
+""" arguments[0]: root element or null, arguments[1]: list of {key, by, value, all}.
+Returns {url, states: {key: {present, visible, elements}}} where elements holds the first match only unless all """
+SNAPSHOT_JS = LOCATE_FN_JS + """
+var root = arguments[0], specs = arguments[1], states = {};
+for (var i = 0; i < specs.length; i++) {
+    var spec = specs[i], found = [];
+    try {
+        found = locate(root, spec.by, spec.value);
+    } catch (e) {
+        found = [];
+    }
+    var elements = spec.all ? found : found.slice(0, 1);
+    states[spec.key] = {
+        present: elements.length > 0,
+        visible: elements.length > 0 && elements.every(isVisible),
+        elements: elements
+    };
+}
+return {url: window.location.href, states: states};
+"""
+
+""" Async script. arguments: root element or null, by, value, condition, text, all, timeout msec, callback.
+Calls back {ok: true, value} as soon as a DOM mutation meets the condition, {ok: false} on timeout """
+OBSERVE_JS = LOCATE_FN_JS + """
+var callback = arguments[arguments.length - 1];
+var root = arguments[0], by = arguments[1], value = arguments[2], condition = arguments[3],
+    text = arguments[4], all = arguments[5], timeoutMs = arguments[6];
+function check() {
+    var found = locate(root, by, value), first = found[0];
+    switch (condition) {
+    case 'presence':
+        return found.length ? {ok: true, value: all ? found : first} : null;
+    case 'visibility':
+        if (all) {
+            return found.length && found.every(isVisible) ? {ok: true, value: found} : null;
+        }
+        return first && isVisible(first) ? {ok: true, value: first} : null;
+    case 'invisibility':
+        return !first ? {ok: true, value: true} : (!isVisible(first) ? {ok: true, value: first} : null);
+    case 'text':
+        return first && (first.innerText || first.textContent || '').indexOf(text) >= 0
+            ? {ok: true, value: true} : null;
+    case 'value':
+        return first && (first.value || '').indexOf(text) >= 0 ? {ok: true, value: true} : null;
+    }
+    return null;
+}
+var done = false, observer = null, timer = null, safety = null;
+function finish(result) {
+    if (done) {
+        return;
+    }
+    done = true;
+    if (observer) {
+        observer.disconnect();
+    }
+    clearTimeout(timer);
+    clearInterval(safety);
+    callback(result);
+}
+function recheck() {
+    try {
+        var result = check();
+        if (result) {
+            finish(result);
+        }
+    } catch (e) {}
+}
+recheck();
+if (!done) {
+    observer = new MutationObserver(recheck);
+    observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+    // Style and layout changes do not always mutate the DOM, e.g. a stylesheet finishing to load.
+    safety = setInterval(recheck, 250);
+    timer = setTimeout(function () { finish({ok: false}); }, timeoutMs);
+}
+"""
+
+""" arguments[0]: root element or null, arguments[1]: by, arguments[2]: value.
+Returns [present, visible] of the first match """
+PROBE_JS = LOCATE_FN_JS + """
+var first = locate(arguments[0], arguments[1], arguments[2])[0];
+return [!!first, !!first && isVisible(first)];
+"""
+
+""" Async script. arguments: root element or null, by, value, wanted state ('displayed' or 'hidden'),
+quiet msec, timeout msec, callback.
+Calls back true as soon as the first match is in the wanted state, otherwise the current state
+once the DOM has had no mutation for quiet msec (or on timeout) """
+SETTLED_JS = LOCATE_FN_JS + """
+var callback = arguments[arguments.length - 1];
+var root = arguments[0], by = arguments[1], value = arguments[2], wanted = arguments[3],
+    quietMs = arguments[4], timeoutMs = arguments[5];
+function state() {
+    var first = locate(root, by, value)[0];
+    var displayed = !!first && isVisible(first);
+    return wanted === 'displayed' ? displayed : !displayed;
+}
+var done = false, observer = null, quiet = null, timer = null;
+function finish(result) {
+    if (done) {
+        return;
+    }
+    done = true;
+    if (observer) {
+        observer.disconnect();
+    }
+    clearTimeout(quiet);
+    clearTimeout(timer);
+    callback(result);
+}
+function onMutation() {
+    if (state()) {
+        finish(true);
+        return;
+    }
+    clearTimeout(quiet);
+    quiet = setTimeout(function () { finish(state()); }, quietMs);
+}
+if (state()) {
+    finish(true);
+} else {
+    observer = new MutationObserver(onMutation);
+    observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+    quiet = setTimeout(function () { finish(state()); }, quietMs);
+    timer = setTimeout(function () { finish(state()); }, timeoutMs);
+}
+"""
+
+""" Installs window.__pomReady once per document: fetch and XHR requests in flight by start time, and the time of
+the last DOM mutation or request start or end. Registered to run before the page scripts when DevTools allows """
+READY_HOOK_JS = """
+(function () {
+    if (window.__pomReady) {
+        return;
+    }
+    var ready = window.__pomReady = {requests: {}, next: 0, lastActivity: performance.now()};
+    function begin() {
+        var id = ready.next++;
+        ready.requests[id] = ready.lastActivity = performance.now();
+        return id;
+    }
+    function end(id) {
+        delete ready.requests[id];
+        ready.lastActivity = performance.now();
+    }
+    if (window.fetch) {
+        var fetch = window.fetch;
+        window.fetch = function () {
+            var id = begin();
+            try {
+                return fetch.apply(window, arguments).then(
+                    function (response) { end(id); return response; },
+                    function (error) { end(id); throw error; });
+            } catch (e) {
+                end(id);
+                throw e;
+            }
+        };
+    }
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        var id = begin();
+        this.addEventListener('loadend', function () { end(id); });
+        try {
+            return send.apply(this, arguments);
+        } catch (e) {
+            end(id);
+            throw e;
+        }
+    };
+    new MutationObserver(function () { ready.lastActivity = performance.now(); })
+        .observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+})();
+"""
+
+""" Async script. arguments: lowest readyState ('interactive' or 'complete'), quiet msec, long request msec,
+count requests (bool), timeout msec, list of [by, value] sentinels, callback. Installs READY_HOOK_JS when the page
+has not got it yet. Calls back {ready, state, pending, waited, hooked, sentinels} once readyState is reached, no
+request younger than long request msec is in flight and nothing happened for quiet msec, or once every sentinel
+is present on a complete document (sentinels true), or on timeout with ready false """
+READY_JS = LOCATE_FN_JS + """
+var callback = arguments[arguments.length - 1];
+var wanted = arguments[0], quietMs = arguments[1], longMs = arguments[2], network = arguments[3],
+    timeoutMs = arguments[4], sentinels = arguments[5] || [];
+var hooked = !!window.__pomReady;
+""" + READY_HOOK_JS + """
+var ready = window.__pomReady, started = performance.now(), states = ['loading', 'interactive', 'complete'];
+function pending(now) {
+    var count = 0;
+    for (var id in ready.requests) {
+        if (now - ready.requests[id] < longMs) {
+            count++;
+        }
+    }
+    return count;
+}
+function check() {
+    var now = performance.now();
+    var busy = network ? pending(now) : 0;
+    var quietFor = now - ready.lastActivity;
+    var ok = states.indexOf(document.readyState) >= states.indexOf(wanted) && busy === 0 && quietFor >= quietMs;
+    var found = !ok && sentinels.length > 0 && document.readyState === 'complete'
+        && sentinels.every(function (s) { return locate(null, s[0], s[1]).length > 0; });
+    if (ok || found || now - started >= timeoutMs) {
+        callback({ready: ok || found, state: document.readyState, pending: busy, waited: now - started,
+                  hooked: hooked, sentinels: found});
+        return;
+    }
+    setTimeout(check, Math.min(Math.max(quietMs - quietFor, 10), 50));
+}
+check();
+"""
+
+""" arguments[0]: root element or null, arguments[1]: by, arguments[2]: value, arguments[3]: start,
+arguments[4]: stop. Returns {url, count, elements}: number of matches and the matches from start to stop """
+SLICE_JS = LOCATE_FN_JS + """
+var found = locate(arguments[0], arguments[1], arguments[2]);
+return {url: window.location.href, count: found.length, elements: found.slice(arguments[3], arguments[4])};
+"""
+
+""" Returns the page URL and whether every element in arguments[0] is still in the document """
+ATTACHED_JS = 'return [window.location.href, arguments[0].every(function (e) { return e.isConnected; })];'
+
+# Defines read(e, name): like WebElement.get_attribute, the property when it holds a primitive value,
+# otherwise the attribute, 'true' or null for boolean attributes
+READ_FN_JS = """
+var BOOLEAN_ATTRIBUTES = ['async', 'autofocus', 'autoplay', 'checked', 'compact', 'complete', 'controls',
+    'declare', 'defaultchecked', 'defaultselected', 'defer', 'disabled', 'draggable', 'ended', 'formnovalidate',
+    'hidden', 'indeterminate', 'iscontenteditable', 'ismap', 'itemscope', 'loop', 'multiple', 'muted', 'nohref',
+    'noresize', 'noshade', 'novalidate', 'nowrap', 'open', 'paused', 'pubdate', 'readonly', 'required',
+    'reversed', 'scoped', 'seamless', 'seeking', 'selected', 'spellcheck', 'truespeed', 'willvalidate'];
+var PROPERTY_ALIASES = {'class': 'className', 'readonly': 'readOnly'};
+function read(e, name) {
+    var lower = name.toLowerCase();
+    if (lower === 'style') {
+        return e.style.cssText;
+    }
+    if (BOOLEAN_ATTRIBUTES.indexOf(lower) >= 0) {
+        var on = e.hasAttribute(lower) || !!e[PROPERTY_ALIASES[lower] || name];
+        return on ? 'true' : null;
+    }
+    var property = e[PROPERTY_ALIASES[lower] || name];
+    if (property !== undefined && property !== null && typeof property !== 'object'
+            && typeof property !== 'function') {
+        return String(property);
+    }
+    return e.getAttribute(name);
+}
+"""
+
+""" arguments[0]: list of elements, arguments[1]: names. Returns one row of values per element """
+READ_JS = READ_FN_JS + """
+var names = arguments[1];
+return arguments[0].map(function (e) {
+    return names.map(function (name) { return read(e, name); });
+});
+"""
+
+""" arguments[0]: root element or null, arguments[1]: by, arguments[2]: value, arguments[3]: names.
+Returns {elements, rows}: every match and one row of values per match """
+LOCATE_READ_JS = LOCATE_FN_JS + READ_FN_JS + """
+var names = arguments[3];
+var found = locate(arguments[0], arguments[1], arguments[2]);
+return {
+    elements: found,
+    rows: found.map(function (e) {
+        return names.map(function (name) { return read(e, name); });
+    })
+};
+"""
+
+""" arguments[0]: list of {kind, root, by, value, keys} with kind 'focus', 'clear', 'type', 'click' or 'submit'.
+Applies the steps in order at DOM level and stops at the first one it cannot apply.
+Returns {done, missing, reason}: number of steps applied, whether the next element is not present yet
+and why the next step needs the WebDriver otherwise """
+MACRO_JS = LOCATE_FN_JS + """
+var TEXT_TYPES = ['', 'text', 'search', 'email', 'url', 'tel', 'password', 'number'];
+function isTextField(e) {
+    var tag = e.tagName.toLowerCase();
+    return tag === 'textarea'
+        || (tag === 'input' && TEXT_TYPES.indexOf((e.getAttribute('type') || '').toLowerCase()) >= 0);
+}
+function setValue(e, value) {
+    // The prototype setter keeps frameworks tracking the value property in sync.
+    var descriptor = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(e), 'value');
+    if (descriptor && descriptor.set) {
+        descriptor.set.call(e, value);
+    } else {
+        e.value = value;
+    }
+    e.dispatchEvent(new Event('input', {bubbles: true}));
+    e.dispatchEvent(new Event('change', {bubbles: true}));
+}
+function apply(op, e) {
+    switch (op.kind) {
+    case 'focus':
+        e.focus({preventScroll: true});
+        return null;
+    case 'clear':
+    case 'type':
+        if (!isTextField(e)) {
+            return 'not a text field';
+        }
+        // Like click: a hidden field is left to the Element method, which waits until it is displayed.
+        if (!isVisible(e)) {
+            return 'not displayed';
+        }
+        if (e.disabled || e.readOnly) {
+            return 'disabled or read-only';
+        }
+        e.focus({preventScroll: true});
+        setValue(e, op.kind === 'clear' ? '' : e.value + op.keys);
+        return null;
+    case 'click':
+        if (!isVisible(e) || e.disabled) {
+            return 'not displayed or disabled';
+        }
+        e.click();
+        return null;
+    case 'submit':
+        // Same as WebElement.submit: dispatch the submit event, then submit unless it was cancelled.
+        var form = e.tagName.toLowerCase() === 'form' ? e : (e.form || e.closest('form'));
+        if (!form) {
+            return 'not in a form';
+        }
+        if (form.dispatchEvent(new Event('submit', {bubbles: true, cancelable: true}))) {
+            form.submit();
+        }
+        return null;
+    }
+    return 'unknown step';
+}
+var ops = arguments[0];
+for (var i = 0; i < ops.length; i++) {
+    var e = locate(ops[i].root, ops[i].by, ops[i].value)[0];
+    if (!e) {
+        return {done: i, missing: true, reason: null};
+    }
+    var reason = apply(ops[i], e);
+    if (reason) {
+        return {done: i, missing: false, reason: reason};
+    }
+}
+return {done: ops.length, missing: false, reason: null};
+"""
@@ -0,0 +1,179 @@
+""" Latency tracing of the WebDriver commands issued by Element. """
+from typing import Any, Dict, List, NamedTuple, Optional
+import threading
+import time
+
+
+class CommandRecord(NamedTuple):
+    """ One traced WebDriver command.
+    Attributes:
+        test(Optional[str]): pytest node id running when the command was issued.
+        command(str): command name, e.g. 'wait:presence', 'click', 'send_keys'.
+        page(Optional[str]): page object class the Element belongs to.
+        attr(Optional[str]): page object attribute name of the Element.
+        search_by(str): search method.
+        locator(str): formatted element id.
+        wall_ms(float): wall time of the command in msec.
+        polls(int): number of condition evaluations of a wait.
+        error(Optional[str]): exception class name when the command failed.
+    """
+    test: Optional[str]
+    command: str
+    page: Optional[str]
+    attr: Optional[str]
+    search_by: str
+    locator: str
+    wall_ms: float
+    polls: int
+    error: Optional[str]
+
+
+class _Span:
+    """ Command being timed. """
+
+    def __init__(self, tracer: 'Tracer', command: str, page: Optional[str], attr: Optional[str], by: str,
+                 locator: str) -> None:
+        self.tracer = tracer
+        self.command = command
+        self.page = page
+        self.attr = attr
+        self.by = by
+        self.locator = locator
+        self.polls = 0
+        self.started = 0.0
+
+    def __enter__(self) -> '_Span':
+        self.tracer.push(self)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        wall_ms = (time.perf_counter() - self.started) * 1000
+        self.tracer.pop(self)
+        self.tracer.add(
+            CommandRecord(self.tracer.current_test, self.command, self.page, self.attr, self.by, self.locator,
+                          round(wall_ms, 3), self.polls, exc_type.__name__ if exc_type else None))
+
+
+class _NoSpan:
+    """ Shared no-op span used while tracing is disabled. """
+
+    def __enter__(self) -> '_NoSpan':
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        return None
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Tracer:
+    """ Collects CommandRecords while enabled.
+    Attributes:
+        enabled(bool): record commands (default=False).
+        current_test(Optional[str]): pytest node id attached to new records.
+        records(List[CommandRecord]): recorded commands.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.current_test: Optional[str] = None
+        self.records: List[CommandRecord] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def command(self, command: str, by: str, locator: str, page: Optional[str] = None,
+                attr: Optional[str] = None) -> Any:
+        """ Context manager timing one command. A shared no-op while disabled.
+        Arguments:
+            command(str): command name.
+            by(str): search method.
+            locator(str): formatted element id.
+            page(Optional[str]): page object class name.
+            attr(Optional[str]): page object attribute name.
+        Returns:
+            Any: context manager.
+        """
+        if not self.enabled:
+            return _NO_SPAN
+        return _Span(self, command, page, attr, by, locator)
+
+    def poll(self) -> None:
+        """ Count one condition evaluation for the innermost command of this thread. """
+        stack = getattr(self._local, 'stack', None)
+        if stack:
+            stack[-1].polls += 1
+
+    def push(self, span: _Span) -> None:
+        """ Make a span the innermost command of this thread.
+        Arguments:
+            span(_Span): started span.
+        """
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(span)
+
+    def pop(self, span: _Span) -> None:
+        """ Remove a finished span.
+        Arguments:
+            span(_Span): finished span.
+        """
+        stack = getattr(self._local, 'stack', [])
+        if stack and stack[-1] is span:
+            stack.pop()
+
+    def add(self, record: CommandRecord) -> None:
+        """ Store a record.
+        Arguments:
+            record(CommandRecord): finished command.
+        """
+        with self._lock:
+            self.records.append(record)
+
+    def clear(self) -> None:
+        """ Drop every record. """
+        with self._lock:
+            self.records = []
+
+    def summary(self, top: int = 10) -> Dict[str, Any]:
+        """ Aggregate the records per test and per page object.
+        Arguments:
+            top(int): number of slowest commands to keep (default=10).
+        Returns:
+            Dict[str, Any]: 'slowest' commands, and count, total and max wall time 'per_test',
+                'per_page' object class and 'per_attribute' of page objects.
+        """
+        with self._lock:
+            records = list(self.records)
+        per_test: Dict[str, Dict[str, float]] = {}
+        per_page: Dict[str, Dict[str, float]] = {}
+        per_attribute: Dict[str, Dict[str, float]] = {}
+        for record in records:
+            page = record.page or '<no page>'
+            for table, key in ((per_test, record.test or '<no test>'), (per_page, page),
+                               (per_attribute, f'{page}.{record.attr or record.locator}')):
+                stats = table.setdefault(key, {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'polls': 0})
+                stats['count'] += 1
+                stats['total_ms'] = round(stats['total_ms'] + record.wall_ms, 3)
+                stats['max_ms'] = max(stats['max_ms'], record.wall_ms)
+                stats['polls'] += record.polls
+        slowest = sorted(records, key=lambda r: r.wall_ms, reverse=True)[:top]
+        return {
+            'slowest': [r._asdict() for r in slowest],
+            'per_test': per_test,
+            'per_page': per_page,
+            'per_attribute': per_attribute,
+        }
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """ Process wide tracer used by Element.
+    Returns:
+        Tracer: tracer.
+    """
+    return _tracer
@@ -0,0 +1,433 @@
+""" Wait engines for Element conditions. """
+from contextlib import contextmanager
+from enum import Enum, auto
+from typing import Any, Callable, Dict, Iterator, NamedTuple, Optional, Sequence, Tuple, Union, cast
+import logging
+import threading
+import time
+import weakref
+
+from selenium.common.exceptions import (JavascriptException, NoSuchElementException,
+                                        StaleElementReferenceException, TimeoutException, WebDriverException)
+from selenium.webdriver import Remote
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.support import expected_conditions as ec
+from selenium.webdriver.support.ui import WebDriverWait
+
+from .scripts import OBSERVE_JS, PROBE_JS, READY_HOOK_JS, READY_JS, SETTLED_JS
+from .trace import get_tracer
+
+logger = logging.getLogger(__name__)
+
+Locator = Tuple[str, str]
+
+
+class WaitEngine(Enum):
+    """ How a condition is waited for. """
+    POLLING = auto()  # WebDriverWait with its fixed 0.5 sec poll interval
+    BACKOFF = auto()  # polling starting at 50 msec and backing off to 0.5 sec
+    MUTATION = auto()  # MutationObserver in the browser, BACKOFF where scripts cannot run
+
+
+class Condition(Enum):
+    """ Condition waited for. """
+    PRESENCE = 'presence'
+    VISIBILITY = 'visibility'
+    INVISIBILITY = 'invisibility'
+    TEXT = 'text'
+    VALUE = 'value'
+
+
+# Poll intervals of the BACKOFF engine in seconds
+BACKOFF_FIRST_INTERVAL = 0.05
+BACKOFF_MAX_INTERVAL = 0.5
+
+# Extra script timeout on top of max_wait so the browser side timer fires first
+SCRIPT_TIMEOUT_MARGIN = 5
+# W3C script timeout of a new session, assumed where the driver cannot tell its own
+DEFAULT_SCRIPT_TIMEOUT = 30.0
+
+_script_timeouts: 'weakref.WeakKeyDictionary[Remote, float]' = weakref.WeakKeyDictionary()
+_scripts_blocked: 'weakref.WeakSet[Remote]' = weakref.WeakSet()
+# Drivers running READY_HOOK_JS on every new document, and drivers without DevTools to do so
+_ready_hooked: 'weakref.WeakSet[Remote]' = weakref.WeakSet()
+_ready_unhookable: 'weakref.WeakSet[Remote]' = weakref.WeakSet()
+_lock = threading.Lock()
+
+
+def expected_condition(condition: Condition, locator: Locator, text: Optional[str],
+                       all_elements: bool) -> Callable[[Any], Any]:
+    """ Selenium expected condition used by the polling engines.
+    Arguments:
+        condition(Condition): condition waited for.
+        locator(Locator): search method and target.
+        text(Optional[str]): expected text of TEXT and VALUE.
+        all_elements(bool): wait for every matching element.
+    Returns:
+        Callable[[Any], Any]: expected condition.
+    Raises:
+        ValueError: invalid condition.
+    """
+    until: Any
+    if condition == Condition.PRESENCE:
+        until = ec.presence_of_all_elements_located if all_elements else ec.presence_of_element_located
+        return cast(Callable[[Any], Any], until(locator))
+    if condition == Condition.VISIBILITY:
+        until = ec.visibility_of_all_elements_located if all_elements else ec.visibility_of_element_located
+        return cast(Callable[[Any], Any], until(locator))
+    if condition == Condition.INVISIBILITY and not all_elements:
+        return cast(Callable[[Any], Any], ec.invisibility_of_element_located(locator))
+    if condition == Condition.TEXT and not all_elements:
+        return cast(Callable[[Any], Any], ec.text_to_be_present_in_element(locator, text or ''))
+    if condition == Condition.VALUE and not all_elements:
+        return cast(Callable[[Any], Any], ec.text_to_be_present_in_element_value(locator, text or ''))
+    raise ValueError(f'Invalid condition: {condition}')
+
+
+def poll_with_backoff(root: Union[Remote, WebElement], until: Callable[[Any], Any], max_wait: float) -> Any:
+    """ Poll a condition, starting fast and backing off to the WebDriverWait interval.
+    Arguments:
+        root(Union[Remote, WebElement]): driver or parent element passed to the condition.
+        until(Callable[[Any], Any]): expected condition.
+        max_wait(float): maximum wait time in seconds.
+    Returns:
+        Any: first truthy value of the condition.
+    Raises:
+        TimeoutException: the condition was not met in time.
+    """
+    deadline = time.monotonic() + max_wait
+    interval = BACKOFF_FIRST_INTERVAL
+    while True:
+        try:
+            value = until(root)
+            if value:
+                return value
+        except (NoSuchElementException, StaleElementReferenceException):
+            pass
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutException()
+        time.sleep(min(interval, remaining))
+        interval = min(interval * 2, BACKOFF_MAX_INTERVAL)
+
+
+def _back_off(deadline: float, interval: float) -> float:
+    """ Sleep before a retry, at most until the deadline.
+    Arguments:
+        deadline(float): time.monotonic() value of the deadline.
+        interval(float): current retry interval in seconds.
+    Returns:
+        float: next retry interval, doubled up to BACKOFF_MAX_INTERVAL.
+    """
+    time.sleep(max(min(interval, deadline - time.monotonic()), 0))
+    return min(interval * 2, BACKOFF_MAX_INTERVAL)
+
+
+def _counted(until: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    """ Count each evaluation of a condition on the innermost traced command.
+    Arguments:
+        until(Callable[[Any], Any]): expected condition.
+    Returns:
+        Callable[[Any], Any]: expected condition counting its polls.
+    """
+    tracer = get_tracer()
+
+    def counted(root: Any) -> Any:
+        tracer.poll()
+        return until(root)
+
+    return counted
+
+
+def _navigated(e: WebDriverException) -> bool:
+    """ Whether a script failed because its document was unloaded, e.g. by a redirect, not because
+    scripts cannot run on the page.
+    Arguments:
+        e(WebDriverException): error of execute_script or execute_async_script.
+    Returns:
+        bool: return True if the page navigated while the script ran, False otherwise.
+    """
+    return 'document unloaded' in str(e.msg or e)
+
+
+def _known_script_timeout(driver: Remote) -> float:
+    """ Script timeout of the driver, read once and then tracked here.
+    Arguments:
+        driver(Remote): Web Driver.
+    Returns:
+        float: script timeout in seconds.
+    """
+    with _lock:
+        if driver in _script_timeouts:
+            return _script_timeouts[driver]
+    try:
+        seconds = float(driver.timeouts.script)
+    except (AttributeError, TypeError, WebDriverException):
+        seconds = DEFAULT_SCRIPT_TIMEOUT
+    with _lock:
+        return _script_timeouts.setdefault(driver, seconds)
+
+
+@contextmanager
+def _script_timeout(driver: Remote, seconds: float) -> Iterator[None]:
+    """ Raise the async script timeout of the driver for the duration of the block, if lower.
+    The previous value is restored afterwards, so scripts of the test keep their own timeout.
+    Arguments:
+        driver(Remote): Web Driver.
+        seconds(float): minimum script timeout.
+    """
+    previous = _known_script_timeout(driver)
+    if previous >= seconds:
+        yield
+        return
+    driver.set_script_timeout(seconds)
+    _script_timeouts[driver] = seconds
+    try:
+        yield
+    finally:
+        driver.set_script_timeout(previous)
+        _script_timeouts[driver] = previous
+
+
+def observe(driver: Remote, root: Union[Remote, WebElement], condition: Condition, locator: Locator,
+            text: Optional[str], all_elements: bool, max_wait: float) -> Any:
+    """ Wait in the browser with a MutationObserver, answering as soon as the DOM meets the condition.
+    Arguments:
+        driver(Remote): Web Driver.
+        root(Union[Remote, WebElement]): driver or parent element to search in.
+        condition(Condition): condition waited for.
+        locator(Locator): search method and target.
+        text(Optional[str]): expected text of TEXT and VALUE.
+        all_elements(bool): wait for every matching element.
+        max_wait(float): maximum wait time in seconds.
+    Returns:
+        Any: WebElement, list of WebElements or True like the expected conditions.
+    Raises:
+        TimeoutException: the condition was not met in time.
+        WebDriverException: the script could not run.
+    """
+    get_tracer().poll()
+    parent = root if isinstance(root, WebElement) else None
+    with _script_timeout(driver, max_wait + SCRIPT_TIMEOUT_MARGIN):
+        result: Dict[str, Any] = driver.execute_async_script(OBSERVE_JS, parent, locator[0], locator[1],
+                                                             condition.value, text or '', all_elements,
+                                                             int(max_wait * 1000))
+    if not result or not result.get('ok'):
+        raise TimeoutException()
+    return result['value']
+
+
+def wait_until(driver: Remote,
+               root: Union[Remote, WebElement],
+               condition: Condition,
+               locator: Locator,
+               max_wait: float,
+               engine: WaitEngine = WaitEngine.POLLING,
+               text: Optional[str] = None,
+               all_elements: bool = False) -> Any:
+    """ Wait until the condition is met with the chosen engine.
+    Arguments:
+        driver(Remote): Web Driver.
+        root(Union[Remote, WebElement]): driver or parent element to search in.
+        condition(Condition): condition waited for.
+        locator(Locator): search method and target.
+        max_wait(float): maximum wait time in seconds.
+        engine(WaitEngine): wait engine (default=POLLING).
+        text(Optional[str]): expected text of TEXT and VALUE.
+        all_elements(bool): wait for every matching element (default=False).
+    Returns:
+        Any: WebElement, list of WebElements or True like the expected conditions.
+    Raises:
+        TimeoutException: the condition was not met in time.
+        ValueError: invalid condition.
+    """
+    until = expected_condition(condition, locator, text, all_elements)
+    tracer = get_tracer()
+    if tracer.enabled:
+        until = _counted(until)
+    if engine == WaitEngine.POLLING:
+        return WebDriverWait(root, max_wait).until(until)
+
+    started = time.monotonic()
+    if engine == WaitEngine.MUTATION and driver not in _scripts_blocked:
+        try:
+            return observe(driver, root, condition, locator, text, all_elements, max_wait)
+        except TimeoutException:
+            raise
+        except JavascriptException as e:
+            if _navigated(e):
+                # The observer went away with its document, the next wait observes the new one.
+                logger.debug('Page navigated while observing, falling back to polling: %s', e)
+            else:
+                logger.debug('MutationObserver cannot run, falling back to polling: %s', e)
+                _scripts_blocked.add(driver)
+        except WebDriverException as e:
+            # e.g. the script timeout fired before the browser side timer.
+            logger.debug('MutationObserver wait aborted, falling back to polling: %s', e)
+    return poll_with_backoff(root, until, max(max_wait - (time.monotonic() - started), 0))
+
+
+def probe(driver: Remote, root: Union[Remote, WebElement], locator: Locator) -> Tuple[bool, bool]:
+    """ Presence and visibility of the first match right now, in one round trip without waiting.
+    Arguments:
+        driver(Remote): Web Driver.
+        root(Union[Remote, WebElement]): driver or parent element to search in.
+        locator(Locator): search method and target.
+    Returns:
+        Tuple[bool, bool]: present and visible.
+    """
+    if driver not in _scripts_blocked:
+        parent = root if isinstance(root, WebElement) else None
+        try:
+            present, visible = driver.execute_script(PROBE_JS, parent, locator[0], locator[1])
+            return bool(present), bool(visible)
+        except JavascriptException as e:
+            logger.debug('Probe script cannot run, falling back to find_elements: %s', e)
+            _scripts_blocked.add(driver)
+    found = root.find_elements(*locator)
+    if not found:
+        return False, False
+    try:
+        return True, bool(found[0].is_displayed())
+    except StaleElementReferenceException:
+        return False, False
+
+
+def settled(driver: Remote, root: Union[Remote, WebElement], locator: Locator, displayed: bool,
+            quiet_period: float, max_wait: float) -> bool:
+    """ Wait until the first match is displayed (or hidden), or the DOM has been quiet for quiet_period.
+    Where scripts cannot run, or the script fails, e.g. on a navigation, the state is polled for quiet_period instead.
+    Arguments:
+        driver(Remote): Web Driver.
+        root(Union[Remote, WebElement]): driver or parent element to search in.
+        locator(Locator): search method and target.
+        displayed(bool): wanted state, True for displayed and False for hidden.
+        quiet_period(float): seconds without DOM mutation after which the current state is returned.
+        max_wait(float): maximum wait time in seconds.
+    Returns:
+        bool: return True if the element reached the wanted state, False otherwise.
+    """
+    if driver not in _scripts_blocked:
+        parent = root if isinstance(root, WebElement) else None
+        try:
+            with _script_timeout(driver, max_wait + SCRIPT_TIMEOUT_MARGIN):
+                return bool(driver.execute_async_script(SETTLED_JS, parent, locator[0], locator[1],
+                                                        'displayed' if displayed else 'hidden',
+                                                        int(quiet_period * 1000), int(max_wait * 1000)))
+        except JavascriptException as e:
+            logger.debug('Settled script cannot run, falling back to polling: %s', e)
+            if not _navigated(e):
+                _scripts_blocked.add(driver)
+        except WebDriverException as e:
+            logger.debug('Settled wait aborted, falling back to polling: %s', e)
+
+    def reached(_: Any) -> bool:
+        return probe(driver, root, locator)[1] == displayed
+
+    try:
+        return bool(poll_with_backoff(root, reached, min(quiet_period, max_wait)))
+    except TimeoutException:
+        return False
+
+
+class ReadinessRules(NamedTuple):
+    """ When a page counts as usable.
+    Attributes:
+        ready_state(str): lowest document.readyState, 'interactive' or 'complete' (default='complete').
+        quiet_period(float): time without DOM mutation nor request start or end in sec (default=0.1sec).
+        network_idle(bool): wait for the fetch and XHR requests in flight (default=True).
+        long_request(float): requests in flight for longer are ignored, e.g. long polling (default=5sec).
+    """
+    ready_state: str = 'complete'
+    quiet_period: float = 0.1
+    network_idle: bool = True
+    long_request: float = 5
+
+
+class PageReadiness(NamedTuple):
+    """ Outcome of wait_until_ready.
+    Attributes:
+        ready(bool): the page met the rules before max_wait.
+        ready_state(str): document.readyState, 'unknown' where scripts cannot run.
+        pending_requests(int): fetch and XHR requests still in flight.
+        waited(float): time waited in the browser in sec.
+        hooked(bool): requests were counted from the start of the document, not only from the wait.
+        sentinels(bool): the page was used once its sentinels were present, before it went quiet (default=False).
+    """
+    ready: bool
+    ready_state: str
+    pending_requests: int
+    waited: float
+    hooked: bool
+    sentinels: bool = False
+
+
+def install_ready_hook(driver: Remote) -> bool:
+    """ Run READY_HOOK_JS before the scripts of every new document, once per driver, so requests sent
+    while the page loads are counted too. Needs the Chrome DevTools Protocol.
+    Arguments:
+        driver(Remote): Web Driver.
+    Returns:
+        bool: return True if the hook is registered, False if the driver has no DevTools.
+    """
+    if driver in _ready_hooked:
+        return True
+    if driver in _ready_unhookable:
+        return False
+    try:
+        driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': READY_HOOK_JS})
+    except (AttributeError, WebDriverException) as e:
+        logger.debug('Readiness hook not registered, requests are counted from the wait only: %s', e)
+        _ready_unhookable.add(driver)
+        return False
+    _ready_hooked.add(driver)
+    return True
+
+
+def wait_until_ready(driver: Remote, rules: ReadinessRules = ReadinessRules(), max_wait: float = 30,
+                     sentinels: Sequence[Locator] = ()) -> PageReadiness:
+    """ Wait in the browser until the current page is usable: readyState reached, no fetch nor XHR in flight
+    and neither DOM mutation nor request for the quiet period. One round trip unless the page navigates meanwhile.
+    A page that never goes quiet, e.g. polling every few msec, is usable as soon as every sentinel is present
+    on the complete document.
+    Arguments:
+        driver(Remote): Web Driver.
+        rules(ReadinessRules): when the page counts as usable (default=ReadinessRules()).
+        max_wait(float): maximum wait time in seconds (default=30sec).
+        sentinels(Sequence[Locator]): search method and value of elements searched from the document (default=()).
+    Returns:
+        PageReadiness: whether and how the page got ready, ready is False after max_wait.
+    """
+    deadline = time.monotonic() + max_wait
+    interval = BACKOFF_FIRST_INTERVAL
+    with _script_timeout(driver, max_wait + SCRIPT_TIMEOUT_MARGIN):
+        while driver not in _scripts_blocked:
+            get_tracer().poll()
+            try:
+                result: Dict[str, Any] = driver.execute_async_script(
+                    READY_JS, rules.ready_state, int(rules.quiet_period * 1000), int(rules.long_request * 1000),
+                    rules.network_idle, int(max(deadline - time.monotonic(), 0) * 1000),
+                    [list(sentinel) for sentinel in sentinels])
+            except JavascriptException as e:
+                if not _navigated(e):
+                    logger.debug('Readiness script cannot run: %s', e)
+                    _scripts_blocked.add(driver)
+                    break
+                # The document was replaced, e.g. by a redirect, while waiting: wait on the new one.
+                if time.monotonic() >= deadline:
+                    break
+                logger.debug('Page navigated during the readiness wait, waiting on the new document: %s', e)
+                interval = _back_off(deadline, interval)
+                continue
+            except WebDriverException as e:
+                if time.monotonic() >= deadline:
+                    raise
+                logger.debug('Readiness wait interrupted, retrying: %s', e)
+                interval = _back_off(deadline, interval)
+                continue
+            if not result:
+                break
+            return PageReadiness(bool(result['ready']), str(result['state']), int(result['pending']),
+                                 float(result['waited']) / 1000, bool(result['hooked']),
+                                 bool(result.get('sentinels')))
+    return PageReadiness(False, 'unknown', 0, 0.0, False)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+""" Pytest plugin capturing screenshot, DOM and browser logs of failed tests in the background """
+import logging
+import os
+from typing import Iterator
+
+import pytest
+from _pytest.config import Config
+from _pytest.config.argparsing import Parser
+from _pytest.nodes import Item
+from lib.utils.common.artifacts import ArtifactWriter
+
+logger = logging.getLogger(__name__)
+
+WRITER_ATTR = '_artifact_writer'
+
+
+def pytest_addoption(parser: Parser) -> None:
+    """ Add options for failure artifacts.
+
+    Args:
+        parser: pytest command line parser.
+    """
+    group = parser.getgroup('artifacts')
+    group.addoption('--artifacts-dir', default='artifacts',
+                    help='Directory of the failure artifacts (default=artifacts).')
+    group.addoption('--artifacts-keep', type=int, default=50,
+                    help='Number of newest failure captures kept, 0 keeps all (default=50).')
+    group.addoption('--artifacts-max-mb', type=int, default=200,
+                    help='Size budget of the artifact directory in MB, 0 is unlimited (default=200).')
+    group.addoption('--no-artifacts', action='store_true', default=False,
+                    help='Do not capture failure artifacts.')
+
+
+def pytest_configure(config: Config) -> None:
+    """ Start the background writer. The directory is only created by the first capture.
+
+    Args:
+        config: pytest config object.
+    """
+    if config.getoption('no_artifacts'):
+        return
+    directory = config.getoption('artifacts_dir')
+    worker = os.environ.get('PYTEST_XDIST_WORKER')
+    if worker:
+        directory = os.path.join(directory, worker)
+    setattr(config, WRITER_ATTR, ArtifactWriter(directory, config.getoption('artifacts_keep'),
+                                                config.getoption('artifacts_max_mb') * 1024 * 1024))
+
+
+def pytest_unconfigure(config: Config) -> None:
+    """ Wait for the pending writes.
+
+    Args:
+        config: pytest config object.
+    """
+    writer = getattr(config, WRITER_ATTR, None)
+    if writer is not None:
+        writer.close()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item: Item) -> Iterator[None]:
+    """ Grab the artifacts when the test body or its setup fails, before the driver goes back to the pool.
+
+    Args:
+        item: test item.
+    """
+    outcome = yield
+    report = outcome.get_result()  # type: ignore
+    writer = getattr(item.config, WRITER_ATTR, None)
+    driver = getattr(item.cls, 'driver', None) if item.cls else None
+    if writer is None or driver is None or not report.failed or report.when == 'teardown':
+        return
+    writer.capture(driver, item.nodeid)
+    report.sections.append(('failure artifacts', f'Written in the background to {writer.directory}'))
@@ -1,26 +1,106 @@
 #!/usr/bin/env python3
-""" For setup and teardown driver """
+""" For setup and teardown driver
+
+Drivers come from one pool per pytest process, so with pytest-xdist every
+worker keeps its own warm browser(s) for all the test classes it runs.
+"""
+import functools
 import logging
+import os
 import pytest
+from _pytest.config import Config
+from _pytest.config.argparsing import Parser
 from _pytest.fixtures import SubRequest
-from lib.utils.common.driver_setting import set_chrome_driver_options
+from lib.base.driver_pool import DriverPool
+from lib.utils.common.driver_setting import PROFILES, set_chrome_driver_options
+from lib.utils.common.memory import memory_recycle_reason
+from lib.utils.common.network import get_network_stats
+from lib.utils.common.web_element.element import get_element_cache
 
 logger = logging.getLogger(__name__)
 
 
+def pytest_addoption(parser: Parser) -> None:
+    """ Add options for the driver pool.
+
+    Args:
+        parser: pytest command line parser.
+    """
+    group = parser.getgroup('driver')
+    group.addoption('--driver-pool-size', type=int, default=1,
+                    help='Number of warm webdrivers kept by the pool of each worker (default=1).')
+    group.addoption('--driver-max-uses', type=int, default=50,
+                    help='Number of test classes served by a webdriver before it is retired (default=50).')
+    group.addoption('--launch-profile', default='default', choices=sorted(PROFILES),
+                    help='Chrome launch profile (default=default).')
+
+
+def worker_name() -> str:
+    """ Name of the pytest-xdist worker running this process.
+
+    Returns:
+        str: worker id such as 'gw0', or 'main' without xdist.
+    """
+    return os.environ.get('PYTEST_XDIST_WORKER', 'main')
+
+
+@pytest.fixture(scope='session', name='driver_pool')  # type: ignore
+def fixture_driver_pool(pytestconfig: Config) -> DriverPool:
+    """ worker scope Fixture to create and close the driver pool.
+    Session fixtures live once per xdist worker process.
+
+    Args:
+        pytestconfig: pytest config object.
+    Yields:
+        DriverPool: pool shared by every test class of this worker.
+    """
+    pool = DriverPool(functools.partial(set_chrome_driver_options, profile=pytestconfig.getoption('launch_profile')),
+                      size=pytestconfig.getoption('driver_pool_size'),
+                      max_uses=pytestconfig.getoption('driver_max_uses'),
+                      retire_when=memory_recycle_reason)
+    logger.info("Driver pool of worker %s created.", worker_name())
+
+    yield pool
+
+    pool.close()
+    logger.info("Driver pool of worker %s closed. Network: %s", worker_name(), get_network_stats().as_dict())
+
+
 @pytest.fixture(scope='class', name='driver_fixture')  # type: ignore
-def driver_fixture(request: SubRequest) -> None:
-    """ session scope Fixture to create and quit driver.
+def driver_fixture(request: SubRequest, driver_pool: DriverPool) -> None:
+    """ class scope Fixture to borrow and return driver.
+
+    Args:
+        request: a sub request for handling getting a fixture from a test function/fixture.
+        driver_pool: pool to borrow the driver from.
+    Yields:
+        None
+    """
+    request.cls.driver = driver_pool.acquire()
+    logger.info("Webdriver borrowed.")
+
+    yield
+
+    driver_pool.release(request.cls.driver)
+    logger.info("Webdriver returned.")
+
+
+@pytest.fixture(autouse=True, name='element_cache_stats')  # type: ignore
+def element_cache_stats(request: SubRequest) -> None:
+    """ function scope Fixture to log element cache hits and misses of each test.
 
     Args:
         request: a sub request for handling getting a fixture from a test function/fixture.
     Yields:
         None
     """
-    request.cls.driver = set_chrome_driver_options()
-    logger.info("Webdriver created.")
+    driver = getattr(request.cls, 'driver', None) if request.cls else None
+    if driver is None:
+        yield
+        return
+    cache = get_element_cache(driver)
+    cache.reset_stats()
 
     yield
 
-    request.cls.driver.quit()
-    logger.info("Webdriver closed.")
+    logger.info("Element cache of %s: %s", request.node.nodeid, cache.stats())
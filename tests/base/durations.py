@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+""" Pytest plugin storing test durations and ordering the longest tests first
+
+With pytest-xdist the controller hands tests out in collection order, so
+starting with the longest ones keeps the last worker from finishing alone
+on a slow shard.
+"""
+import json
+import logging
+import os
+import statistics
+from typing import Dict, List, Tuple
+
+import pytest
+from _pytest.config import Config
+from _pytest.config.argparsing import Parser
+from _pytest.nodes import Item
+from _pytest.reports import TestReport
+
+logger = logging.getLogger(__name__)
+
+# Duration of a test never run before, when no test has a stored duration either
+DEFAULT_DURATION = 1.0
+
+
+def pytest_addoption(parser: Parser) -> None:
+    """ Add options for duration based ordering.
+
+    Args:
+        parser: pytest command line parser.
+    """
+    group = parser.getgroup('durations')
+    group.addoption('--durations-file', default='.test_durations.json',
+                    help='JSON file of test durations by node id (default=.test_durations.json).')
+    group.addoption('--store-durations', action='store_true', default=False,
+                    help='Update the durations file with the durations of this run.')
+    group.addoption('--no-duration-order', action='store_true', default=False,
+                    help='Keep the collection order instead of running the longest tests first.')
+
+
+def _is_worker(config: Config) -> bool:
+    """ Whether this process is a pytest-xdist worker. """
+    return hasattr(config, 'workerinput')
+
+
+def load_durations(path: str) -> Dict[str, float]:
+    """ Read stored durations.
+
+    Args:
+        path: durations file.
+    Returns:
+        Dict[str, float]: seconds by node id, empty when the file is missing or broken.
+    """
+    try:
+        with open(path, encoding='utf8') as f:
+            return {str(k): float(v) for k, v in json.load(f).items()}
+    except (OSError, ValueError, AttributeError) as e:
+        logger.debug("No test durations loaded from %s: %s", path, e)
+        return {}
+
+
+def _scope(nodeid: str) -> Tuple[str, str]:
+    """ Module and class of a test, the function itself stands for the class of a test function.
+
+    Args:
+        nodeid: node id of the test, e.g. tests/test_home.py::TestHome::test_search[chrome].
+    Returns:
+        Tuple[str, str]: node ids of the module and of the group sharing class fixtures.
+    """
+    path = nodeid.split('[', 1)[0]
+    parts = path.split('::')
+    return parts[0], '::'.join(parts[:-1]) if len(parts) > 2 else path
+
+
+def order_longest_first(items: List[Item], durations: Dict[str, float]) -> None:
+    """ Sort items in place, longest first by stored duration, module by module and class by class.
+    The tests of a class, and of a module, stay together in their collection order, so class and module
+    fixtures are set up once. Tests without a stored duration count as the median one. Ties keep the
+    collection order, so every xdist worker computes the same order.
+
+    Args:
+        items: collected test items.
+        durations: seconds by node id.
+    """
+    known = [durations[item.nodeid] for item in items if item.nodeid in durations]
+    default = statistics.median(known) if known else DEFAULT_DURATION
+    totals: Dict[str, float] = {}
+    for item in items:
+        duration = durations.get(item.nodeid, default)
+        for scope in _scope(item.nodeid):
+            totals[scope] = totals.get(scope, 0.0) + duration
+    first = {}
+    for index, item in enumerate(items):
+        for scope in _scope(item.nodeid):
+            first.setdefault(scope, index)
+
+    def key(item: Item) -> Tuple[float, int, float, int]:
+        module, group = _scope(item.nodeid)
+        return -totals[module], first[module], -totals[group], first[group]
+
+    items.sort(key=key)
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(config: Config, items: List[Item]) -> None:
+    """ Run the longest modules and classes first.
+
+    Args:
+        config: pytest config object.
+        items: collected test items.
+    """
+    if config.getoption('no_duration_order'):
+        return
+    durations = load_durations(config.getoption('durations_file'))
+    if durations:
+        order_longest_first(items, durations)
+
+
+class DurationRecorder:
+    """ Plugin adding up setup, call and teardown durations of each test and storing them at session end.
+    Registered on the controller only: pytest-xdist replays the reports of the workers there.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.durations: Dict[str, float] = {}
+
+    def pytest_runtest_logreport(self, report: TestReport) -> None:
+        """ Add the duration of one test phase.
+
+        Args:
+            report: report of one test phase.
+        """
+        self.durations[report.nodeid] = self.durations.get(report.nodeid, 0.0) + report.duration
+
+    def pytest_sessionfinish(self) -> None:
+        """ Merge the durations of this run into the durations file. """
+        if not self.durations:
+            return
+        stored = load_durations(self.path)
+        stored.update({k: round(v, 3) for k, v in self.durations.items()})
+        with open(self.path, 'w', encoding='utf8') as f:
+            json.dump(stored, f, indent=2, sort_keys=True)
+        logger.info("Stored durations of %s test(s) in %s", len(self.durations), os.path.abspath(self.path))
+
+
+def pytest_configure(config: Config) -> None:
+    """ Record the durations of this run on the controller when requested.
+
+    Args:
+        config: pytest config object.
+    """
+    if config.getoption('store_durations') and not _is_worker(config):
+        config.pluginmanager.register(DurationRecorder(config.getoption('durations_file')), 'duration-recorder')
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+""" Pytest plugin buffering the log records of each test and writing them as JSON lines
+
+The live log of pytest (log_cli) writes every record to the terminal while the
+test waits. Its records are kept in memory instead and written when the test
+phase is reported, so log calls in tests never wait for the terminal.
+"""
+import logging
+import os
+from typing import Any, Iterator, List, Optional
+
+import pytest
+from _pytest.config import Config
+from _pytest.config.argparsing import Parser
+from _pytest.logging import _LiveLoggingStreamHandler
+from _pytest.main import Session
+from _pytest.nodes import Item
+from lib.utils.common.logger_setting import TestLogBuffer, freeze_record, set_log_context
+
+logger = logging.getLogger(__name__)
+
+BUFFER_ATTR = '_test_log_buffer'
+FAILED_ATTR = '_test_log_failed'
+LIVE_LOG_ATTR = '_live_log_buffer'
+
+
+class LiveLogBuffer(logging.Handler):
+    """ Stand-in for the live log handler of pytest, writing the records of a test phase through it
+    once the phase is over instead of one by one.
+
+    Attributes:
+        live: live log handler of pytest.
+        records(List[logging.LogRecord]): records of the running phase.
+    """
+
+    def __init__(self, live: logging.Handler) -> None:
+        super().__init__()
+        self.live = live
+        self.records: List[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        record = freeze_record(record)
+        with self.lock:  # type: ignore
+            self.records.append(record)
+
+    def flush(self) -> None:
+        """ Write the buffered records to the terminal. """
+        with self.lock:  # type: ignore
+            records, self.records = self.records, []
+        for record in records:
+            self.live.handle(record)
+
+    def set_when(self, when: Optional[str]) -> None:
+        """ Start a new section of the live log.
+
+        Args:
+            when: test phase.
+        """
+        self.flush()
+        self.live.set_when(when)  # type: ignore
+
+    def reset(self) -> None:
+        """ Reset the live log section. """
+        self.flush()
+        self.live.reset()  # type: ignore
+
+
+def pytest_addoption(parser: Parser) -> None:
+    """ Add options for JSON test logs.
+
+    Args:
+        parser: pytest command line parser.
+    """
+    group = parser.getgroup('json-log')
+    group.addoption('--json-log', default=None,
+                    help='Append the records of each test to this JSON lines file once the test ends.')
+    group.addoption('--json-log-failures-only', action='store_true', default=False,
+                    help='With --json-log, keep the records of failed tests only.')
+    group.addoption('--live-log-unbuffered', action='store_true', default=False,
+                    help='Write each live log (log_cli) record right away instead of at the end of the test phase.')
+
+
+def _log_file(config: Config) -> Optional[str]:
+    """ JSON log file of this process, suffixed with the xdist worker id.
+
+    Args:
+        config: pytest config object.
+    Returns:
+        Optional[str]: path, None when not requested.
+    """
+    path = config.getoption('json_log')
+    worker = os.environ.get('PYTEST_XDIST_WORKER')
+    if path and worker:
+        root, ext = os.path.splitext(path)
+        path = f'{root}.{worker}{ext}'
+    return path
+
+
+def pytest_configure(config: Config) -> None:
+    """ Attach the in-memory buffer to the root logger.
+
+    Args:
+        config: pytest config object.
+    """
+    path = _log_file(config)
+    if not path:
+        return
+    buffer = TestLogBuffer(path, config.getoption('json_log_failures_only'))
+    logging.getLogger().addHandler(buffer)
+    setattr(config, BUFFER_ATTR, buffer)
+    set_log_context(worker_id=os.environ.get('PYTEST_XDIST_WORKER', 'main'))
+
+
+def pytest_unconfigure(config: Config) -> None:
+    """ Detach the buffer and write its remaining records.
+
+    Args:
+        config: pytest config object.
+    """
+    buffer = getattr(config, BUFFER_ATTR, None)
+    if buffer is not None:
+        logging.getLogger().removeHandler(buffer)
+        buffer.close()
+
+
+def pytest_sessionstart(session: Session) -> None:
+    """ Put the live log handler of pytest behind a LiveLogBuffer.
+
+    Args:
+        session: pytest session.
+    """
+    plugin: Any = session.config.pluginmanager.get_plugin('logging-plugin')
+    live = getattr(plugin, 'log_cli_handler', None)
+    if session.config.getoption('live_log_unbuffered') or not isinstance(live, _LiveLoggingStreamHandler):
+        return
+    buffer = LiveLogBuffer(live)
+    plugin.log_cli_handler = buffer
+    setattr(session.config, LIVE_LOG_ATTR, buffer)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item: Item) -> Iterator[None]:
+    """ Tag the records with the test id and flush them when the test ends.
+
+    Args:
+        item: test item.
+    """
+    buffer = getattr(item.config, BUFFER_ATTR, None)
+    set_log_context(item.nodeid)
+    setattr(item, FAILED_ATTR, False)
+    try:
+        yield
+    finally:
+        set_log_context(None)
+        if buffer is not None:
+            buffer.flush_test(getattr(item, FAILED_ATTR))
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item: Item) -> Iterator[None]:
+    """ Remember whether any phase of the test failed, and write its live log records before its result.
+
+    Args:
+        item: test item.
+    """
+    outcome = yield
+    if outcome.get_result().failed:  # type: ignore
+        setattr(item, FAILED_ATTR, True)
+    live = getattr(item.config, LIVE_LOG_ATTR, None)
+    if live is not None:
+        live.flush()
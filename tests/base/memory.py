@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+""" Pytest plugin enforcing a browser memory budget and reporting the peak memory of each test """
+import logging
+from typing import Dict
+
+import pytest
+from _pytest.config import Config
+from _pytest.config.argparsing import Parser
+from _pytest.fixtures import SubRequest
+from _pytest.reports import TestReport
+from _pytest.terminal import TerminalReporter
+from selenium.webdriver import Remote
+from lib.utils.common.memory import MemoryBudget, get_memory_monitor, memory_recycle_reason
+
+logger = logging.getLogger(__name__)
+
+# user_properties key of the memory figures of a test
+PROPERTY = 'browser_memory'
+
+
+def pytest_addoption(parser: Parser) -> None:
+    """ Add options for memory monitoring.
+
+    Args:
+        parser: pytest command line parser.
+    """
+    group = parser.getgroup('memory')
+    group.addoption('--memory-limit-test-mb', type=float, default=0,
+                    help='Fail a test whose JavaScript heap goes over this many MB, 0 is unlimited (default=0).')
+    group.addoption('--memory-limit-session-mb', type=float, default=0,
+                    help='Fail a test after which the browser still holds this many MB of JavaScript heap, '
+                         '0 is unlimited. Drivers holding 80%% of it are recycled (default=0).')
+    group.addoption('--memory-report', action='store_true', default=False,
+                    help='Sample the browser memory and print the peak of each test, implied by the limits.')
+    group.addoption('--memory-interval', type=float, default=0.5,
+                    help='Time between memory samples in sec (default=0.5).')
+    group.addoption('--memory-top', type=int, default=10,
+                    help='Number of tests printed by the memory report (default=10).')
+
+
+def _budget(config: Config) -> MemoryBudget:
+    """ Memory budget given on the command line.
+
+    Args:
+        config: pytest config object.
+    Returns:
+        MemoryBudget: limits.
+    """
+    return MemoryBudget(config.getoption('memory_limit_test_mb'), config.getoption('memory_limit_session_mb'))
+
+
+def _enabled(config: Config) -> bool:
+    """ Whether memory is monitored.
+
+    Args:
+        config: pytest config object.
+    Returns:
+        bool: return True if a limit or the report is requested.
+    """
+    return bool(_budget(config)) or config.getoption('memory_report')
+
+
+@pytest.fixture(autouse=True, name='browser_memory')  # type: ignore
+def browser_memory(request: SubRequest) -> None:
+    """ function scope Fixture sampling the memory of the driver while the test runs.
+    The budget is enforced at teardown, so a test going over it errors there. A driver holding too much memory
+    is retired right away and the rest of the class runs on a new driver from the pool.
+
+    Args:
+        request: a sub request for handling getting a fixture from a test function/fixture.
+    Yields:
+        None
+    """
+    driver = getattr(request.cls, 'driver', None) if request.cls else None
+    if driver is None or not _enabled(request.config):
+        yield
+        return
+    monitor = get_memory_monitor(driver, _budget(request.config), request.config.getoption('memory_interval'))
+    monitor.start(request.node.nodeid)
+
+    yield
+
+    report = monitor.stop()
+    if report is None:
+        return
+    request.node.user_properties.append((PROPERTY, report.as_dict()))
+    logger.info("Browser memory of %s: %s", request.node.nodeid, report.as_dict())
+    try:
+        monitor.check(report)
+    finally:
+        reason = memory_recycle_reason(driver)
+        if reason and 'driver_pool' in request.fixturenames:
+            _recycle(request, driver, reason)
+
+
+def _recycle(request: SubRequest, driver: Remote, reason: str) -> None:
+    """ Replace the driver of the test class with a new one from the pool.
+
+    Args:
+        request: a sub request for handling getting a fixture from a test function/fixture.
+        driver: driver borrowed by the test class.
+        reason: reason written to the log.
+    """
+    pool = request.getfixturevalue('driver_pool')
+    logger.info("Webdriver of %s recycled: %s.", request.cls.__name__, reason)
+    pool.release(driver, discard=True)
+    request.cls.driver = pool.acquire()
+
+
+class MemoryRecorder:
+    """ Plugin collecting the memory figures of the tests and printing the highest peaks.
+    Also registered on the pytest-xdist controller, which replays the reports of the workers.
+    """
+
+    def __init__(self, top: int) -> None:
+        self.top = top
+        self.reports: Dict[str, Dict[str, float]] = {}
+
+    def pytest_runtest_logreport(self, report: TestReport) -> None:
+        """ Keep the memory figures of a test.
+
+        Args:
+            report: report of one test phase.
+        """
+        if report.when != 'teardown':
+            return
+        for name, value in report.user_properties:
+            if name == PROPERTY:
+                self.reports[report.nodeid] = value
+
+    def pytest_terminal_summary(self, terminalreporter: TerminalReporter) -> None:
+        """ Print the tests with the highest JavaScript heap peak.
+
+        Args:
+            terminalreporter: pytest terminal reporter.
+        """
+        if not self.reports:
+            return
+        terminalreporter.section('peak browser memory per test')
+        rows = sorted(self.reports.items(), key=lambda row: row[1]['peak_mb'], reverse=True)[:self.top]
+        for nodeid, figures in rows:
+            terminalreporter.write_line(
+                f"{figures['peak_mb']:8.1f} MB peak  {figures['retained_mb']:8.1f} MB retained  "
+                f"{figures['start_mb']:8.1f} MB start  {int(figures['peak_nodes']):7d} nodes  {nodeid}")
+
+
+def pytest_configure(config: Config) -> None:
+    """ Print the memory report when memory is monitored.
+
+    Args:
+        config: pytest config object.
+    """
+    if _enabled(config):
+        config.pluginmanager.register(MemoryRecorder(config.getoption('memory_top')), 'memory-recorder')
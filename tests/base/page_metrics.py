@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+""" Pytest plugin recording the load performance of the pages opened by the page objects
+
+Each run is written to its own file, and the median load time of every page
+can be checked against a stored baseline to warn about or fail on regressions.
+"""
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List
+
+import pytest
+from _pytest.config import Config
+from _pytest.config.argparsing import Parser
+from _pytest.fixtures import SubRequest
+from _pytest.reports import TestReport
+from _pytest.terminal import TerminalReporter
+from lib.utils.common.page_metrics import (Regression, find_regressions, get_page_metrics_log, load_baseline,
+                                           save_baseline, summarize)
+
+logger = logging.getLogger(__name__)
+
+# user_properties key of the page metrics of a test
+PROPERTY = 'page_metrics'
+
+
+def pytest_addoption(parser: Parser) -> None:
+    """ Add options for page metrics.
+
+    Args:
+        parser: pytest command line parser.
+    """
+    group = parser.getgroup('page-metrics')
+    group.addoption('--page-metrics', action='store_true', default=False,
+                    help='Record Navigation Timing, paint and resource metrics of every page object navigation.')
+    group.addoption('--page-metrics-dir', default='page_metrics',
+                    help='Directory of the page metrics file of each run (default=page_metrics).')
+    group.addoption('--perf-baseline', default=None, metavar='FILE',
+                    help='Compare the median load time of each page with this baseline (implies --page-metrics).')
+    group.addoption('--perf-tolerance', type=float, default=0.2,
+                    help='Accepted slowdown against the baseline, 0.2 is 20%% (default=0.2).')
+    group.addoption('--perf-regression', default='warn', choices=('warn', 'fail'),
+                    help='Warn about or fail the run on load time regressions (default=warn).')
+    group.addoption('--perf-update-baseline', action='store_true', default=False,
+                    help='Store the medians of this run in the --perf-baseline file.')
+
+
+def _is_worker(config: Config) -> bool:
+    """ Whether this process is a pytest-xdist worker. """
+    return hasattr(config, 'workerinput')
+
+
+@pytest.fixture(autouse=True, name='page_metrics')  # type: ignore
+def page_metrics(request: SubRequest) -> None:
+    """ function scope Fixture attaching the page loads of the test to its report.
+
+    Args:
+        request: a sub request for handling getting a fixture from a test function/fixture.
+    Yields:
+        None
+    """
+    yield
+
+    log = get_page_metrics_log()
+    if not log.enabled:
+        return
+    records = [metrics._asdict() for metrics in log.take()]
+    if records:
+        request.node.user_properties.append((PROPERTY, records))
+
+
+class PageMetricsRecorder:
+    """ Plugin writing the page metrics of the run and checking them against the baseline.
+    Registered on the controller only: pytest-xdist replays the reports of the workers there.
+    """
+
+    def __init__(self, config: Config) -> None:
+        self.directory = config.getoption('page_metrics_dir')
+        self.baseline = config.getoption('perf_baseline')
+        self.tolerance = config.getoption('perf_tolerance')
+        self.fail = config.getoption('perf_regression') == 'fail'
+        self.update = config.getoption('perf_update_baseline')
+        self.records: List[Dict[str, Any]] = []
+        self.summary: Dict[str, Dict[str, Any]] = {}
+        self.regressions: List[Regression] = []
+
+    def pytest_runtest_logreport(self, report: TestReport) -> None:
+        """ Keep the page loads of a test.
+
+        Args:
+            report: report of one test phase.
+        """
+        if report.when != 'teardown':
+            return
+        for name, value in report.user_properties:
+            if name == PROPERTY:
+                self.records += [dict(record, test=report.nodeid) for record in value]
+
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        """ Write the run file, then compare with and update the baseline.
+
+        Args:
+            session: pytest session.
+        """
+        if not self.records:
+            return
+        self.summary = summarize(self.records)
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f'run-{time.strftime("%Y%m%d-%H%M%S")}.json')
+        with open(path, 'w', encoding='utf8') as f:
+            json.dump({'summary': self.summary, 'records': self.records}, f, indent=2)
+        logger.info("Page metrics of %s load(s) written to %s", len(self.records), path)
+        if not self.baseline:
+            return
+        self.regressions = find_regressions(self.summary, load_baseline(self.baseline), self.tolerance)
+        for regression in self.regressions:
+            logger.warning("Load time of %s regressed: %.1f ms, baseline %.1f ms", regression.page,
+                           regression.median_ms, regression.baseline_ms)
+        if self.regressions and self.fail:
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+        if self.update:
+            save_baseline(self.baseline, self.summary)
+            logger.info("Page metrics baseline %s updated.", self.baseline)
+
+    def pytest_terminal_summary(self, terminalreporter: TerminalReporter) -> None:
+        """ Print the median timings of each page and the regressions.
+
+        Args:
+            terminalreporter: pytest terminal reporter.
+        """
+        if not self.summary:
+            return
+        terminalreporter.section('page load metrics (median ms)')
+        for page, figures in self.summary.items():
+            terminalreporter.write_line(
+                f"{figures.get('load_time_ms', 0):8.1f} load  {figures.get('ttfb_ms', 0):8.1f} ttfb  "
+                f"{figures.get('first_contentful_paint_ms', 0):8.1f} fcp  "
+                f"{figures.get('largest_contentful_paint_ms', 0):8.1f} lcp  {int(figures['loads']):4d} loads  {page}")
+        for regression in self.regressions:
+            terminalreporter.write_line(
+                f"{'FAILED' if self.fail else 'WARNING'}: {regression.page} loads in {regression.median_ms:.1f} ms, "
+                f"over {regression.limit_ms:.1f} ms (baseline {regression.baseline_ms:.1f} ms)",
+                red=self.fail, yellow=not self.fail)
+
+
+def pytest_configure(config: Config) -> None:
+    """ Enable the page metrics log when requested.
+
+    Args:
+        config: pytest config object.
+    """
+    if not config.getoption('page_metrics') and not config.getoption('perf_baseline'):
+        return
+    get_page_metrics_log().enabled = True
+    if not _is_worker(config):
+        config.pluginmanager.register(PageMetricsRecorder(config), 'page-metrics-recorder')
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+""" Pytest plugin pointing the POM base URL to a site, a recording proxy or a replay server """
+import logging
+
+from _pytest.config import Config
+from _pytest.config.argparsing import Parser
+from lib.base.base import Base
+from lib.tools.replay import ReplayServer
+
+logger = logging.getLogger(__name__)
+
+SERVER_ATTR = '_replay_server'
+
+
+def pytest_addoption(parser: Parser) -> None:
+    """ Add options for the POM base URL and record/replay.
+
+    Args:
+        parser: pytest command line parser.
+    """
+    group = parser.getgroup('replay')
+    group.addoption('--base-url', default=None,
+                    help='Site root opened by the page objects (default=$POM_BASE_URL or Google).')
+    group.addoption('--replay', default=None, metavar='ARCHIVE',
+                    help='Serve the page objects from this recorded archive instead of the live site.')
+    group.addoption('--record', action='store_true', default=False,
+                    help='With --replay, record missing responses from --base-url into the archive.')
+
+
+def pytest_configure(config: Config) -> None:
+    """ Start the replay server and set the base URL.
+
+    Args:
+        config: pytest config object.
+    """
+    base_url = config.getoption('base_url')
+    archive = config.getoption('replay')
+    if archive:
+        origin = (base_url or Base.base_url) if config.getoption('record') else None
+        server = ReplayServer(archive, origin).start()
+        setattr(config, SERVER_ATTR, server)
+        base_url = server.url + '/'
+    if base_url:
+        Base.base_url = base_url
+        logger.info("Page objects open %s", base_url)
+
+
+def pytest_unconfigure(config: Config) -> None:
+    """ Stop the replay server and report requests missing from the archive.
+
+    Args:
+        config: pytest config object.
+    """
+    server = getattr(config, SERVER_ATTR, None)
+    if server is None:
+        return
+    server.stop()
+    if server.misses:
+        logger.warning("%s request(s) were not in the archive %s, e.g. %s", len(server.misses),
+                       server.archive.path, server.misses[:5])
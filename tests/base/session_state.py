@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+""" Pytest plugin restoring cached browser state instead of driving setup flows again
+
+A test asks for the state a setup flow reaches, by key and declared version:
+the flow runs once, later tests and later runs restore its snapshot.
+"""
+import logging
+import os
+from typing import Any, Callable
+
+import pytest
+from _pytest.config import Config
+from _pytest.config.argparsing import Parser
+from _pytest.fixtures import SubRequest
+from selenium.webdriver import Remote
+from lib.utils.common.session_state import SessionState, SessionStateCache
+
+logger = logging.getLogger(__name__)
+
+Prepare = Callable[[str, str, Callable[[Remote], Any]], SessionState]
+
+
+def pytest_addoption(parser: Parser) -> None:
+    """ Add options for the session state cache.
+
+    Args:
+        parser: pytest command line parser.
+    """
+    group = parser.getgroup('session-state')
+    group.addoption('--session-state-dir', default='.session_state',
+                    help='Directory of the cached session states, they hold cookies (default=.session_state).')
+    group.addoption('--session-state-refresh', action='store_true', default=False,
+                    help='Ignore the cached session states of earlier runs and run the setup flows again.')
+
+
+@pytest.fixture(scope='session', name='session_state_cache')  # type: ignore
+def fixture_session_state_cache(pytestconfig: Config) -> SessionStateCache:
+    """ worker scope Fixture of the session state cache, shared through the directory by the xdist workers.
+
+    Args:
+        pytestconfig: pytest config object.
+    Returns:
+        SessionStateCache: cache of this worker.
+    """
+    directory = os.path.abspath(pytestconfig.getoption('session_state_dir'))
+    return SessionStateCache(directory, refresh=pytestconfig.getoption('session_state_refresh'))
+
+
+@pytest.fixture(name='session_state')  # type: ignore
+def session_state(request: SubRequest, session_state_cache: SessionStateCache) -> Prepare:
+    """ function scope Fixture putting the driver of the test class in the state of a setup flow.
+
+        state = session_state('signed_in', '2', lambda driver: Login(driver).sign_in(USER))
+
+    Args:
+        request: a sub request for handling getting a fixture from a test function/fixture.
+        session_state_cache: cache of the snapshots.
+    Returns:
+        Prepare: called with the key, the declared version and the setup flow, returns the loaded snapshot.
+    """
+
+    def prepare(key: str, version: str, setup: Callable[[Remote], Any]) -> SessionState:
+        driver = getattr(request.cls, 'driver', None) if request.cls else None
+        if driver is None:
+            raise pytest.UsageError(f'session_state needs the driver of driver_fixture in {request.node.nodeid}.')
+        return session_state_cache.prepare(driver, key, version, setup)
+
+    return prepare
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+""" Pytest plugin reporting the slowest WebDriver commands issued by Element """
+import json
+import logging
+import os
+from typing import Any, Dict, Iterator, Optional
+
+import pytest
+from _pytest.config import Config
+from _pytest.config.argparsing import Parser
+from _pytest.nodes import Item
+from _pytest.terminal import TerminalReporter
+from lib.utils.common.web_element.trace import get_tracer
+
+logger = logging.getLogger(__name__)
+
+
+def pytest_addoption(parser: Parser) -> None:
+    """ Add options for command tracing.
+
+    Args:
+        parser: pytest command line parser.
+    """
+    group = parser.getgroup('trace')
+    group.addoption('--trace-commands', action='store_true', default=False,
+                    help='Record the latency of every WebDriver command issued by Element.')
+    group.addoption('--trace-file', default=None,
+                    help='Write the JSON trace to this file (implies --trace-commands).')
+    group.addoption('--trace-top', type=int, default=10,
+                    help='Number of slowest commands printed at session end (default=10).')
+
+
+def _trace_file(config: Config) -> Optional[str]:
+    """ Trace file of this process, suffixed with the xdist worker id.
+
+    Args:
+        config: pytest config object.
+    Returns:
+        Optional[str]: path of the JSON trace, None when not requested.
+    """
+    path = config.getoption('trace_file')
+    worker = os.environ.get('PYTEST_XDIST_WORKER')
+    if path and worker:
+        root, ext = os.path.splitext(path)
+        path = f'{root}.{worker}{ext}'
+    return path
+
+
+def pytest_configure(config: Config) -> None:
+    """ Enable the tracer when requested.
+
+    Args:
+        config: pytest config object.
+    """
+    if config.getoption('trace_commands') or config.getoption('trace_file'):
+        get_tracer().enabled = True
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item: Item) -> Iterator[None]:
+    """ Attach the node id of the running test to new records.
+
+    Args:
+        item: test item being run.
+    """
+    tracer = get_tracer()
+    tracer.current_test = item.nodeid
+    yield
+    tracer.current_test = None
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    """ Write the JSON trace.
+
+    Args:
+        session: pytest session.
+    """
+    tracer = get_tracer()
+    path = _trace_file(session.config)
+    if not tracer.enabled or not path:
+        return
+    trace: Dict[str, Any] = tracer.summary(session.config.getoption('trace_top'))
+    trace['records'] = [record._asdict() for record in tracer.records]
+    with open(path, 'w', encoding='utf8') as f:
+        json.dump(trace, f, indent=2)
+    logger.info("Command trace written to %s.", path)
+
+
+def pytest_terminal_summary(terminalreporter: TerminalReporter) -> None:
+    """ Print the slowest commands, tests and page object attributes.
+
+    Args:
+        terminalreporter: pytest terminal reporter.
+    """
+    tracer = get_tracer()
+    if not tracer.enabled or not tracer.records:
+        return
+    top = terminalreporter.config.getoption('trace_top')
+    summary = tracer.summary(top)
+    terminalreporter.section('slowest webdriver commands')
+    for record in summary['slowest']:
+        terminalreporter.write_line(
+            f"{record['wall_ms']:10.1f} ms  {record['polls']:3d} polls  {record['command']:<18} "
+            f"{record['page'] or '-'}.{record['attr'] or '-'} ({record['search_by']}={record['locator']})  "
+            f"{record['test'] or '-'}")
+    for title, key in (('test', 'per_test'), ('page object', 'per_page'), ('page object attribute', 'per_attribute')):
+        terminalreporter.section(f'webdriver time per {title}', sep='-')
+        rows = sorted(summary[key].items(), key=lambda row: row[1]['total_ms'], reverse=True)[:top]
+        for name, stats in rows:
+            terminalreporter.write_line(
+                f"{stats['total_ms']:10.1f} ms  {stats['count']:4d} commands  {stats['polls']:4d} polls  {name}")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+""" Fake webdriver for the tests of the driver pool and of the tools borrowing from it. """
+
+from selenium.common.exceptions import WebDriverException
+
+
+class _SwitchTo:
+    """ switch_to of PoolDriver. """
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        """ Switch to a tab. """
+        self.driver.current_window_handle = handle
+
+    def new_window(self, kind):
+        """ Open a tab and switch to it. """
+        del kind
+        self.driver.tabs += 1
+        handle = f'tab-{self.driver.tabs}'
+        self.driver.window_handles.append(handle)
+        self.driver.tab_scripts[handle] = []
+        self.driver.current_window_handle = handle
+
+
+class PoolDriver:
+    """ Driver with cookies, storage and history of several origins, answering DevTools commands when cdp is set.
+    New document scripts are registered per tab, like the DevTools state of Chrome.
+    """
+    # pylint: disable=too-many-instance-attributes
+    capabilities = {'goog:chromeOptions': {'debuggerAddress': '127.0.0.1:9222'}}
+
+    def __init__(self, cdp=True):
+        self.cdp = cdp
+        self.tabs = 1
+        self.window_handles = ['tab-1']
+        self.current_window_handle = 'tab-1'
+        self.tab_scripts = {'tab-1': []}
+        self.switch_to = _SwitchTo(self)
+        self.current_url = 'https://shop.example/cart'
+        self.history = ['about:blank', 'https://login.example/', 'https://shop.example/cart']
+        self.cookies = {'shop.example': 'sid', '.ads.example': 'ad'}
+        self.storage = {'https://shop.example', 'https://login.example'}
+        self.session_storage = {'https://shop.example', 'https://login.example'}
+        self.quits = 0
+
+    def execute_script(self, script, *args):
+        """ Answer the health check, clear the storage of the current page. """
+        del args
+        if 'localStorage.clear' in script:
+            self.storage.discard('https://shop.example')
+            self.session_storage.discard('https://shop.example')
+        return 1
+
+    def delete_all_cookies(self):
+        """ Drop the cookies of the current page. """
+        self.cookies.pop('shop.example', None)
+
+    def get(self, url):
+        """ Load a URL. """
+        self.current_url = url
+        self.history.append(url)
+
+    def close(self):
+        """ Close the current tab. """
+        self.window_handles.remove(self.current_window_handle)
+        del self.tab_scripts[self.current_window_handle]
+
+    def quit(self):
+        """ Count quits. """
+        self.quits += 1
+
+    def execute_cdp_cmd(self, cmd, params):
+        """ Answer the history, cookie and storage commands. """
+        if not self.cdp:
+            raise WebDriverException('unknown command: ' + cmd)
+        if cmd == 'Page.getNavigationHistory':
+            return {'entries': [{'url': url} for url in self.history]}
+        if cmd == 'Page.resetNavigationHistory':
+            self.history = [self.current_url]
+        if cmd == 'Page.addScriptToEvaluateOnNewDocument':
+            self.tab_scripts[self.current_window_handle].append(params['source'])
+        if cmd == 'Target.getTargetInfo':
+            return {'targetInfo': {'targetId': self.current_window_handle}}
+        if cmd == 'Network.getAllCookies':
+            return {'cookies': [{'domain': domain, 'name': name} for domain, name in self.cookies.items()]}
+        if cmd == 'Network.clearBrowserCookies':
+            self.cookies = {}
+        if cmd == 'Storage.clearDataForOrigin':
+            self.storage.discard(params['origin'])
+        if cmd == 'DOMStorage.clear' and not params['storageId']['isLocalStorage']:
+            self.session_storage.discard(params['storageId']['securityOrigin'])
+        return {}
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+""" This is Util tests for failure artifacts. """
+
+import base64
+import logging
+import os
+
+import pytest
+
+from lib.utils.common.artifacts import ArtifactWriter
+
+logger = logging.getLogger(__name__)
+
+
+class ArtifactDriver:
+    """ Driver answering the artifact reads. """
+    current_url = 'https://shop.example/cart'
+    page_source = '<html><body>cart</body></html>'
+
+    @staticmethod
+    def get_screenshot_as_base64():
+        """ A tiny screenshot. """
+        return base64.b64encode(b'png' * 100).decode('ascii')
+
+    @staticmethod
+    def get_log(kind):
+        """ One console entry. """
+        return [{'level': 'SEVERE', 'message': f'{kind} error'}]
+
+
+class TestArtifacts:
+    """
+    Unit Test suite
+    """
+
+    @pytest.mark.tc_artifacts
+    def test_prune(self, tmp_path):
+        """ Unit test for lazy directory creation and pruning of finished captures only. """
+        logger.info("Start test for failure artifacts.")
+        root = tmp_path / 'artifacts'
+        writer = ArtifactWriter(str(root), max_captures=2, max_bytes=0)
+        assert not root.exists()
+        try:
+            first = writer.capture(ArtifactDriver(), 'tests/test_cart.py::test_add').result()
+            # A worker directory and a capture being written share the root.
+            (root / 'gw0').mkdir()
+            (root / 'gw0' / 'other.bin').write_bytes(b'0' * 10)
+            (root / 'partial').mkdir()
+            os.utime(first, (1, 1))
+            second = writer.capture(ArtifactDriver(), 'test_remove').result()
+            third = writer.capture(ArtifactDriver(), 'test_pay').result()
+        finally:
+            writer.close()
+        assert sorted(os.listdir(root)) == sorted(['gw0', 'partial', os.path.basename(second),
+                                                  os.path.basename(third)])
+        assert sorted(os.listdir(third)) == ['browser_log.jsonl.gz', 'dom.html.gz', 'meta.json', 'screenshot.png']
+
+        # The size budget always keeps the newest capture.
+        writer = ArtifactWriter(str(root), max_captures=0, max_bytes=1)
+        try:
+            os.utime(second, (1, 1))
+            writer.capture(ArtifactDriver(), 'test_refund').result()
+        finally:
+            writer.close()
+        assert len([d for d in os.listdir(root) if d.endswith('test_refund')]) == 1 and len(os.listdir(root)) == 3
+        logger.info("Completed test for failure artifacts.")
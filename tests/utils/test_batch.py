@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+""" This is Util tests for the batch runner. """
+
+import io
+import json
+import logging
+import threading
+
+import pytest
+
+from lib.base.driver_pool import DriverPool
+from lib.tools.batch import BatchRunner, read_terms
+from tests.utils.pool_driver import PoolDriver
+
+logger = logging.getLogger(__name__)
+
+
+def failing_factory():
+    """ Driver factory of a machine without browser. """
+    raise OSError('no browser')
+
+
+class TestBatch:
+    """
+    Unit Test suite
+    """
+
+    @pytest.mark.tc_batch
+    def test_streamed_input(self):
+        """ Unit test for items running while the input is still read, and items left by failed workers. """
+        logger.info("Start test for batch runner.")
+        first_done = threading.Event()
+        ran = []
+
+        def task(driver, term):
+            ran.append((driver, term))
+            if term == 'boom':
+                raise ValueError('broken term')
+            first_done.set()
+
+        def terms():
+            yield from read_terms(io.StringIO('first\n\n  boom \n'))
+            # Like stdin: more input only comes once the first item is done.
+            assert first_done.wait(5)
+            yield 'last'
+
+        out = io.StringIO()
+        pool = DriverPool(PoolDriver, size=2)
+        try:
+            summary = BatchRunner(pool, task, 2, out).run(terms())
+        finally:
+            pool.close()
+        results = [json.loads(line) for line in out.getvalue().splitlines()][:-1]
+        assert sorted((r['index'], r['search_text'], r['ok']) for r in results) == \
+            [(0, 'first', True), (1, 'boom', False), (2, 'last', True)]
+        assert summary['total'] == 3 and summary['succeeded'] == 2 and summary['failed'] == 1
+        # Reset through DevTools between items, in the tab the driver was launched with.
+        assert all(not driver.cookies and driver.window_handles == ['tab-1'] for driver, _ in ran)
+
+        out = io.StringIO()
+        pool = DriverPool(failing_factory, size=1)
+        summary = BatchRunner(pool, task, 1, out).run(str(n) for n in range(5))
+        errors = [json.loads(line)['error'] for line in out.getvalue().splitlines()[:-1]]
+        assert errors[:3] == ['Failed to launch webdriver: no browser'] * 3
+        assert errors[3:] == ['No live worker left to run this item.'] * 2 and summary['failed'] == 5
+        logger.info("Completed test for batch runner.")
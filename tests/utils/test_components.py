@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+""" This is Util tests for lazy Component lists. """
+
+import logging
+
+import pytest
+
+from lib.utils.common.web_element.components import ComponentList
+from lib.utils.common.web_element.scripts import ATTACHED_JS, SLICE_JS
+
+logger = logging.getLogger(__name__)
+
+
+class ListDriver:
+    """ Driver answering the slice and attached scripts from a list of matches. """
+
+    def __init__(self, matches):
+        self.matches = list(matches)
+        self.current_url = 'https://shop.example/results'
+        self.scripts = 0
+
+    def execute_script(self, script, *args):
+        """ Answer SLICE_JS and ATTACHED_JS. """
+        self.scripts += 1
+        if script == SLICE_JS:
+            start, stop = args[3], args[4]
+            return {'url': self.current_url, 'count': len(self.matches), 'elements': self.matches[start:stop]}
+        if script == ATTACHED_JS:
+            return [self.current_url, all(elem in self.matches for elem in args[0])]
+        return None
+
+
+class Row:
+    """ Component of one match. """
+
+    def __init__(self, driver, elem):
+        self.driver = driver
+        self.elem = elem
+
+
+class TestComponents:
+    """
+    Unit Test suite
+    """
+
+    @pytest.mark.tc_components
+    def test_is_current_and_shrinking_matches(self):
+        """ Unit test for is_current before any fetch, after a URL change, and matches shrinking. """
+        logger.info("Start test for component lists.")
+        driver = ListDriver(['row-0', 'row-1', 'row-2', 'row-3'])
+        rows = ComponentList(driver, driver, ('css selector', '.row'), Row)
+        assert rows.is_current() and not driver.scripts
+        assert len(rows) == 4 and not rows.fetched()
+        assert rows.is_current()
+        driver.current_url = 'https://shop.example/results?page=2'
+        assert not rows.is_current()
+
+        driver.current_url = 'https://shop.example/results'
+        assert rows[0].elem == 'row-0' and rows.is_current()
+        # Two rows removed: the count follows, and rows past the end are out of range.
+        driver.matches = ['row-0', 'row-1']
+        assert [row.elem for row in rows] == ['row-0', 'row-1'] and len(rows) == 2
+        with pytest.raises(IndexError):
+            rows[3]  # pylint: disable=pointless-statement
+
+        driver.matches = ['row-0', 'row-1', 'row-2', 'row-3']
+        rows = ComponentList(driver, driver, ('css selector', '.row'), Row)
+        assert len(rows) == 4
+        driver.matches = ['row-0']
+        with pytest.raises(IndexError):
+            rows[1:4]  # pylint: disable=pointless-statement
+        logger.info("Completed test for component lists.")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+""" This is Util tests for the daemon protocol. """
+
+import logging
+import tempfile
+import threading
+import time
+
+import pytest
+
+from lib.base.driver_pool import DriverPool
+from lib.tools.daemon import DaemonUnavailable, _DaemonServer, send_job
+from tests.utils.pool_driver import PoolDriver
+
+logger = logging.getLogger(__name__)
+
+
+class TestDaemon:
+    """
+    Unit Test suite
+    """
+
+    @pytest.mark.tc_daemon
+    def test_job_protocol(self):
+        """ Unit test for ping, jobs, job errors, unknown jobs and timeouts over the Unix socket. """
+        logger.info("Start test for daemon protocol.")
+        searched = []
+        jobs = {
+            'search': lambda driver, params: searched.append((driver, params['search_text'])),
+            'broken': lambda driver, params: int('nan'),
+            'slow': lambda driver, params: time.sleep(params['sleep']),
+        }
+        pool = DriverPool(PoolDriver, size=2)
+        with tempfile.TemporaryDirectory() as directory:
+            path = f'{directory}/daemon.sock'
+            with pytest.raises(DaemonUnavailable):
+                send_job('ping', {}, path)
+            server = _DaemonServer(path, pool, jobs)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            try:
+                assert send_job('ping', {}, path)['ok']
+                assert send_job('search', {'search_text': 'daemon'}, path)['ok']
+                assert isinstance(searched[0][0], PoolDriver) and searched[0][1] == 'daemon'
+                assert not searched[0][0].cookies and searched[0][0].history == ['about:blank']
+                assert send_job('broken', {}, path)['error'].startswith('ValueError: ')
+                assert send_job('missing', {}, path)['error'] == 'Unknown job: missing'
+                with pytest.raises(TimeoutError, match='did not answer slow within 0.2 sec'):
+                    send_job('slow', {'sleep': 1}, path, timeout=0.2)
+            finally:
+                server.shutdown()
+                server.server_close()
+                pool.close()
+        logger.info("Completed test for daemon protocol.")
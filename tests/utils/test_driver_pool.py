@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+""" This is Util tests for driver pool. """
+
+import logging
+import pytest
+
+from lib.base.driver_pool import DriverPool
+from lib.utils.common.network import NetworkInterceptor
+from lib.utils.common.web_element.wait import READY_HOOK_JS, install_ready_hook
+from tests.utils.pool_driver import PoolDriver
+
+logger = logging.getLogger(__name__)
+
+
+class TestDriverPool:
+    """
+    Unit Test suite
+    """
+
+    @pytest.mark.tc_driver_pool
+    @pytest.mark.parametrize('cdp', [True, False])
+    def test_driver_reused_and_reset(self, cdp):
+        """ Unit test for reusing and resetting pooled driver. """
+        logger.info("Start test for driver pool.")
+        pool = DriverPool(lambda: PoolDriver(cdp), size=1, max_uses=2)
+        try:
+            with pool.borrow() as driver:
+                first = driver
+            assert driver.current_url == 'about:blank'
+            if cdp:
+                # Every domain, origin and the history are cleared, in the same tab.
+                assert not driver.cookies and not driver.storage and not driver.session_storage
+                assert driver.window_handles == [driver.current_window_handle] == ['tab-1']
+                assert driver.history == ['about:blank']
+            else:
+                assert driver.cookies == {'.ads.example': 'ad'} and driver.storage == {'https://login.example'}
+            with pool.borrow() as driver:
+                assert driver is first
+            with pool.borrow() as driver:
+                assert driver is not first and first.quits == 1
+        finally:
+            pool.close()
+        logger.info("Completed test for driver pool.")
+
+    @pytest.mark.tc_driver_pool
+    def test_devtools_state_kept(self):
+        """ Unit test for network interception and the readiness hook still attached after a reset. """
+        # pylint: disable=protected-access
+        logger.info("Start test for driver pool DevTools state.")
+        pool = DriverPool(lambda: PoolDriver(True), size=1)
+        try:
+            with pool.borrow() as driver:
+                # Attached at launch, to the tab the driver controls.
+                target = NetworkInterceptor._websocket_url(driver)
+                assert install_ready_hook(driver)
+                driver.switch_to.new_window('tab')
+            with pool.borrow() as driver:
+                assert NetworkInterceptor._websocket_url(driver) == target
+                assert driver.tab_scripts[driver.current_window_handle] == [READY_HOOK_JS]
+        finally:
+            pool.close()
+        logger.info("Completed test for driver pool DevTools state.")
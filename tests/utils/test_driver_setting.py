@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+""" This is Util tests for Chrome launch profiles. """
+
+import logging
+
+import pytest
+
+from commandline_tool import PROFILE_NAMES
+from lib.utils.common.driver_setting import CHROME_BINARY_ENV, PROFILES, LaunchProfile, build_chrome_options
+
+logger = logging.getLogger(__name__)
+
+
+class TestDriverSetting:
+    """
+    Unit Test suite
+    """
+
+    @pytest.mark.tc_driver_setting
+    def test_build_chrome_options(self, monkeypatch):
+        """ Unit test for the Chrome options of each profile, without launching Chrome. """
+        logger.info("Start test for Chrome launch profiles.")
+        monkeypatch.delenv(CHROME_BINARY_ENV, raising=False)
+        options = build_chrome_options()
+        assert options.page_load_strategy == 'normal' and not options.binary_location
+        assert '--headless' in options.arguments and '--disable-application-cache' in options.arguments
+        assert not any(argument.startswith('--window-size') for argument in options.arguments)
+        assert '--headless' not in build_chrome_options(headless=False).arguments
+
+        fast = build_chrome_options(profile='fast')
+        assert fast.page_load_strategy == 'eager' and '--window-size=1366,768' in fast.arguments
+        assert '--disable-remote-fonts' in fast.arguments and '--disable-application-cache' not in fast.arguments
+        assert fast.experimental_options['prefs'] == {'profile.managed_default_content_settings.images': 2}
+
+        # The binary is resolved when the options are built, and a profile binary comes first.
+        monkeypatch.setenv(CHROME_BINARY_ENV, '/opt/chrome/chrome')
+        assert build_chrome_options().binary_location == '/opt/chrome/chrome'
+        own = LaunchProfile('own', binary_location='/usr/bin/chromium')
+        assert build_chrome_options(profile=own).binary_location == '/usr/bin/chromium'
+
+        with pytest.raises(ValueError, match='Unknown launch profile: slow'):
+            build_chrome_options(profile='slow')
+        assert PROFILE_NAMES == tuple(sorted(PROFILES))
+        logger.info("Completed test for Chrome launch profiles.")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+""" This is Util tests for duration based test ordering. """
+
+import logging
+
+import pytest
+
+from tests.base.durations import order_longest_first
+
+logger = logging.getLogger(__name__)
+
+
+class DurationItem:
+    """ Collected test item, only its node id is used. """
+
+    def __init__(self, nodeid):
+        self.nodeid = nodeid
+
+    def __repr__(self):
+        return self.nodeid
+
+
+class TestDurations:
+    """
+    Unit Test suite
+    """
+
+    @pytest.mark.tc_durations
+    def test_order_longest_first(self):
+        """ Unit test for modules and classes ordered by summed duration, keeping their tests together. """
+        logger.info("Start test for duration ordering.")
+        nodeids = [
+            'tests/test_home.py::TestHome::test_open',
+            'tests/test_home.py::TestHome::test_search[chrome]',
+            'tests/test_home.py::TestHome::test_search[firefox]',
+            'tests/test_home.py::TestLinks::test_about',
+            'tests/test_home.py::test_logo',
+            'tests/test_results.py::TestResults::test_paging',
+            'tests/test_results.py::TestResults::test_new',
+        ]
+        durations = {
+            'tests/test_home.py::TestHome::test_open': 1.0,
+            'tests/test_home.py::TestHome::test_search[chrome]': 2.0,
+            'tests/test_home.py::TestHome::test_search[firefox]': 2.0,
+            'tests/test_home.py::TestLinks::test_about': 9.0,
+            'tests/test_home.py::test_logo': 0.5,
+            'tests/test_results.py::TestResults::test_paging': 30.0,
+        }
+        items = [DurationItem(nodeid) for nodeid in nodeids]
+        order_longest_first(items, durations)
+        # test_new counts as the median duration, 2 sec.
+        assert [item.nodeid for item in items] == [
+            'tests/test_results.py::TestResults::test_paging',
+            'tests/test_results.py::TestResults::test_new',
+            'tests/test_home.py::TestLinks::test_about',
+            'tests/test_home.py::TestHome::test_open',
+            'tests/test_home.py::TestHome::test_search[chrome]',
+            'tests/test_home.py::TestHome::test_search[firefox]',
+            'tests/test_home.py::test_logo',
+        ]
+
+        items = [DurationItem(nodeid) for nodeid in nodeids]
+        order_longest_first(items, {})
+        assert [item.nodeid for item in items] == nodeids
+        logger.info("Completed test for duration ordering.")
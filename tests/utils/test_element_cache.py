@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+""" This is Util tests for the element cache against a fake WebDriver. """
+
+import logging
+
+import pytest
+from selenium.webdriver import ChromeOptions, Remote
+
+from benchmarks.fake_webdriver import FakeWebDriver
+from lib.base.base import Base
+from lib.pom.google.google import Google
+from lib.utils.common.web_element.decorator import elements, snapshot_keys
+from lib.utils.common.web_element.element import get_element_cache
+
+logger = logging.getLogger(__name__)
+
+
+@elements({'title': 'title', 'row': 'row-{name}'})
+class Rows(Base):
+    """ Page with a Test ID formatted by test_id_param. """
+    test_id_param = None
+
+
+class TestElementCache:
+    """
+    Unit Test suite
+    """
+
+    @pytest.mark.tc_element_cache
+    def test_navigation_outside_element(self):
+        """ Unit test for cached elements after navigating with the driver, and clicks that do not navigate. """
+        logger.info("Start test for element cache.")
+        server = FakeWebDriver().start()
+        driver = Remote(command_executor=server.url, options=ChromeOptions())
+        try:
+            home = Google(driver).home
+            home.navigate()
+            cache = get_element_cache(driver)
+            first = home.search_box_input.get()
+            assert home.search_box_input.get() == first and cache.stats()['hits'] == 1
+
+            # e.g. driver.back() or a redirect: the cached element is stale and resolved again.
+            driver.get(home.url('other'))
+            second = home.search_box_input.get()
+            assert second != first and cache.stats()['stale'] == 1
+
+            home.google_search_submit.click()
+            commands = server.commands
+            home.google_search_submit.click()
+            # Only the commands of the click itself: no page URL is read around it.
+            assert server.commands - commands == 2
+            assert cache.stats()['size'] == 2 and home.search_box_input.get() == second
+        finally:
+            driver.quit()
+            server.stop()
+        logger.info("Completed test for element cache.")
+
+    @pytest.mark.tc_page_snapshot
+    def test_snapshot_keys(self):
+        """ Unit test for undeclared and parameterized keys refused before any WebDriver call. """
+        logger.info("Start test for snapshot keys.")
+        rows = Rows(None)
+        with pytest.raises(ValueError, match="no Test ID 'missing'"):
+            rows.wait_for_elements(['title', 'missing'])
+        with pytest.raises(ValueError, match="Test ID 'row' of Rows has format fields"):
+            rows.wait_until_ready(['row'])
+        rows.test_id_param = {'name': 'first'}
+        assert snapshot_keys(rows, ['title', 'row']) == ['title', 'row']
+        logger.info("Completed test for snapshot keys.")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+""" This is Util tests for load generation. """
+
+import logging
+import urllib.request
+
+import pytest
+from selenium.webdriver import ChromeOptions, Remote
+
+from benchmarks.fake_webdriver import FakeWebDriver
+from lib.base.base import Base
+from lib.pom.google.google import Google
+from lib.tools.load import ITERATION, SCHEDULED, LoadConfig, StandInSite, StepStats, percentile, run_load
+from lib.utils.common.web_element.macro import ActionMacro
+
+logger = logging.getLogger(__name__)
+
+
+def search_scenario(session):
+    """ Open the home page and search, every fourth iteration also fails a step. """
+    home = Google(session.driver).home
+    with session.step('open'):
+        home.open(wait_time=5)
+    with session.step('search'):
+        ActionMacro(session.driver).type(home.search_box_input, 'load').submit(home.google_search_submit).run()
+    if session.iteration % 4 == 3:
+        with session.step('broken'):
+            raise ValueError('broken step')
+
+
+class TestLoad:
+    """
+    Unit Test suite
+    """
+
+    @pytest.mark.tc_load
+    def test_paced_load_report(self):
+        """ Unit test for a paced POM load on two sessions against the stand-in site. """
+        logger.info("Start test for load generation.")
+        assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.0 and percentile([1.0, 2.0, 3.0, 4.0], 99) == 4.0
+        server = FakeWebDriver().start()
+        site = StandInSite().start()
+        base_url, Base.base_url = Base.base_url, site.url
+        try:
+            with urllib.request.urlopen(site.url + 'search?q=load', timeout=10) as response:
+                assert b'load result 9' in response.read()
+            report = run_load(lambda: Remote(command_executor=server.url, options=ChromeOptions()), search_scenario,
+                              LoadConfig(sessions=2, ramp_up=0.2, rate=20, duration=1))
+        finally:
+            Base.base_url = base_url
+            site.stop()
+            server.stop()
+
+        steps = report['steps']
+        assert report['iterations'] == steps[ITERATION]['count'] == 20
+        assert steps['open']['count'] == steps['search']['count'] == 20 and not steps['open']['errors']
+        assert steps['open']['p50_ms'] <= steps['open']['p95_ms'] <= steps['open']['p99_ms'] <= steps['open']['max_ms']
+        assert sum(steps['search']['histogram'].values()) == 20
+        assert steps['broken']['error_rate'] == 1.0 and steps['broken']['errors_by_type'] == {'ValueError': 5}
+        assert steps[ITERATION]['errors'] == 5
+        # Each iteration counted from its scheduled start takes at least its own wall time.
+        assert steps[SCHEDULED]['count'] == 20 and steps[SCHEDULED]['errors'] == 5
+        assert steps[SCHEDULED]['max_ms'] >= steps[ITERATION]['max_ms']
+        assert steps[SCHEDULED]['mean_ms'] >= steps[ITERATION]['mean_ms']
+        logger.info("Completed test for load generation.")
+
+    @pytest.mark.tc_load
+    def test_errors_without_latency(self):
+        """ Unit test for iterations failing before they start, counted as errors without a latency. """
+        logger.info("Start test for load errors.")
+        stats = StepStats()
+        stats.add(40.0)
+        stats.add(None, 'OSError')
+        summary = stats.summary()
+        assert (summary['count'], summary['errors'], summary['error_rate']) == (2, 1, 0.5)
+        assert summary['p50_ms'] == summary['max_ms'] == 40.0 and sum(summary['histogram'].values()) == 1
+        logger.info("Completed test for load errors.")
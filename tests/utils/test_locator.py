@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+""" This is Util tests for compiled locators. """
+
+import logging
+import pytest
+from selenium.webdriver.common.by import By
+
+from lib.utils.common.web_element.decorator import elements
+from lib.utils.common.web_element.exceptions import LocatorError
+from lib.utils.common.web_element.locator import compile_locator, xpath_to_css
+
+logger = logging.getLogger(__name__)
+
+
+class Driver:
+    """ Driver of a page object that never sends a command. """
+
+
+class Row:
+    """ Component of a list-typed Test ID. """
+
+    def __init__(self, driver, element):
+        self.driver = driver
+        self.element = element
+
+
+@elements({'rows': ('row-{kind}', Row), 'cells': (('//*[@data-kind="{kind}"]', By.XPATH), Row)})
+class Table:
+    """ Page with list-typed Test IDs formatted by test_id_param. """
+
+    def __init__(self, driver, kind):
+        self.driver = driver
+        self.test_id_param = {'kind': kind}
+
+
+class TestLocator:
+    """
+    Unit Test suite
+    """
+
+    @pytest.mark.tc_locator
+    def test_compiled_locators(self):
+        """ Unit test for template compilation, formatting and XPath to CSS translation. """
+        logger.info("Start test for compiled locators.")
+        assert xpath_to_css('//*[@name="q"]') == '[name="q"]'
+        assert xpath_to_css('//div[@id="main"]/ul//li[contains(@class, "item") and @role]') == \
+            'div#main > ul li[class*="item"][role]'
+        assert xpath_to_css('.//a[@href]', document=False) == 'a[href]'
+        assert xpath_to_css('//*[@name="q"]', document=False) is None
+        assert xpath_to_css('//*[@TestId="popup"]//Label[1]') is None
+        assert xpath_to_css('//a[text()="Next"]') is None
+        assert xpath_to_css('//a[contains(@class, "")]') is None
+        assert xpath_to_css("//a[starts-with(@href, '') and @id]") is None
+        assert xpath_to_css('//a[@title=""]') == 'a[title=""]'
+
+        locator = compile_locator('//*[@data-row="{row}"]//*[@name="{}"]', By.XPATH)
+        assert compile_locator('//*[@data-row="{row}"]//*[@name="{}"]', By.XPATH) is locator
+        assert locator.fields == {'row'} and locator.positional == 1
+        assert locator.resolve(('q', ), {'row': '1'}) == (By.CSS_SELECTOR, '[data-row="1"] [name="q"]')
+        assert locator.resolve(('btnK', ), {'row': '2'}) == (By.CSS_SELECTOR, '[data-row="2"] [name="btnK"]')
+        bound = locator.bind({'row': '3', 'unused': 'value'})
+        assert bound.template == '//*[@data-row="3"]//*[@name="{}"]'
+        assert locator.bind({'row': '3'}) is bound
+        with pytest.raises(IndexError):
+            bound.resolve()
+
+        for template, by in (('{', By.ID), ('{} {0}', By.ID), ('//a[@name="q"', By.XPATH), ('name', 'link')):
+            with pytest.raises(LocatorError):
+                compile_locator(template, by)
+        with pytest.raises(LocatorError):
+            elements({'broken': ('//a[@name="q"', By.XPATH)})
+        logger.info("Completed test for compiled locators.")
+
+    @pytest.mark.tc_locator
+    def test_list_test_id_param(self):
+        """ Unit test for str ids of list-typed Test IDs formatted with test_id_param, without any WebDriver call. """
+        logger.info("Start test for list Test ID params.")
+        table = Table(Driver(), 'a')
+        assert table.rows.locator == (By.ID, 'row-a')
+        table.test_id_param = {'kind': 'b'}
+        assert table.rows.locator == (By.ID, 'row-b')
+        # Ids given with their search method are used as written.
+        assert table.cells.locator == (By.CSS_SELECTOR, '[data-kind="{kind}"]')
+        logger.info("Completed test for list Test ID params.")
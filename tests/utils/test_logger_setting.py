@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+""" This is Util tests for per test JSON log buffering. """
+
+import json
+import logging
+import sys
+
+import pytest
+
+# Imported as a module so pytest does not collect TestLogBuffer as a test class.
+from lib.utils.common import logger_setting
+
+logger = logging.getLogger(__name__)
+
+
+def make_record(msg, *args, exc_info=None):
+    """ Record of the 'shop' logger. """
+    return logging.LogRecord('shop', logging.WARNING, __file__, 1, msg, args, exc_info)
+
+
+class TestLoggerSetting:
+    """
+    Unit Test suite
+    """
+
+    @pytest.mark.tc_logger_setting
+    def test_json_formatter(self):
+        """ Unit test for the JSON line of a record with context ids and an exception. """
+        logger.info("Start test for JSON formatter.")
+        record = make_record('cart %s added', 'c1')
+        record.test_id, record.worker_id = 'tests/test_cart.py::test_add', 'gw1'
+        entry = json.loads(logger_setting.JsonFormatter().format(record))
+        assert entry['message'] == 'cart c1 added' and entry['level'] == 'WARNING' and entry['logger'] == 'shop'
+        assert entry['test_id'] == 'tests/test_cart.py::test_add' and entry['worker_id'] == 'gw1'
+        assert 'time' in entry and 'exception' not in entry
+
+        try:
+            raise ValueError('bad cart')
+        except ValueError:
+            record = logger_setting.freeze_record(make_record('cart failed', exc_info=sys.exc_info()))
+        entry = json.loads(logger_setting.JsonFormatter().format(record))
+        assert entry['exception'].endswith('ValueError: bad cart') and entry['test_id'] is None
+        logger.info("Completed test for JSON formatter.")
+
+    @pytest.mark.tc_logger_setting
+    def test_test_log_buffer(self, tmp_path):
+        """ Unit test for records written when the test ends, failed tests only, and on close. """
+        logger.info("Start test for test log buffer.")
+        path = tmp_path / 'tests.jsonl'
+        buffer = logger_setting.TestLogBuffer(str(path), failures_only=True)
+        cart = ['apple']
+        logger_setting.set_log_context('tests/test_cart.py::test_add')
+        try:
+            buffer.handle(make_record('cart %s', cart))
+            # Rendered when logged, not when written.
+            cart.append('pear')
+            assert buffer.flush_test(failed=True) == 1
+            buffer.handle(make_record('passed test'))
+            assert not buffer.flush_test(failed=False)
+            logger_setting.set_log_context(None)
+            buffer.handle(make_record('session teardown'))
+        finally:
+            logger_setting.set_log_context(None)
+            buffer.close()
+        entries = [json.loads(line) for line in path.read_text(encoding='utf8').splitlines()]
+        assert [(e['message'], e['test_id']) for e in entries] == [
+            ("cart ['apple']", 'tests/test_cart.py::test_add'), ('session teardown', None)]
+        logger.info("Completed test for test log buffer.")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+""" This is Util tests for action macros against a fake WebDriver. """
+
+import logging
+
+import pytest
+from selenium.common.exceptions import ElementNotInteractableException
+from selenium.webdriver import ChromeOptions, Remote
+from selenium.webdriver.common.by import By
+
+from benchmarks.fake_webdriver import FakeWebDriver
+from lib.base.base import Base
+from lib.utils.common.web_element.decorator import elements
+from lib.utils.common.web_element.macro import ActionMacro
+
+logger = logging.getLogger(__name__)
+
+PAGE = [
+    {'tag': 'input', 'attrs': {'name': 'q', 'type': 'text'}},
+    {'tag': 'input', 'attrs': {'name': 'token', 'type': 'text'}, 'displayed': False},
+]
+
+
+@elements({'query': ('//*[@name="q"]', By.XPATH), 'token': ('//*[@name="token"]', By.XPATH)})
+class Form(Base):
+    """ Page with a displayed and a hidden text field. """
+
+
+class TestMacro:
+    """
+    Unit Test suite
+    """
+
+    @pytest.mark.tc_macro
+    def test_hidden_field_not_fused(self):
+        """ Unit test for typing fused into one script, and hidden fields left to the Element methods. """
+        logger.info("Start test for action macro.")
+        server = FakeWebDriver(PAGE).start()
+        driver = Remote(command_executor=server.url, options=ChromeOptions())
+        try:
+            form = Form(driver)
+            form.navigate()
+            report = ActionMacro(driver).type(form.query, 'shoes').run()
+            assert report.batches == 1 and not report.unfused
+
+            # Like a user, the macro cannot type into a hidden field: the Element method reports it.
+            with pytest.raises(ElementNotInteractableException):
+                ActionMacro(driver).type(form.token, 'forged').run()
+            session = next(iter(server.sessions.values()))
+            assert [e.value for e in session.elements.values()] == ['shoes', '']
+        finally:
+            driver.quit()
+            server.stop()
+        logger.info("Completed test for action macro.")
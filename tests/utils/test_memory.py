@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+""" This is Util tests for browser memory monitoring. """
+
+import logging
+import time
+
+import pytest
+
+from lib.base.driver_pool import DriverPool
+from lib.utils.common.memory import MB, MemoryBudget, get_memory_monitor, memory_recycle_reason
+from lib.utils.common.web_element.exceptions import MemoryExceeded
+from tests.base.memory import browser_memory
+
+logger = logging.getLogger(__name__)
+
+
+class CdpDriver:
+    """ Driver answering the DevTools commands of the memory monitor with scripted heap sizes. """
+
+    def __init__(self, heap_mb):
+        self.heap_mb = list(heap_mb)
+        self.garbage_collections = 0
+        self.quits = 0
+
+    def execute_cdp_cmd(self, cmd, params):
+        """ Answer Performance and HeapProfiler commands. """
+        del params
+        if cmd == 'Performance.getMetrics':
+            used = self.heap_mb.pop(0) if len(self.heap_mb) > 1 else self.heap_mb[0]
+            return {'metrics': [{'name': 'JSHeapUsedSize', 'value': used * MB}, {'name': 'Nodes', 'value': 100}]}
+        if cmd == 'HeapProfiler.collectGarbage':
+            self.garbage_collections += 1
+        return {}
+
+    def quit(self):
+        """ Count quits. """
+        self.quits += 1
+
+
+class _Config:
+    """ Command line of a run with a session memory limit. """
+
+    @staticmethod
+    def getoption(name):
+        """ Option value. """
+        return {'memory_limit_test_mb': 0, 'memory_limit_session_mb': 35, 'memory_report': False,
+                'memory_interval': 0.01}[name]
+
+
+class _Node:
+    """ Test item. """
+
+    def __init__(self, nodeid):
+        self.nodeid = nodeid
+        self.user_properties = []
+
+
+class _Request:
+    """ Request of a test of a class borrowing its driver from a pool. """
+
+    def __init__(self, cls, pool, nodeid):
+        self.cls = cls
+        self.config = _Config()
+        self.node = _Node(nodeid)
+        self.fixturenames = ['driver_fixture', 'driver_pool', 'browser_memory']
+        self.pool = pool
+
+    def getfixturevalue(self, name):
+        """ Session fixture. """
+        assert name == 'driver_pool'
+        return self.pool
+
+
+class TestMemory:
+    """
+    Unit Test suite
+    """
+
+    @pytest.mark.tc_memory
+    def test_memory_budget(self):
+        """ Unit test for peak sampling, budget enforcement and recycling through the driver pool. """
+        logger.info("Start test for memory monitoring.")
+        driver = CdpDriver([10, 40, 120, 30])
+        monitor = get_memory_monitor(driver, MemoryBudget(test_mb=100, session_mb=35), interval=0.01)
+        assert get_memory_monitor(driver) is monitor
+        monitor.start('test_leak')
+        deadline = time.monotonic() + 5
+        while len(driver.heap_mb) > 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        report = monitor.stop()
+        assert report is not None and monitor.stop() is None
+        assert (report.start_mb, report.peak_mb, report.retained_mb, report.peak_nodes) == (10, 120, 30, 100)
+        assert driver.garbage_collections == 1
+        with pytest.raises(MemoryExceeded, match='over the test limit of 100 MB'):
+            monitor.check(report)
+        monitor.check(report._replace(peak_mb=90))
+
+        assert memory_recycle_reason(driver).startswith('holds 30.0 MB')
+        pool = DriverPool(lambda: driver, retire_when=memory_recycle_reason)
+        pool.release(pool.acquire())
+        assert driver.quits == 1
+        logger.info("Completed test for memory monitoring.")
+
+    @pytest.mark.tc_memory
+    def test_recycled_at_first_breach(self):
+        """ Unit test for a driver over the session limit replaced before the next test of the class. """
+        logger.info("Start test for memory recycling.")
+        leaking, fresh = CdpDriver([10, 50]), CdpDriver([10])
+        drivers = [leaking, fresh]
+        pool = DriverPool(lambda: drivers.pop(0), retire_when=memory_recycle_reason)
+
+        class Borrower:
+            """ Test class holding a pooled driver. """
+            driver = pool.acquire()
+
+        fixture = browser_memory.__wrapped__(_Request(Borrower, pool, 'test_leak'))
+        next(fixture)
+        with pytest.raises(MemoryExceeded, match='over the session limit of 35 MB'):
+            next(fixture)
+        assert leaking.quits == 1 and Borrower.driver is fresh
+
+        fixture = browser_memory.__wrapped__(_Request(Borrower, pool, 'test_next'))
+        next(fixture)
+        with pytest.raises(StopIteration):
+            next(fixture)
+        pool.release(Borrower.driver, discard=True)
+        pool.close()
+        assert fresh.quits == 1
+        logger.info("Completed test for memory recycling.")
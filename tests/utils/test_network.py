@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+""" This is Util tests for network rules and response cache. """
+
+import base64
+import logging
+import time
+import pytest
+
+from lib.utils.common.network import (CachedResponse, NetworkInterceptor, NetworkRules, NetworkStats, ResponseCache,
+                                      freshness_lifetime)
+
+logger = logging.getLogger(__name__)
+
+
+class FakeConnection:
+    """ DevTools connection recording commands, answering response bodies or raising the given error. """
+
+    def __init__(self):
+        self.sent = []
+        self.body_error = None
+
+    def send(self, method, params=None, wait=True):
+        """ Record a command. """
+        del wait
+        self.sent.append((method, params or {}))
+        if method == 'Fetch.getResponseBody':
+            if self.body_error is not None:
+                raise self.body_error
+            return {'body': base64.b64encode(b'var a = 1;').decode('ascii'), 'base64Encoded': True}
+        return {}
+
+
+def offline_interceptor(cache):
+    """ Interceptor caching into cache over a FakeConnection, without Chrome. """
+    interceptor = NetworkInterceptor.__new__(NetworkInterceptor)
+    interceptor.rules = NetworkRules(response_cache=True)
+    interceptor.stats = NetworkStats()
+    interceptor._cache = cache  # pylint: disable=protected-access
+    interceptor._connection = FakeConnection()  # pylint: disable=protected-access
+    return interceptor
+
+
+def paused(status=None, headers=None, request_headers=None):
+    """ Fetch.requestPaused parameters of a script, at the response stage when status is set. """
+    params = {'requestId': 'r1', 'resourceType': 'Script',
+              'request': {'url': 'https://www.google.com/app.js', 'method': 'GET', 'headers': request_headers or {}}}
+    if status is not None:
+        params.update(responseStatusCode=status, responseHeaders=headers or [])
+    return params
+
+
+class TestNetwork:
+    """
+    Unit Test suite
+    """
+
+    @pytest.mark.tc_network
+    def test_rules_and_response_cache(self, tmp_path):
+        """ Unit test for blocking rules and the content-addressed response cache. """
+        logger.info("Start test for network rules and response cache.")
+        rules = NetworkRules(block_urls=('*://*.doubleclick.net/*', ), block_types=('Font', ))
+        assert rules
+        assert not NetworkRules()
+        assert rules.blocks('https://ad.doubleclick.net/pixel', 'Image')
+        assert rules.blocks('https://www.google.com/font.woff2', 'Font')
+        assert not rules.blocks('https://www.google.com/app.js', 'Script')
+
+        cache = ResponseCache(str(tmp_path))
+        assert cache.get('https://www.google.com/app.js') is None
+        response = CachedResponse(200, [{'name': 'Content-Type', 'value': 'text/javascript'}], b'var a = 1;')
+        cache.put('https://www.google.com/app.js', response)
+        cache.put('https://www.google.com/copy.js', response)
+        assert ResponseCache(str(tmp_path)).get('https://www.google.com/app.js') == response
+        assert len(list((tmp_path / 'blobs').iterdir())) == 1
+        logger.info("Completed test for network rules and response cache.")
+
+    @pytest.mark.tc_network
+    def test_cache_headers(self, tmp_path):
+        """ Unit test for freshness lifetimes, revalidation with ETag and responses always continued. """
+        # pylint: disable=protected-access
+        logger.info("Start test for response cache headers.")
+        now = float(int(time.time()))
+        assert freshness_lifetime([{'name': 'Cache-Control', 'value': 'public, max-age=60'},
+                                   {'name': 'Age', 'value': '10'}], now) == now + 50
+        assert freshness_lifetime([{'name': 'Cache-Control', 'value': 'no-store'}], now) is None
+        assert freshness_lifetime([{'name': 'Cache-Control', 'value': 'no-cache, max-age=60'}], now) == now
+        assert freshness_lifetime([{'name': 'Expires', 'value': 'Thu, 01 Jan 2026 01:00:00 GMT'},
+                                   {'name': 'Date', 'value': 'Thu, 01 Jan 2026 00:00:00 GMT'}], now) == now + 3600
+        assert freshness_lifetime([{'name': 'Expires', 'value': '0'}], now) == now
+        assert freshness_lifetime([], now) == now
+
+        cache = ResponseCache(str(tmp_path))
+        interceptor = offline_interceptor(cache)
+        sent = interceptor._connection.sent
+        etag = [{'name': 'ETag', 'value': '"v1"'}]
+        interceptor._on_request_paused(paused(200, etag + [{'name': 'Cache-Control', 'value': 'max-age=60'}]))
+        assert [method for method, _ in sent] == ['Fetch.getResponseBody', 'Fetch.continueResponse']
+        assert cache.get('https://www.google.com/app.js').fresh
+        interceptor._on_request_paused(paused())
+        assert sent[-1][0] == 'Fetch.fulfillRequest'
+
+        # Stale: revalidated with the ETag, then served from the cache on 304.
+        cache.put('https://www.google.com/app.js', cache.get('https://www.google.com/app.js')._replace(expires=0))
+        interceptor._on_request_paused(paused(request_headers={'Accept': '*/*'}))
+        assert sent[-1] == ('Fetch.continueRequest', {'requestId': 'r1', 'headers': [
+            {'name': 'Accept', 'value': '*/*'}, {'name': 'If-None-Match', 'value': '"v1"'}]})
+        interceptor._on_request_paused(paused(304, [{'name': 'Cache-Control', 'value': 'max-age=60'}]))
+        assert sent[-1][0] == 'Fetch.fulfillRequest' and base64.b64decode(sent[-1][1]['body']) == b'var a = 1;'
+        assert cache.get('https://www.google.com/app.js').fresh and interceptor.stats.cache_hits == 2
+
+        # A failing body read still lets the response through.
+        interceptor._connection.body_error = TimeoutError()
+        with pytest.raises(TimeoutError):
+            interceptor._on_request_paused(paused(200, etag))
+        assert sent[-1][0] == 'Fetch.continueResponse' and interceptor.stats.cache_stores == 1
+        logger.info("Completed test for response cache headers.")
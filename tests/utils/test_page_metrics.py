@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+""" This is Util tests for page metrics and baseline regression checks. """
+
+import logging
+import pytest
+
+from lib.utils.common.page_metrics import PageMetrics, find_regressions, load_baseline, save_baseline, summarize
+
+logger = logging.getLogger(__name__)
+
+
+def page_load(page, load_ms, dom_content_loaded_ms=None):
+    """ Record of one page load as written to the run file. """
+    return PageMetrics(page, 'http://127.0.0.1/', 20.0, dom_content_loaded_ms, load_ms, 30.0, 30.0, 45.0, 4,
+                       2048, [('http://127.0.0.1/app.js', 12.0)])._asdict()
+
+
+class TestPageMetrics:
+    """
+    Unit Test suite
+    """
+
+    @pytest.mark.tc_page_metrics
+    def test_baseline_regressions(self, tmp_path):
+        """ Unit test for per page medians, baseline storage and regression detection. """
+        logger.info("Start test for page metrics.")
+        summary = summarize([page_load('Home', 100.0), page_load('Home', 300.0), page_load('Home', 120.0),
+                             page_load('Results', None, 400.0)])
+        assert summary['Home']['loads'] == 3 and summary['Home']['load_time_ms'] == 120.0
+        assert summary['Home']['load_time_metric'] == 'load_ms'
+        assert summary['Results']['load_time_ms'] == 400.0 and 'load_ms' not in summary['Results']
+        assert summary['Results']['load_time_metric'] == 'dom_content_loaded_ms'
+
+        path = str(tmp_path / 'baseline.json')
+        assert load_baseline(path) == {}
+        save_baseline(path, {'Home': {'load_time_ms': 100.0, 'load_time_metric': 'load_ms'},
+                             'Results': {'load_time_ms': 300.0, 'load_time_metric': 'dom_content_loaded_ms'}})
+        baseline = load_baseline(path)
+        regressions = find_regressions(summary, baseline, tolerance=0.2)
+        # Home is 20 ms slower, 20% but within the minimum regression of 50 ms.
+        assert [(r.page, r.limit_ms) for r in regressions] == [('Results', 360.0)]
+        assert not find_regressions(summary, baseline, tolerance=0.5)
+        assert not find_regressions(summary, {}, tolerance=0.0)
+        logger.info("Completed test for page metrics.")
+
+    @pytest.mark.tc_page_metrics
+    def test_load_time_metric(self):
+        """ Unit test for load times compared only with a baseline of the same timing. """
+        logger.info("Start test for page metrics timings.")
+        # One load read before its load event: every load of the page is measured on DOMContentLoaded.
+        summary = summarize([page_load('Home', 900.0, 100.0), page_load('Home', None, 120.0),
+                             page_load('Home', 950.0, 110.0)])
+        assert summary['Home']['load_time_ms'] == 110.0
+        assert summary['Home']['load_time_metric'] == 'dom_content_loaded_ms'
+
+        assert not find_regressions(summary, {'Home': {'load_time_ms': 50.0, 'load_time_metric': 'load_ms'}}, 0.2)
+        baseline = {'Home': {'load_time_ms': 50.0, 'load_time_metric': 'dom_content_loaded_ms'}}
+        assert [r.baseline_ms for r in find_regressions(summary, baseline, 0.2)] == [50.0]
+        # Baselines without load_time_metric are compared on the median of the same timing.
+        baseline = {'Home': {'load_time_ms': 50.0, 'load_ms': 50.0, 'dom_content_loaded_ms': 40.0}}
+        assert [r.baseline_ms for r in find_regressions(summary, baseline, 0.2)] == [40.0]
+        assert not find_regressions(summary, {'Home': {'load_time_ms': 50.0}}, 0.2)
+        logger.info("Completed test for page metrics timings.")
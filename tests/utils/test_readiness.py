@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+""" This is Util tests for page readiness detection. """
+
+import logging
+import time
+
+import pytest
+from selenium.common.exceptions import JavascriptException, TimeoutException, WebDriverException
+
+from lib.pom.google.home.home import Home
+from lib.utils.common.web_element.decorator import document_locators
+from lib.utils.common.web_element.wait import (Condition, ReadinessRules, WaitEngine, install_ready_hook, settled,
+                                               wait_until, wait_until_ready)
+
+logger = logging.getLogger(__name__)
+
+
+class ScriptDriver:
+    """ Driver answering the readiness script with scripted outcomes, an exception instance is raised. """
+
+    def __init__(self, outcomes, cdp=True):
+        self.outcomes = list(outcomes)
+        self.cdp = cdp
+        self.scripts = []
+        self.hooks = 0
+        self.script_timeouts = []
+
+    def set_script_timeout(self, seconds):
+        """ Record the timeout. """
+        self.script_timeouts.append(seconds)
+
+    def execute_script(self, script, *args):
+        """ Answer the probe script: present and visible. """
+        del script, args
+        return [True, True]
+
+    def find_element(self, by, value):
+        """ Find a placeholder element. """
+        return (by, value)
+
+    def execute_async_script(self, script, *args):
+        """ Record the arguments and answer the next outcome. """
+        del script
+        self.scripts.append(args)
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def execute_cdp_cmd(self, cmd, params):
+        """ Count the new document scripts, fail without DevTools. """
+        del params
+        if not self.cdp:
+            raise WebDriverException('unknown command: ' + cmd)
+        self.hooks += 1
+        return {}
+
+
+class TestReadiness:
+    """
+    Unit Test suite
+    """
+
+    @pytest.mark.tc_readiness
+    def test_wait_until_ready(self):
+        """ Unit test for the readiness result, navigation retry, blocked scripts and hook registration. """
+        logger.info("Start test for page readiness.")
+        quiet = {'ready': True, 'state': 'complete', 'pending': 0, 'waited': 150, 'hooked': True}
+        unloaded = JavascriptException('javascript error: document unloaded while waiting for result')
+        driver = ScriptDriver([unloaded, WebDriverException('chrome not reachable'), quiet, quiet])
+        started = time.monotonic()
+        readiness = wait_until_ready(driver, ReadinessRules(ready_state='interactive', network_idle=False), 5)
+        assert readiness.ready and readiness.waited == 0.15 and readiness.hooked
+        # Retries back off: 50 msec, then 100 msec.
+        assert time.monotonic() - started >= 0.15
+        assert len(driver.scripts) == 3 and driver.scripts[2][:4] == ('interactive', 100, 5000, False)
+        assert 0 < driver.scripts[2][4] <= 5000
+        assert wait_until_ready(driver, max_wait=5).ready and len(driver.scripts) == 4
+
+        # A page redirecting until max_wait is not ready, without spinning.
+        redirecting = ScriptDriver([unloaded] * 20)
+        readiness = wait_until_ready(redirecting, max_wait=0.3)
+        assert not readiness.ready and len(redirecting.scripts) < 8
+
+        blocked = ScriptDriver([JavascriptException('Content Security Policy')])
+        assert not wait_until_ready(blocked, max_wait=1).ready
+        assert wait_until_ready(blocked, max_wait=1).ready_state == 'unknown' and len(blocked.scripts) == 1
+
+        assert install_ready_hook(driver) and install_ready_hook(driver) and driver.hooks == 1
+        plain = ScriptDriver([], cdp=False)
+        assert not install_ready_hook(plain) and not install_ready_hook(plain)
+        logger.info("Completed test for page readiness.")
+
+    @pytest.mark.tc_readiness
+    def test_navigation_while_observing(self):
+        """ Unit test for a navigation during a MutationObserver wait, and the script timeout put back after it. """
+        logger.info("Start test for navigation while observing.")
+        unloaded = JavascriptException('javascript error: document unloaded while waiting for result')
+        driver = ScriptDriver([unloaded, {'ok': True, 'value': 'found'}])
+        locator = ('css selector', '#q')
+        assert wait_until(driver, driver, Condition.PRESENCE, locator, 30, WaitEngine.MUTATION) == locator
+        # Still observed on the next wait, with the script timeout raised only while it runs.
+        assert wait_until(driver, driver, Condition.PRESENCE, locator, 30, WaitEngine.MUTATION) == 'found'
+        assert len(driver.scripts) == 2 and driver.script_timeouts == [35, 30, 35, 30]
+        assert wait_until(driver, driver, Condition.PRESENCE, locator, 1, WaitEngine.BACKOFF) == locator
+        assert driver.script_timeouts == [35, 30, 35, 30]
+
+        # A settled wait failing in the driver polls the state instead.
+        driver = ScriptDriver([TimeoutException('script timeout'), unloaded, True])
+        assert all(settled(driver, driver, locator, True, 0.1, 5) for _ in range(3)) and len(driver.scripts) == 3
+        logger.info("Completed test for navigation while observing.")
+
+    @pytest.mark.tc_readiness
+    def test_sentinels(self):
+        """ Unit test for a page never quiet, used once its Test IDs are present instead of after max_wait. """
+        logger.info("Start test for readiness sentinels.")
+        home = Home(ScriptDriver([]))
+        sentinels = document_locators(home, ['page_id', 'search_box_input'])
+        assert sentinels == [('id', 'gsr'), ('css selector', '[name="q"]')]
+        found = {'ready': True, 'state': 'complete', 'pending': 2, 'waited': 20, 'hooked': True, 'sentinels': True}
+        driver = ScriptDriver([found])
+        readiness = wait_until_ready(driver, max_wait=60, sentinels=sentinels)
+        assert readiness.ready and readiness.sentinels and readiness.pending_requests == 2
+        assert driver.scripts[0][5] == [['id', 'gsr'], ['css selector', '[name="q"]']]
+        logger.info("Completed test for readiness sentinels.")
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+""" This is Util tests for record and replay server. """
+
+import functools
+import logging
+import threading
+import urllib.request
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from lib.tools.replay import ReplayServer
+
+logger = logging.getLogger(__name__)
+
+PAGE = b'<html><script src="ORIGIN/app.js"></script><img src="https://cdn.example.com/logo.png"></html>'
+
+
+class SiteHandler(SimpleHTTPRequestHandler):
+    """ Static site answering /created with an absolute Location. """
+
+    def do_GET(self):
+        """ Point /created to the index page, serve files otherwise. """
+        if self.path != '/created':
+            super().do_GET()
+            return
+        host, port = self.server.server_address[:2]
+        self.send_response(201)
+        self.send_header('Location', f'http://{host}:{port}/index.html')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+def fetch(url):
+    """ Status, body and Location header of a GET. """
+    try:
+        with urllib.request.urlopen(url, timeout=10) as response:
+            return response.status, response.read(), response.headers['Location']
+    except urllib.error.HTTPError as e:
+        return e.code, e.read(), e.headers['Location']
+
+
+class TestReplay:
+    """
+    Unit Test suite
+    """
+
+    @pytest.mark.tc_replay
+    def test_record_then_replay_offline(self, tmp_path):
+        """ Unit test for recording a page through the proxy and replaying it without the origin on another port. """
+        logger.info("Start test for record and replay.")
+        site = tmp_path / 'site'
+        site.mkdir()
+        origin = ThreadingHTTPServer(('127.0.0.1', 0),
+                                     functools.partial(SiteHandler, directory=str(site)))
+        origin_url = f'http://127.0.0.1:{origin.server_address[1]}'
+        (site / 'index.html').write_bytes(PAGE.replace(b'ORIGIN', origin_url.encode()))
+        threading.Thread(target=origin.serve_forever, daemon=True).start()
+
+        archive = str(tmp_path / 'archive')
+        recorder = ReplayServer(archive, origin_url).start()
+        try:
+            status, body, _ = fetch(recorder.url + '/index.html')
+            assert fetch(recorder.url + '/created')[2] == recorder.url + '/index.html'
+        finally:
+            recorder.stop()
+            origin.shutdown()
+            origin.server_close()
+        assert status == 200
+        assert f'src="{recorder.url}/app.js"'.encode() in body
+        assert f'src="{recorder.url}/__host__/https/cdn.example.com/logo.png"'.encode() in body
+
+        replay = ReplayServer(archive).start()
+        try:
+            assert replay.url != recorder.url
+            status, replayed, _ = fetch(replay.url + '/index.html')
+            assert status == 200
+            assert replayed == body.replace(recorder.url.encode(), replay.url.encode())
+            assert recorder.url.encode() not in replayed
+            assert fetch(replay.url + '/created')[2] == replay.url + '/index.html'
+            assert fetch(replay.url + '/missing.js')[0] == 404
+            assert replay.misses == ['/missing.js']
+        finally:
+            replay.stop()
+        logger.info("Completed test for record and replay.")
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+""" This is Util tests for session state snapshot and restore. """
+
+import json
+import logging
+import os
+import time
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from lib.utils.common.session_state import READ_STORAGE_JS, WRITE_STORAGE_JS, SessionState, SessionStateCache
+
+logger = logging.getLogger(__name__)
+
+
+class StateDriver:
+    """ Driver keeping cookies, storage and URL, answering DevTools commands only when cdp is set. """
+
+    def __init__(self, cdp):
+        self.cdp = cdp
+        self.current_url = 'about:blank'
+        self.cookies = []
+        self.storage = {'local': {}, 'session': {}}
+        self.visited = []
+        self.seeds = {}
+
+    def get(self, url):
+        """ Load a URL, running the registered new document scripts as storage seeds. """
+        self.visited.append(url)
+        self.current_url = url
+        for local, session in self.seeds.values():
+            self.storage = {'local': dict(local), 'session': dict(session)}
+
+    def set_script_timeout(self, seconds):
+        """ Accept any timeout. """
+        del seconds
+
+    def execute_script(self, script, *args):
+        """ Read or write the storage. """
+        if script == READ_STORAGE_JS:
+            return {'local': dict(self.storage['local']), 'session': dict(self.storage['session'])}
+        if script == WRITE_STORAGE_JS:
+            self.storage = {'local': dict(args[0]), 'session': dict(args[1])}
+        return None
+
+    def get_cookies(self):
+        """ Cookies visible from the current page. """
+        return list(self.cookies)
+
+    def add_cookie(self, cookie):
+        """ Set a cookie of the current domain only. """
+        if cookie['domain'] not in self.current_url:
+            raise WebDriverException('invalid cookie domain')
+        self.cookies.append(dict(cookie))
+
+    def delete_all_cookies(self):
+        """ Drop the cookies. """
+        self.cookies = []
+
+    def execute_cdp_cmd(self, cmd, params):
+        """ Answer the cookie and new document script commands. """
+        if not self.cdp:
+            raise WebDriverException('unknown command: ' + cmd)
+        if cmd == 'Network.getAllCookies':
+            return {'cookies': [dict(c, session='expiry' not in c, expires=c.get('expiry', -1), size=8)
+                                for c in self.cookies]}
+        if cmd == 'Network.clearBrowserCookies':
+            self.cookies = []
+        if cmd == 'Network.setCookies':
+            self.cookies = [dict(c, expiry=c.pop('expires')) if 'expires' in c else c for c in params['cookies']]
+        if cmd == 'Page.addScriptToEvaluateOnNewDocument' and 'storage.clear' in params['source']:
+            # The seed is formatted with the origin, localStorage and sessionStorage as JSON literals.
+            seed = params['source'].rsplit('})(', 1)[1].rsplit(');', 1)[0]
+            _, local, session = json.loads('[' + seed + ']')
+            self.seeds[len(self.seeds)] = (local, session)
+            return {'identifier': str(len(self.seeds) - 1)}
+        if cmd == 'Page.removeScriptToEvaluateOnNewDocument':
+            del self.seeds[int(params['identifier'])]
+        return {'identifier': 'hook'}
+
+
+def sign_in(driver):
+    """ Setup flow: lands on the account page signed in. """
+    driver.get('https://shop.example/account?tab=orders')
+    driver.cookies = [{'name': 'sid', 'value': 'abc', 'domain': 'shop.example', 'path': '/', 'httpOnly': True},
+                      {'name': 'ads', 'value': '1', 'domain': 'ads.example', 'path': '/',
+                       'expiry': int(time.time()) + 3600}]
+    driver.storage = {'local': {'theme': 'dark'}, 'session': {'cart': '[1, 2]'}}
+
+
+class TestSessionState:
+    """
+    Unit Test suite
+    """
+
+    @pytest.mark.tc_session_state
+    @pytest.mark.parametrize('cdp', [True, False])
+    def test_snapshot_restore(self, tmp_path, cdp):
+        """ Unit test for capture on first use, restore from the file in a later run and version invalidation. """
+        logger.info("Start test for session state.")
+        setups = []
+
+        def setup(driver):
+            setups.append(driver)
+            sign_in(driver)
+
+        cache = SessionStateCache(str(tmp_path))
+        first = StateDriver(cdp)
+        state = cache.prepare(first, 'signed in', '1', setup)
+        assert setups == [first] and state.url == 'https://shop.example/account?tab=orders'
+        assert not os.stat(cache.path('signed in')).st_mode & 0o077
+
+        # Another run, from the file only.
+        later = StateDriver(cdp)
+        assert SessionStateCache(str(tmp_path)).prepare(later, 'signed in', '1', setup) == state
+        assert setups == [first] and later.current_url == state.url
+        assert later.storage == {'local': {'theme': 'dark'}, 'session': {'cart': '[1, 2]'}}
+        # Without DevTools only the cookies of the snapshot origin are restored, with one more navigation.
+        assert sorted(c['name'] for c in later.cookies) == (['ads', 'sid'] if cdp else ['sid'])
+        assert later.visited == ([state.url] if cdp else ['https://shop.example/', state.url])
+
+        assert cache.prepare(StateDriver(cdp), 'signed in', '2', setup).version == '2' and len(setups) == 2
+        assert SessionStateCache(str(tmp_path), refresh=True).load('signed in', '2') is None
+        logger.info("Completed test for session state.")
+
+    @pytest.mark.tc_session_state
+    def test_expiry_of_sign_in_cookies(self, tmp_path):
+        """ Unit test for snapshots stale only once a sign-in cookie of their site expired. """
+        logger.info("Start test for session state expiry.")
+        now = int(time.time())
+        tracking = [{'name': '_gat', 'value': '1', 'domain': '.shop.example', 'expiry': now - 60},
+                    {'name': 'ads', 'value': '1', 'domain': 'ads.example', 'expiry': now - 60}]
+        auth = {'name': 'sid', 'value': 'abc', 'domain': 'shop.example', 'httpOnly': True, 'expiry': now + 3600}
+        state = SessionState('signed in', '1', 'https://www.shop.example/account', tracking + [auth], {}, {})
+        assert state.expires_at == now + 3600
+        assert state._replace(cookies=tracking + [dict(auth, expiry=None)]).expires_at is None
+        # A site without HttpOnly cookies: all of its own cookies count.
+        assert state._replace(cookies=tracking).expires_at == now - 60
+
+        cache = SessionStateCache(str(tmp_path))
+        cache.save(state)
+        assert SessionStateCache(str(tmp_path)).load('signed in', '1') == state
+        cache.save(state._replace(cookies=tracking + [dict(auth, expiry=now - 1)]))
+        assert SessionStateCache(str(tmp_path)).load('signed in', '1') is None
+        logger.info("Completed test for session state expiry.")
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+""" This is Util tests for the WebDriver command tracer. """
+
+import logging
+
+import pytest
+
+from lib.utils.common.web_element.trace import Tracer
+
+logger = logging.getLogger(__name__)
+
+
+class TestTrace:
+    """
+    Unit Test suite
+    """
+
+    @pytest.mark.tc_trace
+    def test_command_records(self):
+        """ Unit test for recorded commands, polls of nested waits, errors and the slowest-N report. """
+        logger.info("Start test for command tracer.")
+        tracer = Tracer()
+        with tracer.command('click', 'xpath', '//a', 'Home', 'link'):
+            tracer.poll()
+        assert not tracer.records
+
+        tracer.enabled = True
+        tracer.current_test = 'tests/test_home.py::test_search'
+        with tracer.command('wait:presence', 'xpath', '//*[@name="q"]', 'Home', 'search_box_input'):
+            tracer.poll()
+            with tracer.command('find', 'xpath', '//*[@name="q"]', 'Home', 'search_box_input'):
+                tracer.poll()
+            tracer.poll()
+        with pytest.raises(ValueError):
+            with tracer.command('send_keys', 'id', 'q', 'Home'):
+                raise ValueError('not interactable')
+        tracer.current_test = None
+        with tracer.command('snapshot', 'script', 'page_id', 'Results'):
+            pass
+
+        find, wait, send_keys, snapshot = tracer.records
+        assert (find.command, find.polls, wait.command, wait.polls) == ('find', 1, 'wait:presence', 2)
+        assert find.test == wait.test == 'tests/test_home.py::test_search' and snapshot.test is None
+        assert send_keys.error == 'ValueError' and wait.error is None and wait.wall_ms >= find.wall_ms
+
+        # Wall times are measured, so the order of the report is checked on fixed records.
+        tracer.records = [record._replace(wall_ms=wall_ms)
+                          for record, wall_ms in zip(tracer.records, [4.0, 9.5, 1.0, 7.25])]
+        summary = tracer.summary(top=2)
+        slowest = [(r['command'], r['wall_ms']) for r in summary['slowest']]
+        assert slowest == [('wait:presence', 9.5), ('snapshot', 7.25)]
+        assert summary['per_test'] == {
+            'tests/test_home.py::test_search': {'count': 3, 'total_ms': 14.5, 'max_ms': 9.5, 'polls': 3},
+            '<no test>': {'count': 1, 'total_ms': 7.25, 'max_ms': 7.25, 'polls': 0},
+        }
+        assert summary['per_page']['Home']['count'] == 3
+        assert summary['per_attribute']['Home.search_box_input']['total_ms'] == 13.5
+        assert summary['per_attribute']['Home.q']['count'] == 1
+        tracer.clear()
+        assert tracer.summary()['slowest'] == []
+        logger.info("Completed test for command tracer.")
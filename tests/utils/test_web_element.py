@@ -2,9 +2,15 @@
 """ This is Util tests for element. """
 
 import logging
+import time
 import pytest
+from selenium.webdriver.common.by import By
 
 from lib.pom.google.google import Google
+from lib.utils.common.web_element.components import ComponentList
+from lib.utils.common.web_element.element import Check, Element, Method, get_element_cache
+from lib.utils.common.web_element.macro import ActionMacro
+from lib.utils.common.web_element.wait import WaitEngine
 
 logger = logging.getLogger(__name__)
 
@@ -42,3 +48,123 @@ class TestPartnersSit:
         self.home.search_box_input.is_displayed()
         self.home.google_search_submit.submit()
         logger.info("Completed test for Element.")
+
+    @pytest.mark.tc_element_cache
+    def test_element_cache(self):
+        """ Unit test for reusing resolved WebElement. """
+        logger.info("Start test for element cache.")
+        self.home.open()
+        cache = get_element_cache(self.driver)
+        cache.reset_stats()
+        self.home.search_box_input.send_keys("Search google")
+        assert self.home.search_box_input.get_attribute("value") == "Search google"
+        assert cache.stats()['misses'] == 1
+        assert cache.stats()['hits'] == 1
+        self.driver.refresh()
+        self.home.search_box_input.get_attribute("value")
+        assert cache.stats()['stale'] == 1
+        logger.info("Completed test for element cache.")
+
+    @pytest.mark.tc_element_memo
+    def test_elements_memoized(self):
+        """ Unit test for memoized properties of @elements. """
+        logger.info("Start test for memoized properties.")
+        self.home.open()
+        search_box_input = self.home.search_box_input
+        assert self.home.search_box_input is search_box_input
+        self.home.test_id_param = {'unused': 'value'}
+        assert self.home.search_box_input is not search_box_input
+        logger.info("Completed test for memoized properties.")
+
+    @pytest.mark.tc_page_snapshot
+    def test_page_snapshot(self):
+        """ Unit test for resolving every Test ID in one round trip. """
+        logger.info("Start test for page snapshot.")
+        self.home.open()
+        cache = get_element_cache(self.driver)
+        cache.reset_stats()
+        snapshot = self.home.snapshot()
+        assert snapshot['search_box_input'].present
+        assert snapshot['search_box_input'].visible
+        assert self.home.search_box_input.get() == snapshot['search_box_input'].elements[0]
+        assert cache.stats()['hits'] == 1
+        logger.info("Completed test for page snapshot.")
+
+    @pytest.mark.tc_wait_engine
+    def test_wait_engines(self):
+        """ Unit test for MutationObserver and backoff wait engines. """
+        logger.info("Start test for wait engines.")
+        self.home.open()
+        for engine in (WaitEngine.MUTATION, WaitEngine.BACKOFF):
+            assert self.home.search_box_input.get(method=Method.VISIBILITY, engine=engine)
+            assert len(self.home.search_box_input.get_elements(engine=engine)) == 1
+            self.home.search_box_input.send_keys(engine.name)
+            assert self.home.search_box_input.wait_for_text(engine.name, value_flag=True, engine=engine)
+            assert not self.home.search_box_input.is_hidden(max_wait=1, engine=engine)
+        logger.info("Completed test for wait engines.")
+
+    @pytest.mark.tc_negative_check
+    def test_negative_checks(self):
+        """ Unit test for non-blocking is_displayed and is_hidden. """
+        logger.info("Start test for negative checks.")
+        self.home.open()
+        banner = Element(self.driver, 'no-such-banner', self.driver)
+        started = time.monotonic()
+        assert not banner.is_displayed(check=Check.PROBE)
+        assert banner.is_hidden(check=Check.PROBE)
+        assert not banner.is_displayed(check=Check.SETTLED, quiet_period=0.3)
+        assert time.monotonic() - started < 5
+        assert self.home.search_box_input.is_displayed(check=Check.PROBE)
+        assert self.home.search_box_input.is_displayed(check=Check.SETTLED)
+        assert not self.home.search_box_input.is_hidden(check=Check.SETTLED, quiet_period=0.3)
+        logger.info("Completed test for negative checks.")
+
+    @pytest.mark.tc_bulk_read
+    def test_bulk_reads(self):
+        """ Unit test for reading several attributes with one script. """
+        logger.info("Start test for bulk reads.")
+        self.home.open()
+        self.home.search_box_input.send_keys("Search google")
+        names = ['value', 'name', 'class', 'disabled', 'no-such-attribute']
+        expected = {name: self.home.search_box_input.get_attribute(name) for name in names}
+        assert self.home.search_box_input.get_attributes(names) == expected
+        inputs = Element(self.driver, '//input[@name]', self.driver, xpath=True)
+        columns = inputs.get_columns(['name', 'type'])
+        assert columns['name'] == [e.get_attribute('name') for e in inputs.get_elements()]
+        assert len(columns['type']) == len(columns['name'])
+        logger.info("Completed test for bulk reads.")
+
+    @pytest.mark.tc_action_macro
+    def test_action_macro(self):
+        """ Unit test for running several steps as one script. """
+        logger.info("Start test for action macros.")
+        self.home.open()
+        report = (ActionMacro(self.driver)
+                  .focus(self.home.search_box_input)
+                  .type(self.home.search_box_input, "Search google")
+                  .type(self.home.google_search_submit, "x", clear=False)
+                  .run())
+        assert [result.mode for result in report.steps] == ['script', 'script', 'script', 'element']
+        assert report.unfused[0].reason == 'not a text field'
+        assert self.home.search_box_input.get_attribute('value') == "Search google"
+        logger.info("Completed test for action macros.")
+
+    @pytest.mark.tc_component_list
+    def test_component_list(self):
+        """ Unit test for lazy component lists. """
+        logger.info("Start test for component lists.")
+        self.home.open()
+        expected = self.driver.find_elements(By.CSS_SELECTOR, 'input')
+        inputs = ComponentList(self.driver, self.driver, (By.CSS_SELECTOR, 'input'), lambda driver, elem: elem)
+        assert len(inputs) == len(expected)
+        assert not inputs.fetched()
+        assert inputs[0] == expected[0]
+        assert inputs[0] is inputs[0]
+        assert inputs[-1] is inputs[len(expected) - 1]
+        assert len(inputs[1:3]) == min(2, len(expected) - 1)
+        assert len(list(inputs.stream(1))) == len(expected)
+        assert inputs.fetched() == expected
+        assert inputs.is_current()
+        with pytest.raises(IndexError):
+            _ = inputs[len(expected)]
+        logger.info("Completed test for component lists.")